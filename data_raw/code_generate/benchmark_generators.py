@@ -0,0 +1,238 @@
+"""
+Benchmark the data generators.
+Runs POS (numpy and python engines), roster and financial generation at several
+scale factors, each case in a fresh process, and records rows/sec, wall time,
+peak RSS and a per-stage breakdown to a JSON file that later runs can be compared against.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+import numpy as np
+import pandas as pd
+
+# Configuration
+SCALE_FACTORS = [1, 2]  # Scale points run for every generator
+BENCHMARK_DAYS = None  # Operating days per POS/roster case (None = full START_DATE-END_DATE range)
+BENCHMARK_SEED = 0
+OUTPUT_FILE = '../data/benchmarks/benchmark_results.json'
+
+GENERATORS = ['pos_numpy', 'pos_python', 'roster', 'company_expenses', 'channel_revenues',
+              'income_statement', 'balance_sheet', 'cash_flow']
+
+# Financial generators: module and generate function (company expenses takes the scale factor itself)
+FINANCIAL_GENERATORS = {
+    'company_expenses': ('generate_company_expenses', 'generate_company_expenses', 'Expense Values'),
+    'channel_revenues': ('generate_channel_revenues', 'generate_channel_revenues', 'Sales Values'),
+    'income_statement': ('generate_income_statement', 'generate_income_statement_data', 'Expense Values'),
+    'balance_sheet': ('generate_balance_sheet', 'generate_balance_sheet_data', 'Balance Sheet Values'),
+    'cash_flow': ('generate_cash_flow', 'generate_cash_flow_data', 'Cash Flow Values')
+}
+
+
+def timed(stages, stage, func, *args, **kwargs):
+    """Call func and add its wall time to stages[stage]."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def limit_days(module, days):
+    """Shorten a generator's END_DATE to its first `days` operating days; returns the days."""
+    operating_days = module.get_operating_days(module.START_DATE, module.END_DATE)
+    if days is not None:
+        operating_days = operating_days[:days]
+        module.END_DATE = datetime.combine(operating_days[-1], datetime.min.time())
+    return operating_days
+
+
+def bench_pos_numpy(scale_factor, days, seed, csv_file):
+    """POS numpy engine: shard sampling, merge, decode to DataFrame, CSV write."""
+    import generate_pos_data as pos
+    stages = {}
+    operating_days = limit_days(pos, days)
+    entropy = np.random.SeedSequence(seed).entropy
+    customer_names = timed(stages, 'customer_pool', pos.build_customer_name_pool, entropy)
+    shards = list(pos.plan_shards(operating_days, entropy, len(customer_names), scale_factor=scale_factor))
+    batches = timed(stages, 'sampling', pos.generate_shards, shards, 1)
+    batch = timed(stages, 'merge', pos.concat_batches, batches)
+    df = timed(stages, 'dataframe', pos.batch_to_dataframe, batch, customer_names)
+    timed(stages, 'csv_write', df.to_csv, csv_file, index=False)
+    return len(df), stages
+
+
+def bench_pos_python(scale_factor, days, seed, csv_file):
+    """POS python engine: per-transaction sampling, DataFrame build, datetime parse, sort, CSV write."""
+    import generate_pos_data as pos
+    stages = {}
+    limit_days(pos, days)
+    random.seed(seed)
+    pos.fake.seed_instance(seed)
+    customer_pool = timed(stages, 'customer_pool', pos.get_customer_pool, seed)
+    transactions = timed(stages, 'sampling', pos.generate_all_transactions, customer_pool, scale_factor)
+    df = timed(stages, 'dataframe', pd.DataFrame, transactions)
+    df['transaction_datetime'] = timed(stages, 'datetime', pd.to_datetime, df['transaction_datetime'])
+    df = timed(stages, 'sort', lambda: df.sort_values('transaction_datetime').reset_index(drop=True))
+    timed(stages, 'csv_write', df.to_csv, csv_file, index=False)
+    return len(df), stages
+
+
+def bench_roster(scale_factor, days, seed, csv_file):
+    """Roster: shift sampling (into a typed DataFrame), sort, CSV write (including datetime formatting)."""
+    import generate_roster_data as roster
+    from output_writers import TABLE_DATE_FORMATS
+    stages = {}
+    operating_days = limit_days(roster, days)
+    random.seed(seed)
+    roster.fake.seed_instance(seed)
+    timed(stages, 'employee_master', roster.extend_employee_master, scale_factor)
+    df = timed(stages, 'sampling', roster.generate_roster, operating_days, None, scale_factor)
+    df = timed(stages, 'sort', lambda: df.sort_values(['start_time', 'area_department']).reset_index(drop=True))
+    timed(stages, 'csv_write', df.to_csv, csv_file, index=False, date_format=TABLE_DATE_FORMATS['roster'])
+    return len(df), stages
+
+
+def bench_financial(name, scale_factor, seed, csv_file):
+    """Financial generator: sampling, DataFrame build (with value scaling), CSV write."""
+    from scale_factor import scale_values
+    module_name, function_name, value_column = FINANCIAL_GENERATORS[name]
+    module = importlib.import_module(module_name)
+    stages = {}
+    random.seed(seed)
+    generate = getattr(module, function_name)
+    if name == 'company_expenses':
+        rows = timed(stages, 'sampling', generate, scale_factor)
+    else:
+        rows = timed(stages, 'sampling', generate)
+    df = timed(stages, 'dataframe', pd.DataFrame, rows)
+    if name != 'company_expenses':
+        df[value_column] = timed(stages, 'dataframe', scale_values, df[value_column], scale_factor)
+    timed(stages, 'csv_write', df.to_csv, csv_file, index=False)
+    return len(df), stages
+
+
+def run_case(generator, scale_factor, days, seed):
+    """Run one benchmark case; called in a fresh process so peak RSS belongs to this case only."""
+    # Import outside the timed region (menu compilation, Faker start-up)
+    if generator in FINANCIAL_GENERATORS:
+        importlib.import_module(FINANCIAL_GENERATORS[generator][0])
+    else:
+        importlib.import_module('generate_roster_data' if generator == 'roster' else 'generate_pos_data')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, f"{generator}.csv")
+        start = time.perf_counter()
+        if generator == 'pos_numpy':
+            rows, stages = bench_pos_numpy(scale_factor, days, seed, csv_file)
+        elif generator == 'pos_python':
+            rows, stages = bench_pos_python(scale_factor, days, seed, csv_file)
+        elif generator == 'roster':
+            rows, stages = bench_roster(scale_factor, days, seed, csv_file)
+        else:
+            rows, stages = bench_financial(generator, scale_factor, seed, csv_file)
+        wall_seconds = time.perf_counter() - start
+        csv_bytes = os.path.getsize(csv_file)
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+    return {
+        'generator': generator,
+        'scale_factor': scale_factor,
+        'days': days,
+        'rows': rows,
+        'wall_seconds': round(wall_seconds, 4),
+        'rows_per_sec': round(rows / wall_seconds, 1) if wall_seconds > 0 else None,
+        'peak_rss_mb': round(peak_rss_mb, 1),
+        'csv_bytes': csv_bytes,
+        'stages': {stage: round(seconds, 4) for stage, seconds in stages.items()}
+    }
+
+
+def run_benchmarks(generators=GENERATORS, scale_factors=SCALE_FACTORS, days=BENCHMARK_DAYS, seed=BENCHMARK_SEED):
+    """Run every (generator, scale factor) case, each in its own spawned process."""
+    results = []
+    for generator in generators:
+        for scale_factor in scale_factors:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(run_case, generator, scale_factor, days, seed).result()
+            results.append(result)
+            stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result['stages'].items())
+            print(f"  {generator:<17} SF {scale_factor:<3} {result['rows']:>10,} rows  {result['wall_seconds']:>8.2f}s  "
+                  f"{result['rows_per_sec']:>12,.0f} rows/s  {result['peak_rss_mb']:>7.1f} MB  ({stages})")
+    return results
+
+
+def compare_results(results, baseline_file):
+    """Print rows/sec and wall time of this run relative to a previous results file."""
+    with open(baseline_file) as f:
+        baseline = {(r['generator'], r['scale_factor'], r['days']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_file}:")
+    for result in results:
+        previous = baseline.get((result['generator'], result['scale_factor'], result['days']))
+        if previous is None:
+            print(f"  {result['generator']:<17} SF {result['scale_factor']:<3} (no baseline)")
+            continue
+        speedup = previous['wall_seconds'] / result['wall_seconds']
+        rss_change = result['peak_rss_mb'] - previous['peak_rss_mb']
+        print(f"  {result['generator']:<17} SF {result['scale_factor']:<3} {speedup:>6.2f}x speed, "
+              f"{rss_change:+.1f} MB peak RSS")
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Benchmark the cafe data generators.')
+    parser.add_argument('--generators', nargs='+', choices=GENERATORS, default=GENERATORS,
+                        help='generators to benchmark (default: all)')
+    parser.add_argument('--scale-factors', nargs='+', type=int, default=SCALE_FACTORS, help='scale points to run')
+    parser.add_argument('--days', type=int, default=BENCHMARK_DAYS,
+                        help='operating days per POS/roster case (default: full date range)')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED, help='random seed for every case')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='JSON file the results are written to')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the benchmarks and save the results."""
+    args = parse_args()
+    print("Benchmarking data generators...")
+    print(f"Scale factors: {', '.join(map(str, args.scale_factors))}")
+    print(f"Days: {args.days or 'full date range'}\n")
+
+    started_at = datetime.now().isoformat(timespec='seconds')
+    results = run_benchmarks(args.generators, args.scale_factors, args.days, args.seed)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'started_at': started_at,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        compare_results(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compact 64-bit transaction and order identifiers.
+A key packs the business date, location, shard and a sequence number into one
+sortable BIGINT, so parallel generators assign IDs without coordinating counters:
+
+    bit 63     | 62 ... 46 | 45 ... 30 | 29 ... 24 | 23 ... 0
+    0 (sign)   | day       | location  | shard     | sequence
+
+day counts days since ID_EPOCH, location is the location code (LOC-001 -> 0),
+shard tells apart independent producers of the same location-day and sequence
+numbers transactions (or line items) within it. Keys sort by date, location,
+shard, then sequence. silver.sql decodes them with the same shifts and masks.
+"""
+
+import numpy as np
+
+ID_EPOCH = np.datetime64('2000-01-01', 'D')
+DAY_BITS = 17  # Days since ID_EPOCH (to 2358)
+LOCATION_BITS = 16
+SHARD_BITS = 6
+SEQUENCE_BITS = 24  # Transactions or line items per location-day and shard
+
+SEQUENCE_SHIFT = 0
+SHARD_SHIFT = SEQUENCE_BITS
+LOCATION_SHIFT = SHARD_SHIFT + SHARD_BITS
+DAY_SHIFT = LOCATION_SHIFT + LOCATION_BITS
+
+ID_PREFIXES = {'transaction': 'TXN', 'order': 'ORD'}
+# Fixed field widths of format_id(), wide enough for the largest value of each field
+LOCATION_DIGITS = len(str(1 << LOCATION_BITS))  # Location numbers run from 1
+SHARD_DIGITS = len(str((1 << SHARD_BITS) - 1))
+SEQUENCE_DIGITS = len(str((1 << SEQUENCE_BITS) - 1))
+
+
+def check_range(name, values, bits):
+    """Raise ValueError if any value does not fit its bit field."""
+    values = np.asarray(values)
+    if len(values.ravel()) and (values.min() < 0 or values.max() >= 1 << bits):
+        raise ValueError(f"{name} out of range for a {bits}-bit ID field")
+
+
+def encode_ids(dates, location_codes, shard, sequences):
+    """Pack (date, location code, shard, sequence) into int64 keys (arrays broadcast)."""
+    days = (np.asarray(dates, dtype='datetime64[D]') - ID_EPOCH).astype(np.int64)
+    location_codes = np.asarray(location_codes, dtype=np.int64)
+    sequences = np.asarray(sequences, dtype=np.int64)
+    for name, values, bits in (('day', days, DAY_BITS), ('location', location_codes, LOCATION_BITS),
+                               ('shard', shard, SHARD_BITS), ('sequence', sequences, SEQUENCE_BITS)):
+        check_range(name, values, bits)
+    return (days << DAY_SHIFT) | (location_codes << LOCATION_SHIFT) | (np.int64(shard) << SHARD_SHIFT) | sequences
+
+
+def decode_ids(keys):
+    """Unpack int64 keys into a dict of date (datetime64[D]), location_code, shard and sequence arrays."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return {
+        'date': ID_EPOCH + (keys >> DAY_SHIFT),
+        'location_code': (keys >> LOCATION_SHIFT) & ((1 << LOCATION_BITS) - 1),
+        'shard': (keys >> SHARD_SHIFT) & ((1 << SHARD_BITS) - 1),
+        'sequence': keys & ((1 << SEQUENCE_BITS) - 1)
+    }
+
+
+def format_id(key, kind='transaction'):
+    """Fixed-width rendering of a key, e.g. TXN-20251001-00001-00-00000042 (LOC-001, shard 0, sequence 42).
+
+    Renderings sort like their keys.
+    """
+    parts = decode_ids([key])
+    day = str(parts['date'][0]).replace('-', '')
+    return (f"{ID_PREFIXES[kind]}-{day}-{parts['location_code'][0] + 1:0{LOCATION_DIGITS}d}-"
+            f"{parts['shard'][0]:0{SHARD_DIGITS}d}-{parts['sequence'][0]:0{SEQUENCE_DIGITS}d}")
+
+
+def parse_id(text):
+    """Key of a format_id() rendering (either prefix)."""
+    _, day, location, shard, sequence = text.split('-')
+    date = np.datetime64(f"{day[:4]}-{day[4:6]}-{day[6:]}", 'D')
+    return int(encode_ids([date], [int(location) - 1], int(shard), [int(sequence)])[0])
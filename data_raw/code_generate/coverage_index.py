@@ -0,0 +1,158 @@
+"""
+Staff coverage by location, role and 15-minute slot, built from a roster.
+Every shift adds +1 at its first slot and -1 after its last (and the reverse around
+its break); one cumulative sum along the time axis turns those events into a dense
+count of staff on the floor per location x role x calendar day x slot, so "how many
+baristas were on at LOC-002 at 12:15" is an array lookup rather than a pass over
+the roster. Breaks are taken from the middle of the shift.
+
+Run it directly to export the coverage of a roster (CSV or Parquet):
+    python coverage_index.py [--roster ../data/roster] [--format parquet]
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from roster_index import ROSTER_PATH, id_codes, read_roster
+from output_writers import add_output_arguments, write_output
+
+COVERAGE_PATH = '../data/coverage'
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+ROLES = ['Barista', 'Front of House', 'Kitchen']
+
+
+def slot_numbers(times, origin, round_up=True):
+    """Slots since origin (datetime64[D]) of datetime64 times; a slot counts from its start."""
+    minutes = (np.asarray(times, dtype='datetime64[m]') - origin).astype(np.int64)
+    return -(-minutes // SLOT_MINUTES) if round_up else minutes // SLOT_MINUTES
+
+
+def add_events(events, positions, delta):
+    """events[positions] += delta, counting repeated positions (faster than np.add.at)."""
+    positions, repeats = np.unique(positions, return_counts=True)
+    events[positions] += (repeats * delta).astype(events.dtype)
+
+
+class CoverageIndex:
+    """Staff on shift as counts[location code, role, day, slot] (int16).
+
+    location_codes are integer codes (LOC-001 -> 0), role_codes index `roles`,
+    starts and ends are shift times (end exclusive) and break_minutes the unpaid
+    break of each shift. Day 0 is the calendar day of the first shift start. Staff
+    count in a slot if they are on the floor at its start.
+    """
+
+    def __init__(self, location_codes, role_codes, starts, ends, break_minutes, roles=ROLES):
+        self.roles = list(roles)
+        location_codes = np.asarray(location_codes, dtype=np.int64)
+        role_codes = np.asarray(role_codes, dtype=np.int64)
+        starts = np.asarray(starts, dtype='datetime64[m]')
+        ends = np.asarray(ends, dtype='datetime64[m]')
+        n_locations = int(location_codes.max()) + 1 if len(location_codes) else 0
+        self.first_date = starts.min().astype('datetime64[D]') if len(starts) else np.datetime64('1970-01-01', 'D')
+        first_slot = slot_numbers(starts, self.first_date)
+        end_slot = np.maximum(slot_numbers(ends, self.first_date), first_slot)
+        self.n_days = -(-int(end_slot.max()) // SLOTS_PER_DAY) if len(starts) else 0
+
+        # Break: whole slots, centred in the shift (never longer than the shift)
+        break_slots = np.minimum(-(-np.asarray(break_minutes, dtype=np.int64) // SLOT_MINUTES), end_slot - first_slot)
+        break_start = first_slot + (end_slot - first_slot - break_slots) // 2
+
+        # Sweep: +1 on at the start and back from break, -1 off at the break and the end
+        n_slots = self.n_days * SLOTS_PER_DAY
+        timeline = (location_codes * len(self.roles) + role_codes) * (n_slots + 1)
+        events = np.zeros(n_locations * len(self.roles) * (n_slots + 1), dtype=np.int16)
+        add_events(events, np.concatenate([timeline + first_slot, timeline + break_start + break_slots]), 1)
+        add_events(events, np.concatenate([timeline + break_start, timeline + end_slot]), -1)
+        events = events.reshape(n_locations, len(self.roles), n_slots + 1)
+        np.cumsum(events, axis=2, out=events)
+        self.counts = events[:, :, :n_slots].reshape(n_locations, len(self.roles), self.n_days, SLOTS_PER_DAY)
+        self._totals = {}
+
+    @classmethod
+    def from_frame(cls, df_roster, roles=ROLES):
+        """Coverage of a roster DataFrame (generate_roster() output or a loaded roster file)."""
+        df_roster = df_roster[df_roster['role'].isin(roles)]
+        role_codes = pd.Categorical(df_roster['role'], categories=roles).codes
+        return cls(id_codes(df_roster['area_department']), role_codes, df_roster['start_time'].to_numpy(),
+                   df_roster['end_time'].to_numpy(), df_roster['break_duration'].fillna(0).to_numpy(), roles)
+
+    def role_codes(self, roles=None):
+        """Indexes of roles (all roles when None) on the role axis."""
+        return list(range(len(self.roles))) if roles is None else [self.roles.index(role) for role in roles]
+
+    def day(self, location_code, date, roles=None):
+        """Staff on shift per slot of one day at one location, summed over roles (a SLOTS_PER_DAY array)."""
+        day = int((np.datetime64(date, 'D') - self.first_date).astype(np.int64))
+        if not 0 <= location_code < len(self.counts) or not 0 <= day < self.n_days:
+            return np.zeros(SLOTS_PER_DAY, dtype=np.int16)
+        return self.counts[location_code, self.role_codes(roles), day].sum(axis=0, dtype=np.int16)
+
+    def staff(self, location_codes, times, roles=None):
+        """Staff on shift at each (location code, time), summed over roles; 0 outside the roster."""
+        location_codes = np.asarray(location_codes, dtype=np.int64)
+        slots = slot_numbers(times, self.first_date, round_up=False)
+        inside = (location_codes >= 0) & (location_codes < len(self.counts)) & (slots >= 0) & \
+                 (slots < self.n_days * SLOTS_PER_DAY)
+        key = tuple(self.role_codes(roles))
+        if key not in self._totals:
+            # Summed over the roles once, then reused for every lookup
+            by_slot = self.counts.reshape(len(self.counts), len(self.roles), -1)
+            self._totals[key] = by_slot[:, list(key)].sum(axis=1, dtype=np.int16)
+        counts = self._totals[key]
+        staff = np.zeros(len(location_codes), dtype=np.int16)
+        staff[inside] = counts[location_codes[inside], slots[inside]]
+        return staff
+
+    def to_frame(self):
+        """Non-zero counts as a long DataFrame: location_id, role, slot_start, staff."""
+        location, role, day, slot = np.nonzero(self.counts)
+        slot_start = self.first_date.astype('datetime64[m]') + (day * SLOTS_PER_DAY + slot) * SLOT_MINUTES
+        return pd.DataFrame({
+            'location_id': [f"LOC-{code + 1:03d}" for code in location],
+            'role': np.array(self.roles, dtype=object)[role],
+            'slot_start': slot_start.astype('datetime64[s]'),
+            'staff': self.counts[location, role, day, slot]
+        })
+
+
+def load_coverage_index(path=ROSTER_PATH):
+    """CoverageIndex of the roster at path, or None if there is no roster."""
+    df_roster = read_roster(path)
+    if df_roster is None or len(df_roster) == 0:
+        return None
+    return CoverageIndex.from_frame(df_roster)
+
+
+def parse_args():
+    """Parse command line options (defaults come from the configuration above)."""
+    parser = argparse.ArgumentParser(description='Export staff coverage per location, role and 15-minute slot.')
+    parser.add_argument('--roster', default=ROSTER_PATH,
+                        help='roster CSV, Parquet dataset or folder of roster_<n> outputs')
+    parser.add_argument('--output-dir', default=COVERAGE_PATH, help='folder for coverage_0.csv or coverage_0/')
+    add_output_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Build the coverage index of a roster and write its non-zero slots."""
+    args = parse_args()
+    print("Building shift coverage...")
+    coverage = load_coverage_index(args.roster)
+    if coverage is None:
+        print(f"No roster found at {args.roster}")
+        return
+    print(f"Coverage: {len(coverage.counts)} locations x {len(coverage.roles)} roles x {coverage.n_days} days "
+          f"x {SLOTS_PER_DAY} slots from {coverage.first_date}")
+
+    df_coverage = coverage.to_frame()
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = write_output(df_coverage, os.path.join(args.output_dir, 'coverage_0.csv'), 'coverage', args.format)
+    print(f"Slots with staff on shift: {len(df_coverage):,}")
+    print(f"Data saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Hourly POS demand per location and weekday, for demand-driven rostering.
+Generated POS output (CSV, compressed or rolled CSV, or Parquet datasets) is read
+in one streaming pass of three columns, chunk by chunk, and reduced to a
+location x weekday x hour histogram of transactions, so the POS file is never
+loaded whole.
+"""
+
+import os
+from datetime import date
+import numpy as np
+import pandas as pd
+from roster_index import id_codes
+
+POS_PATH = '../data/pos'  # pos_<n>.csv files and/or pos_<n>/ Parquet datasets
+DEMAND_COLUMNS = ['transaction_id', 'transaction_datetime', 'location_id']
+READ_CHUNK_ROWS = 200000  # Line items read at a time
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def variant_mtime(path):
+    """Latest modification time of a file or of the files in a dataset directory."""
+    if os.path.isfile(path):
+        return os.path.getmtime(path)
+    return max((os.path.getmtime(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names),
+               default=os.path.getmtime(path))
+
+
+def pos_sources(path=POS_PATH):
+    """POS outputs at path: CSV files (rolled parts in order) or Parquet dataset directories.
+
+    A folder of pos_<n> outputs gives the sources of every run. Each run is read
+    from exactly one variant, the most recently written: its CSV (plain or one
+    compression), its rolled CSV parts or its Parquet dataset, so leftovers of
+    earlier runs in another format are never counted twice.
+    """
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        return []
+    if any(name.startswith('transaction_date=') for name in os.listdir(path)):
+        return [path]
+    runs = {}
+    for name in sorted(os.listdir(path)):
+        if name.startswith('pos_'):
+            stem, _, extension = name.partition('.')
+            run, _, part = stem.partition('-')
+            variant = 'parquet' if os.path.isdir(os.path.join(path, name)) else (extension, bool(part))
+            runs.setdefault(run, {}).setdefault(variant, []).append(os.path.join(path, name))
+    sources = []
+    for variants in runs.values():
+        sources.extend(max(variants.values(), key=lambda paths: max(map(variant_mtime, paths))))
+    return sources
+
+
+def iter_chunks(source, rows=READ_CHUNK_ROWS):
+    """DEMAND_COLUMNS of one source, `rows` line items at a time."""
+    if os.path.isfile(source):
+        yield from pd.read_csv(source, usecols=DEMAND_COLUMNS, dtype={'transaction_id': str}, chunksize=rows)
+        return
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(source, format='parquet', partitioning='hive')
+    for batch in dataset.to_batches(columns=DEMAND_COLUMNS, batch_size=rows):
+        yield batch.to_pandas()
+
+
+class DemandHistogram:
+    """Transactions by location code, weekday and hour, accumulated chunk by chunk."""
+
+    def __init__(self):
+        self.counts = np.zeros((0, 7, 24), dtype=np.int64)
+        self.trading_days = set()  # (location code, date ordinal) with any sales
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    def add(self, location_codes, times):
+        """Count transactions (one entry each) at location codes and datetime64 times."""
+        days = times.astype('datetime64[D]')
+        weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        hour = (times - days).astype('timedelta64[h]').astype(np.int64)
+        n_locations = max(len(self.counts), int(location_codes.max()) + 1 if len(location_codes) else 0)
+        if n_locations > len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros((n_locations - len(self.counts), 7, 24), np.int64)])
+        self.counts += np.bincount((location_codes * 7 + weekday) * 24 + hour,
+                                   minlength=n_locations * 7 * 24).reshape(n_locations, 7, 24)
+        ordinals = days.astype(np.int64) + date(1970, 1, 1).toordinal()
+        self.trading_days.update(zip(location_codes.tolist(), ordinals.tolist()))
+
+    def hourly(self):
+        """Average transactions per trading day, as an array [location code, weekday, hour]."""
+        n_days = np.zeros(self.counts.shape[:2])
+        for location_code, ordinal in self.trading_days:
+            n_days[location_code, date.fromordinal(ordinal).weekday()] += 1
+        return self.counts / np.maximum(n_days, 1)[..., None]
+
+
+def read_demand(path=POS_PATH, rows=READ_CHUNK_ROWS):
+    """DemandHistogram of the POS output at path, or None if there is none.
+
+    A transaction is counted once however its line items are ordered: IDs are
+    de-duplicated within each chunk, and the IDs at the last timestamp of a chunk
+    (a transaction's line items share its timestamp) carry over to the next chunk
+    and file, since chunks and rolled parts can split a transaction.
+    """
+    histogram = DemandHistogram()
+    carried, last_time = set(), None
+    for source in pos_sources(path):
+        for chunk in iter_chunks(source, rows):
+            chunk = chunk.drop_duplicates('transaction_id')
+            ids = chunk['transaction_id'].astype(str).to_numpy()
+            times = pd.to_datetime(chunk['transaction_datetime'], format=TIMESTAMP_FORMAT).to_numpy()
+            times = times.astype('datetime64[s]')
+            new = ~np.isin(ids, list(carried))
+            histogram.add(id_codes(chunk['location_id'][new]), times[new])
+            if len(ids):
+                at_end = set(ids[times == times[-1]])
+                carried = carried | at_end if times[-1] == last_time else at_end
+                last_time = times[-1]
+    return histogram if len(histogram) else None
@@ -0,0 +1,113 @@
+"""
+Late, duplicate and out-of-order POS events for streaming tests.
+Applied to the micro-batch files of a replay: whole transactions are held back
+and land in a later file, re-sent with the same transaction_id/order_id, or a
+file is emitted after the one that follows it. Every injected anomaly is
+recorded, so watermark and dedup state can be checked against the ground truth.
+"""
+
+import numpy as np
+import pandas as pd
+
+LATE_SHARE = 0.02  # Share of transactions landing in a later file
+DUPLICATE_SHARE = 0.01  # Share of transactions sent twice
+REORDER_SHARE = 0.05  # Share of files emitted after the file that follows them
+MAX_DELAY_FILES = 5  # Late transactions and re-sends land up to this many files later
+ANOMALY_SEED = 42
+
+MANIFEST_COLUMNS = ['anomaly', 'transaction_id', 'transaction_datetime', 'line_items', 'original_file',
+                    'landed_file', 'files_late']
+
+
+class EventAnomalies:
+    """Turns in-order micro-batches into late, duplicated and reordered ones.
+
+    Files are identified by their sequence number. release() takes the next
+    in-order batch and returns the (sequence, DataFrame) files to write now;
+    flush() returns whatever is still held at the end of the stream.
+    """
+
+    def __init__(self, late_share=LATE_SHARE, duplicate_share=DUPLICATE_SHARE, reorder_share=REORDER_SHARE,
+                 max_delay=MAX_DELAY_FILES, seed=ANOMALY_SEED):
+        if late_share + duplicate_share > 1:
+            raise ValueError("late_share + duplicate_share must not exceed 1")
+        self.late_share = late_share
+        self.duplicate_share = duplicate_share
+        self.reorder_share = reorder_share
+        self.max_delay = max_delay
+        self.rng = np.random.default_rng(seed)
+        self.held = []  # (sequence the rows are due in, anomaly, original sequence, rows)
+        self.deferred = None  # (sequence, rows) of a file emitted after the next one
+        self.records = []  # Manifest DataFrames, in landing order
+
+    def record(self, anomaly, rows, original, landed):
+        """Add one manifest row per transaction in rows."""
+        transactions = rows.groupby('transaction_id', sort=False)['transaction_datetime']
+        first = transactions.first()
+        self.records.append(pd.DataFrame({
+            'anomaly': anomaly,
+            'transaction_id': first.index,
+            'transaction_datetime': first.to_numpy(),
+            'line_items': transactions.size().to_numpy(),
+            'original_file': original,
+            'landed_file': landed,
+            'files_late': landed - original
+        }, columns=MANIFEST_COLUMNS))
+
+    def hold(self, anomaly, rows, sequence, delays):
+        """Hold rows until the file `delays` files later (one delay per row)."""
+        for delay in np.unique(delays).tolist():
+            self.held.append((sequence + delay, anomaly, sequence, rows[delays == delay]))
+
+    def land(self, sequence, everything=False):
+        """Rows held for file `sequence` (or all of them), recorded as landing there."""
+        due = [held for held in self.held if everything or held[0] <= sequence]
+        self.held = [held for held in self.held if not (everything or held[0] <= sequence)]
+        for _, anomaly, original, rows in due:
+            self.record(anomaly, rows, original, sequence)
+        return [rows for _, _, _, rows in due]
+
+    def release(self, df, sequence):
+        """Apply the anomalies to the in-order batch for file `sequence`.
+
+        Each transaction is late, duplicated or on time (one draw per
+        transaction, so its line items stay together); late and re-sent rows
+        are added at the end of the file they land in. A reordered file keeps
+        its name but is returned after the next file.
+        """
+        transaction_code = pd.factorize(df['transaction_id'])[0]
+        n_transactions = transaction_code.max() + 1 if len(df) else 0
+        draw = self.rng.random(n_transactions)[transaction_code]
+        delay = self.rng.integers(1, self.max_delay + 1, n_transactions)[transaction_code]
+        late = draw < self.late_share
+        duplicate = (draw >= self.late_share) & (draw < self.late_share + self.duplicate_share)
+        self.hold('late', df[late], sequence, delay[late])
+        self.hold('duplicate', df[duplicate], sequence, delay[duplicate] - 1)  # Re-sends may share the file
+        frame = pd.concat([df[~late], *self.land(sequence)], ignore_index=True)
+
+        if self.deferred is not None:
+            files = [(sequence, frame), self.deferred]
+            self.deferred = None
+        elif self.rng.random() < self.reorder_share:
+            self.deferred = (sequence, frame)
+            self.records.append(pd.DataFrame([['reordered_file', None, None, len(frame), sequence, sequence, 1]],
+                                             columns=MANIFEST_COLUMNS))
+            files = []
+        else:
+            files = [(sequence, frame)]
+        return files
+
+    def flush(self, sequence):
+        """Files still held at the end of the stream; rows due after the last file
+        land together in one more file, `sequence`."""
+        files = [self.deferred] if self.deferred is not None else []
+        self.deferred = None
+        if self.held:
+            files.append((sequence, pd.concat(self.land(sequence, everything=True), ignore_index=True)))
+        return files
+
+    def manifest(self):
+        """All injected anomalies as a DataFrame (MANIFEST_COLUMNS)."""
+        if not self.records:
+            return pd.DataFrame(columns=MANIFEST_COLUMNS)
+        return pd.concat(self.records, ignore_index=True)
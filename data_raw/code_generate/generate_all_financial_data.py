@@ -20,7 +20,10 @@ scripts = [
 ]
 
 def main():
-    """Run all financial data generation scripts."""
+    """Run all financial data generation scripts.
+    
+    Command line options (e.g. --format parquet) are passed through to each script.
+    """
     print("="*60)
     print("GENERATING ALL FINANCIAL DATA")
     print("="*60)
@@ -33,7 +36,7 @@ def main():
         
         try:
             result = subprocess.run(
-                [sys.executable, script],
+                [sys.executable, script] + sys.argv[1:],
                 capture_output=False,
                 text=True,
                 check=True
@@ -4,8 +4,12 @@ Monthly snapshots of assets, liabilities, and equity.
 """
 
 import random
+import argparse
 from datetime import datetime, timedelta, date as date_module
 import pandas as pd
+from output_writers import add_output_arguments
+from generation_cache import add_cache_argument, module_config, write_cached_output
+from scale_factor import add_scale_argument, scale_values
 
 # Configuration
 START_DATE = datetime(2025, 10, 1)
@@ -123,8 +127,18 @@ def generate_balance_sheet_data():
     return balance_data
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate balance sheet data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_cache_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main function to generate and save balance sheet data."""
+    args = parse_args()
     print("Generating Balance Sheet Data...")
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}\n")
     
@@ -137,10 +151,16 @@ def main():
     # Sort by Year, then Type, then Category
     df = df.sort_values(['Year', 'Balance Sheet Type', 'Category', 'Sub Category']).reset_index(drop=True)
     
-    # Save to CSV
+    # Values grow with the number of stores (--scale-factor)
+    df['Balance Sheet Values'] = scale_values(df['Balance Sheet Values'], args.scale_factor)
+    
+    # Save to CSV (or Parquet)
     output_file = '../financial/balance_sheet_data.csv'
-    df.to_csv(output_file, index=False)
-    print(f"Balance Sheet Data saved to {output_file}")
+    # Partitions (months/years) whose configuration is unchanged keep the rows already written
+    saved_path, df, rewritten = write_cached_output(df, output_file, 'balance_sheet', args.format,
+                                                    (module_config(globals()), args.scale_factor), args.cache)
+    print(f"Balance Sheet Data saved to {saved_path}")
+    print(f"Partitions rewritten: {rewritten}" + ('' if rewritten else ' (configuration unchanged)'))
     
     # Print summary
     print("\n" + "="*60)
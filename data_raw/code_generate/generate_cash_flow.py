@@ -4,8 +4,12 @@ Monthly cash movements by type (Operating, Investing, Financing).
 """
 
 import random
+import argparse
 from datetime import datetime, timedelta, date as date_module
 import pandas as pd
+from output_writers import add_output_arguments
+from generation_cache import add_cache_argument, module_config, write_cached_output
+from scale_factor import add_scale_argument, scale_values
 
 # Configuration
 START_DATE = datetime(2025, 10, 1)
@@ -187,8 +191,18 @@ def generate_cash_flow_data():
     return cash_flow_data
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate cash flow data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_cache_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main function to generate and save cash flow data."""
+    args = parse_args()
     print("Generating Cash Flow Data...")
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}\n")
     
@@ -201,10 +215,16 @@ def main():
     # Sort by Year, then Type, then Category
     df = df.sort_values(['Year', 'Cash Flow Type', 'Cash Flow Category']).reset_index(drop=True)
     
-    # Save to CSV
+    # Values grow with the number of stores (--scale-factor)
+    df['Cash Flow Values'] = scale_values(df['Cash Flow Values'], args.scale_factor)
+    
+    # Save to CSV (or Parquet)
     output_file = '../financial/cash_flow_data.csv'
-    df.to_csv(output_file, index=False)
-    print(f"Cash Flow Data saved to {output_file}")
+    # Partitions (months/years) whose configuration is unchanged keep the rows already written
+    saved_path, df, rewritten = write_cached_output(df, output_file, 'cash_flow', args.format,
+                                                    (module_config(globals()), args.scale_factor), args.cache)
+    print(f"Cash Flow Data saved to {saved_path}")
+    print(f"Partitions rewritten: {rewritten}" + ('' if rewritten else ' (configuration unchanged)'))
     
     # Print summary
     print("\n" + "="*60)
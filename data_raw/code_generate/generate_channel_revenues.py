@@ -4,8 +4,12 @@ Revenue breakdown by channel (POS, Delivery, Catering, etc.).
 """
 
 import random
+import argparse
 from datetime import datetime, timedelta, date as date_module
 import pandas as pd
+from output_writers import add_output_arguments
+from generation_cache import add_cache_argument, module_config, write_cached_output
+from scale_factor import add_scale_argument, scale_values
 
 # Configuration
 START_DATE = datetime(2025, 10, 1)
@@ -98,8 +102,18 @@ def generate_channel_revenues():
     return revenues_data
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate channel revenues data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_cache_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main function to generate and save channel revenues data."""
+    args = parse_args()
     print("Generating Channel Revenues data...")
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}\n")
     
@@ -114,10 +128,16 @@ def main():
     df = df.sort_values(['First Date_dt', 'Channel']).reset_index(drop=True)
     df = df.drop('First Date_dt', axis=1)
     
-    # Save to CSV
+    # Values grow with the number of stores (--scale-factor)
+    df['Sales Values'] = scale_values(df['Sales Values'], args.scale_factor)
+    
+    # Save to CSV (or Parquet)
     output_file = '../financial/channel_revenues.csv'
-    df.to_csv(output_file, index=False)
-    print(f"Channel Revenues data saved to {output_file}")
+    # Partitions (months/years) whose configuration is unchanged keep the rows already written
+    saved_path, df, rewritten = write_cached_output(df, output_file, 'channel_revenues', args.format,
+                                                    (module_config(globals()), args.scale_factor), args.cache)
+    print(f"Channel Revenues data saved to {saved_path}")
+    print(f"Partitions rewritten: {rewritten}" + ('' if rewritten else ' (configuration unchanged)'))
     
     # Print summary
     print("\n" + "="*60)
@@ -4,9 +4,13 @@ Monthly expense tracking by category and location.
 """
 
 import random
+import argparse
 from datetime import datetime, timedelta, date as date_module
 from faker import Faker
 import pandas as pd
+from output_writers import add_output_arguments
+from generation_cache import add_cache_argument, module_config, write_cached_output
+from scale_factor import SCALE_FACTOR, add_scale_argument, location_ids
 
 # Initialize Faker
 fake = Faker('en_AU')
@@ -85,8 +89,13 @@ EXPENSE_CATEGORIES = {
 LOCATIONS = ['LOC-001', 'LOC-002', 'LOC-003', 'LOC-004']
 
 
-def generate_company_expenses():
-    """Generate company expenses data."""
+def generate_company_expenses(scale_factor=SCALE_FACTOR):
+    """Generate company expenses data.
+    
+    With a scale factor, rent is charged for every scaled location and the
+    company-wide expense items grow in proportion to the number of stores.
+    """
+    rent_items = [f"Store Rent - {location}" for location in location_ids(scale_factor)]
     months = get_months_list(START_DATE.date(), END_DATE.date())
     expenses_data = []
     
@@ -97,7 +106,7 @@ def generate_company_expenses():
         for category, category_data in EXPENSE_CATEGORIES.items():
             # Rent is per location
             if category == 'Rent':
-                for item in category_data['items']:
+                for item in rent_items:
                     location = item.split(' - ')[-1]
                     base_amount = random.uniform(*category_data['base_amount_range'])
                     variation = base_amount * random.uniform(-category_data['variation'], category_data['variation'])
@@ -120,7 +129,7 @@ def generate_company_expenses():
                     
                     base_amount = random.uniform(*category_data['base_amount_range'])
                     variation = base_amount * random.uniform(-category_data['variation'], category_data['variation'])
-                    expense_value = round(base_amount + variation, 2)
+                    expense_value = round((base_amount + variation) * scale_factor, 2)
                     
                     expenses_data.append({
                         'Month': month_str,
@@ -132,13 +141,23 @@ def generate_company_expenses():
     return expenses_data
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate company expenses data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_cache_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main function to generate and save company expenses data."""
+    args = parse_args()
     print("Generating Company Expenses data...")
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}\n")
     
     # Generate expenses
-    expenses_data = generate_company_expenses()
+    expenses_data = generate_company_expenses(args.scale_factor)
     
     # Create DataFrame
     df = pd.DataFrame(expenses_data)
@@ -148,10 +167,13 @@ def main():
     df = df.sort_values(['Month_dt', 'Expense Category', 'Expense Items']).reset_index(drop=True)
     df = df.drop('Month_dt', axis=1)
     
-    # Save to CSV
+    # Save to CSV (or Parquet)
     output_file = '../financial/company_expenses.csv'
-    df.to_csv(output_file, index=False)
-    print(f"Company Expenses data saved to {output_file}")
+    # Partitions (months/years) whose configuration is unchanged keep the rows already written
+    saved_path, df, rewritten = write_cached_output(df, output_file, 'company_expenses', args.format,
+                                                    (module_config(globals()), args.scale_factor), args.cache)
+    print(f"Company Expenses data saved to {saved_path}")
+    print(f"Partitions rewritten: {rewritten}" + ('' if rewritten else ' (configuration unchanged)'))
     
     # Print summary
     print("\n" + "="*60)
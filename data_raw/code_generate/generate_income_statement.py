@@ -4,8 +4,12 @@ Monthly aggregated revenue and expenses.
 """
 
 import random
+import argparse
 from datetime import datetime, timedelta, date as date_module
 import pandas as pd
+from output_writers import add_output_arguments
+from generation_cache import add_cache_argument, module_config, write_cached_output
+from scale_factor import add_scale_argument, scale_values
 
 # Configuration
 START_DATE = datetime(2025, 10, 1)
@@ -165,10 +169,20 @@ def generate_income_statement_data():
     return income_data
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate income statement data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_cache_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main function to generate and save income statement data."""
+    args = parse_args()
     print("Generating Income Statement Data...")
-    print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {today.strftime('%Y-%m-%d')}\n")
+    print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}\n")
     
     # Generate data
     income_data = generate_income_statement_data()
@@ -181,10 +195,16 @@ def main():
     df = df.sort_values(['Month_dt', 'Expense Category', 'Expense Items']).reset_index(drop=True)
     df = df.drop('Month_dt', axis=1)
     
-    # Save to CSV
+    # Values grow with the number of stores (--scale-factor)
+    df['Expense Values'] = scale_values(df['Expense Values'], args.scale_factor)
+    
+    # Save to CSV (or Parquet)
     output_file = '../financial/income_statement_data.csv'
-    df.to_csv(output_file, index=False)
-    print(f"Income Statement Data saved to {output_file}")
+    # Partitions (months/years) whose configuration is unchanged keep the rows already written
+    saved_path, df, rewritten = write_cached_output(df, output_file, 'income_statement', args.format,
+                                                    (module_config(globals()), args.scale_factor), args.cache)
+    print(f"Income Statement Data saved to {saved_path}")
+    print(f"Partitions rewritten: {rewritten}" + ('' if rewritten else ' (configuration unchanged)'))
     
     # Print summary
     print("\n" + "="*60)
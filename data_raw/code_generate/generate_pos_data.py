@@ -4,11 +4,29 @@ Generates 3 months of data (65 operating days, Monday-Friday only).
 Target: ~50,000 transactions, ~$675,000 AUD total sales.
 """
 
+import os
 import random
 import json
+import argparse
+import bisect
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, date as date_module
 from faker import Faker
+import numpy as np
 import pandas as pd
+from menu_catalog import MenuCatalog
+from compact_ids import SHARD_BITS, encode_ids
+from output_writers import (ROLL_ROWS, WRITER_THREADS, BackgroundWriter, add_output_arguments, add_writer_arguments,
+                            clear_dataset, output_path, parquet_path, write_output)
+from generator_state import load_state, save_state, next_operating_days
+from scale_factor import (SCALE_FACTOR, STORES_PER_COPY, EMPLOYEES_PER_COPY, add_scale_argument,
+                          base_location, location_ids, scale_id, split_id)
+from summary_stats import PosSummary, write_report
+from roster_index import ROSTER_PATH, RosterIndex, load_roster_index, read_roster
+from coverage_index import CoverageIndex
+from generation_cache import PartitionManifest, add_cache_argument, fingerprint, remove_partitions
 
 # Initialize Faker
 fake = Faker('en_AU')  # Australian locale for realistic names
@@ -37,7 +55,39 @@ LOCATIONS = {
     'LOC-004': {'weight': 0.10, 'target_sales': 67500}    # 10%
 }
 
-# Employee shifts
+# Daily transactions per location (updated distribution: 0.5, 0.2, 0.2, 0.1);
+# copies added by --scale-factor use the counts of the base location they were copied from
+TRANSACTIONS_PER_LOCATION = {
+    'LOC-001': 385,  # 50% - Flagship location
+    'LOC-002': 154,  # 20%
+    'LOC-003': 154,  # 20%
+    'LOC-004': 77   # 10%
+}
+
+# Generation engine: 'numpy' (vectorized day batches) or 'python' (one transaction at a time)
+ENGINE = 'numpy'
+RANDOM_SEED = None  # Set an int for reproducible output
+WORKERS = 1  # Processes for the numpy engine (output is identical for any worker count)
+STREAM_OUTPUT = False  # Write day by day instead of building the full DataFrame (numpy engine only)
+APPEND_DAYS = 1  # Operating days added by each --append run
+CUSTOMER_NAME_POOL_SIZE = 2000  # Regular customers; Faker first names are drawn once per run
+CUSTOMER_ZIPF_EXPONENT = None  # e.g. 1.1 for Zipf-like repeat customers (None = every customer equally likely)
+ID_SCHEME = 'legacy'  # 'legacy' (TXN-YYYYMMDD-NNNN / ORD-NNNN strings) or 'compact' (64-bit keys, see compact_ids.py)
+ID_SHARD = 0  # Shard field of compact keys: give independent generator runs for the same days different shards
+
+# Stress mode (--skew, numpy engine): hot keys for testing joins, aggregations and visuals
+SKEW_PROFILE = {
+    'mega_store_share': 0.70,  # Share of the network's daily transactions rung up at LOC-001 (others keep their ratios)
+    'hot_variation': 'Flat White',  # Variation that dominates line items
+    'hot_variation_share': 0.60,  # Share of line items redrawn as the hot variation
+    'hot_customers': 5,  # Regulars: the first N names of the customer pool
+    'hot_customer_share': 0.50,  # Share of named transactions made by the regulars
+    'burst_minutes': 3,  # Burst minutes per store-day
+    'burst_share': 0.25  # Share of each store-day's arrivals packed into its burst minutes (Batch/Filter excluded)
+}
+
+# Employee shifts (used when no roster is available; otherwise sales go to the
+# Barista/Front of House staff rostered at the location at the time of the sale)
 EMPLOYEES = {
     'EMP-001': {'shift': 'morning'},
     'EMP-002': {'shift': 'morning'},
@@ -77,6 +127,14 @@ ICED_DRINKS_ITEM_WEIGHTS = {
     'Iced Tea': 5          # Lowest
 }
 
+# Items and variations sold without milk
+NO_MILK_ITEMS = ['Iced Juice', 'Iced Tea', 'Hot Tea']
+NO_MILK_VARIATIONS = ['Espresso', 'Long Black', 'Batch/Filter Coffee']
+MILK_VALUES = [milk for milk in MILK_TYPES if milk is not None]
+
+# Long Machiato modifier weights (higher weight for "Topped up")
+LONG_MACHIATO_MODIFIER_WEIGHTS = [5, 3, 2, 2, 1]
+
 # Menu structure with category mapping
 # category_name: "Hot Drinks", "Iced Drinks", "Food"
 MENU = {
@@ -227,87 +285,93 @@ def get_operating_days(start_date, end_date):
     return operating_days
 
 
-def get_menu_item():
-    """Randomly select a menu item with all its properties based on category distribution."""
-    # First, select category based on distribution
-    category_name = random.choices(
-        list(CATEGORY_DISTRIBUTION.keys()),
-        weights=list(CATEGORY_DISTRIBUTION.values())
-    )[0]
-    
-    # Then, select an item from that category (with weights for Iced Drinks)
-    items_in_category = [key for key, data in MENU.items() 
-                         if data['category_name'] == category_name]
-    
-    if category_name == 'Iced Drinks':
-        # Use weighted selection for Iced Drinks items
-        weights = [ICED_DRINKS_ITEM_WEIGHTS.get(key, 1) for key in items_in_category]
-        item_key = random.choices(items_in_category, weights=weights)[0]
-    else:
-        item_key = random.choice(items_in_category)
-    
+def get_modifier_options(item_key, variation):
+    """Return the modifier lists and weights a variation is sold with."""
     menu_data = MENU[item_key]
-    
-    item_name = menu_data['item_name']
-    
-    # Select variation (with weights if specified)
-    if 'variation_weights' in menu_data and menu_data['variation_weights'] is not None:
-        variation = random.choices(
-            menu_data['variations'],
-            weights=menu_data['variation_weights']
-        )[0]
-    else:
-        variation = random.choice(menu_data['variations'])
-    
-    # Batch/Filter Coffee has no size
-    if variation == 'Batch/Filter Coffee':
-        size = None
-    else:
-        size = random.choice(menu_data['sizes'])
-    
-    # Get milk type
-    if category_name in ['Hot Drinks', 'Iced Drinks']:
-        # Espresso, Long Black, and Batch/Filter Coffee don't have milk
-        if item_key in ['Iced Juice', 'Iced Tea', 'Hot Tea'] or variation in ['Espresso', 'Long Black', 'Batch/Filter Coffee']:
-            milk_type = None
-        else:
-            milk_type = random.choices(
-                list(MILK_TYPES.keys())[:-1],  # Exclude None
-                weights=[MILK_TYPES[k] for k in list(MILK_TYPES.keys())[:-1]]
-            )[0]
-    else:
-        milk_type = None
-    
-    # Get modifiers
     if item_key == 'Hot Coffee':
         if variation == 'Long Machiato':
             # Long Machiato should prefer "Topped up" modifier
-            modifiers = random.choices(
-                menu_data['modifiers']['long_machiato_preferred'],
-                weights=[5, 3, 2, 2, 1]  # Higher weight for "Topped up"
-            )[0]
-        elif 'Machiato' in variation:
-            modifiers = random.choice(menu_data['modifiers']['machiatos'])
+            return menu_data['modifiers']['long_machiato_preferred'], LONG_MACHIATO_MODIFIER_WEIGHTS
+        if 'Machiato' in variation:
+            options = menu_data['modifiers']['machiatos']
         else:
-            modifiers = random.choice(menu_data['modifiers']['default'])
-    elif item_key in ['Iced Coffee', 'Signature Beverage']:
-        modifiers = random.choice(menu_data['modifiers'])
-    else:
-        modifiers = []
-    
-    # Variation name is simply the variation (size and milk info are in separate columns)
-    variation_name = variation
-    
-    return {
-        'category_name': category_name,
-        'item_name': item_name,
-        'variation': variation,  # Keep original for order ID generation
-        'variation_name': variation_name,  # Descriptive version
-        'size': size,
-        'milk_type': milk_type,
-        'modifiers': modifiers,
-        'item_key': item_key  # Keep for price calculation
-    }
+            options = menu_data['modifiers']['default']
+        return options, [1] * len(options)
+    if item_key in ['Iced Coffee', 'Signature Beverage']:
+        return menu_data['modifiers'], [1] * len(menu_data['modifiers'])
+    return [[]], [1]
+
+
+def compile_menu_catalog():
+    """Flatten MENU into a MenuCatalog of every sellable SKU and its joint probability.
+    
+    P(sku) = P(category) * P(item | category) * P(variation | item)
+             * P(size | variation) * P(milk | variation) * P(modifiers | variation)
+    """
+    milk_weights = np.array([MILK_TYPES[milk] for milk in MILK_VALUES], dtype=float)
+    milk_weights /= milk_weights.sum()
+    
+    skus = []
+    for category_name, category_weight in CATEGORY_DISTRIBUTION.items():
+        # Items in the category (weighted for Iced Drinks, uniform otherwise)
+        items_in_category = [key for key, data in MENU.items() 
+                             if data['category_name'] == category_name]
+        if category_name == 'Iced Drinks':
+            item_weights = np.array([ICED_DRINKS_ITEM_WEIGHTS.get(key, 1) for key in items_in_category], dtype=float)
+        else:
+            item_weights = np.ones(len(items_in_category))
+        item_weights /= item_weights.sum()
+        
+        for item_key, item_weight in zip(items_in_category, item_weights):
+            menu_data = MENU[item_key]
+            
+            # Variations (with weights if specified)
+            variation_weights = np.array(menu_data.get('variation_weights') or [1] * len(menu_data['variations']), dtype=float)
+            variation_weights /= variation_weights.sum()
+            
+            for variation, variation_weight in zip(menu_data['variations'], variation_weights):
+                # Batch/Filter Coffee has no size
+                sizes = [None] if variation == 'Batch/Filter Coffee' else menu_data['sizes']
+                
+                # Juices, teas, Espresso, Long Black and Batch/Filter Coffee don't have milk
+                if (category_name in ['Hot Drinks', 'Iced Drinks'] and item_key not in NO_MILK_ITEMS
+                        and variation not in NO_MILK_VARIATIONS):
+                    milks = list(zip(MILK_VALUES, milk_weights))
+                else:
+                    milks = [(None, 1.0)]
+                
+                modifier_options, modifier_weights = get_modifier_options(item_key, variation)
+                modifier_total = sum(modifier_weights)
+                
+                base_weight = category_weight * item_weight * variation_weight / len(sizes)
+                for size in sizes:
+                    for milk_type, milk_weight in milks:
+                        for modifiers, modifier_weight in zip(modifier_options, modifier_weights):
+                            skus.append({
+                                'category_name': category_name,
+                                'item_key': item_key,
+                                'item_name': menu_data['item_name'],
+                                'variation': variation,
+                                'size': size,
+                                'milk_type': milk_type,
+                                'modifiers': modifiers,
+                                'price_range': menu_data['price_ranges'][size],
+                                'probability': base_weight * milk_weight * modifier_weight / modifier_total
+                            })
+    
+    return MenuCatalog(skus)
+
+
+MENU_CATALOG = compile_menu_catalog()
+
+
+def get_menu_item():
+    """Randomly select a menu item with all its properties based on category distribution.
+    
+    Keys: category_name, item_name, variation, variation_name, size, milk_type,
+    modifiers, item_key, plus the precomputed order_prefix and modifiers_json.
+    """
+    return MENU_CATALOG.records[MENU_CATALOG.sample_one(random)]
 
 
 def calculate_price(item_key, variation, size):
@@ -323,8 +387,18 @@ def calculate_price(item_key, variation, size):
     return round(random.uniform(price_range[0], price_range[1]), 2)
 
 
-def get_employee_for_time(datetime_obj, location_id):
-    """Assign employee based on time of day and location."""
+def get_employee_for_time(datetime_obj, location_id, roster=None):
+    """Assign employee based on time of day and location.
+    
+    With a RosterIndex, the employee is drawn from the staff rostered at the
+    location at that time (or that day).
+    """
+    if roster is not None:
+        location_code = int(location_id.rsplit('-', 1)[1]) - 1
+        employee_code = roster.assign([location_code], [np.datetime64(datetime_obj, 's')], [random.random()])[0]
+        if employee_code >= 0:
+            return f"EMP-{employee_code + 1:03d}"
+    
     hour = datetime_obj.hour
     
     # Morning shift: 6:30 AM - 12:00 PM
@@ -340,7 +414,11 @@ def get_employee_for_time(datetime_obj, location_id):
         available = [eid for eid, data in EMPLOYEES.items() 
                     if data['shift'] in ['afternoon', 'all-day']]
     
-    return random.choice(available) if available else 'EMP-001'
+    employee_id = random.choice(available) if available else 'EMP-001'
+    
+    # Scaled networks: staff come from the same copy as the location (LOC-005 -> EMP-020...)
+    copy = split_id(location_id, STORES_PER_COPY)[1]
+    return scale_id(employee_id, copy, EMPLOYEES_PER_COPY)
 
 
 def generate_transaction_datetime(date, peak_hour_weight=0.4, is_batch_filter=False):
@@ -387,8 +465,12 @@ def generate_transaction_datetime(date, peak_hour_weight=0.4, is_batch_filter=Fa
     return datetime(date.year, date.month, date.day, hour, minute, second)
 
 
-def generate_transaction(transaction_id, date, location_id, order_counter):
-    """Generate a single transaction with 1-3 items."""
+def generate_transaction(transaction_id, date, location_id, order_counter, customer_pool=None, roster=None):
+    """Generate a single transaction with 1-3 items.
+
+    customer_pool is a (names, cumulative weights) pair from get_customer_pool();
+    roster is an optional RosterIndex for employee assignment.
+    """
     # Determine number of items: 70% single, 25% double, 5% triple+
     items_count_rand = random.random()
     if items_count_rand < 0.70:
@@ -414,8 +496,12 @@ def generate_transaction(transaction_id, date, location_id, order_counter):
     # Generate transaction datetime based on whether Batch/Filter Coffee is included
     transaction_datetime = generate_transaction_datetime(date, is_batch_filter=has_batch_filter)
     
-    # Generate customer name (15% null)
-    customer_name = None if random.random() < 0.15 else fake.first_name()
+    # Generate customer name (15% null) from the pre-generated pool
+    if random.random() < 0.15:
+        customer_name = None
+    else:
+        names, cdf = customer_pool or get_customer_pool()
+        customer_name = names[bisect.bisect_right(cdf, random.random())]
     
     # Payment method
     payment_method = random.choices(
@@ -424,7 +510,7 @@ def generate_transaction(transaction_id, date, location_id, order_counter):
     )[0]
     
     # Employee
-    employee_id = get_employee_for_time(transaction_datetime, location_id)
+    employee_id = get_employee_for_time(transaction_datetime, location_id, roster)
     
     # Second pass: create line items with the generated datetime
     for item in items_list:
@@ -432,14 +518,10 @@ def generate_transaction(transaction_id, date, location_id, order_counter):
         unit_price = calculate_price(item['item_key'], item['variation'], item['size'])
         line_total = round(unit_price * quantity, 2)
         
-        # Create order ID - format: ORD-{VARIATION}-####
-        variation_clean = item['variation'].upper().replace(' ', '').replace('&', '').replace('-', '').replace('/', '')
-        order_id = f"ORD-{variation_clean}-{order_id_base:04d}"
+        # Create order ID - format: ORD-{VARIATION}-#### (prefix precomputed by the catalog)
+        order_id = f"{item['order_prefix']}{order_id_base:04d}"
         order_id_base += 1
         
-        # Format modifiers as JSON string
-        modifiers_json = json.dumps(item['modifiers'])
-        
         line_items.append({
             'transaction_id': transaction_id,
             'order_id': order_id,
@@ -452,7 +534,7 @@ def generate_transaction(transaction_id, date, location_id, order_counter):
             'quantity': quantity,
             'unit_price': unit_price,
             'line_total': line_total,
-            'modifiers': modifiers_json,
+            'modifiers': item['modifiers_json'],
             'employee_id': employee_id,
             'payment_method': payment_method,
             'customer_name': customer_name,
@@ -462,66 +544,830 @@ def generate_transaction(transaction_id, date, location_id, order_counter):
     return line_items, order_id_base
 
 
-def generate_all_transactions():
-    """Generate all transactions for the specified period."""
+def generate_all_transactions(customer_pool=None, scale_factor=SCALE_FACTOR, summary=None, roster=None):
+    """Generate all transactions for the specified period (added to a PosSummary as they are drawn).
+    
+    roster is an optional RosterIndex; sales are then attributed to staff on shift.
+    """
     operating_days = get_operating_days(START_DATE, END_DATE)
     
     all_transactions = []
     transaction_counter = 1
     order_counter = 1
     
-    # Calculate transactions per location per day (updated distribution: 0.5, 0.2, 0.2, 0.1)
-    transactions_per_location = {
-        'LOC-001': 385,  # 50% - Flagship location
-        'LOC-002': 154,  # 20%
-        'LOC-003': 154,  # 20%
-        'LOC-004': 77   # 10%
-    }
-    
     for date in operating_days:
-        for location_id, daily_count in transactions_per_location.items():
-            for _ in range(daily_count):
+        for location_id in location_ids(scale_factor):
+            for _ in range(TRANSACTIONS_PER_LOCATION[base_location(location_id)]):
                 # Generate transaction ID
                 date_str = date.strftime('%Y%m%d')
                 transaction_id = f"TXN-{date_str}-{transaction_counter:04d}"
                 
                 # Generate transaction
                 line_items, order_counter = generate_transaction(
-                    transaction_id, date, location_id, order_counter
+                    transaction_id, date, location_id, order_counter, customer_pool, roster
                 )
                 all_transactions.extend(line_items)
+                if summary is not None:
+                    summary.add_transaction(line_items)
                 
                 transaction_counter += 1
     
     return all_transactions
 
 
+# ============================================================
+# Vectorized (numpy) engine
+# ============================================================
+
+# Value lookups for integer codes (code -1 decodes to None); employee codes are the
+# employee number minus one, so EMP-{19c + n} of every copy and rostered staff share one code space
+EMPLOYEE_IDS = [f"EMP-{n:03d}" for n in range(1, EMPLOYEES_PER_COPY + 1)]
+BATCH_FILTER_VARIATION = MENU_CATALOG.variations.index('Batch/Filter Coffee')
+
+# Intraday arrival intensity for the numpy engine: (time of day, relative arrival rate per
+# minute), linear in between; a repeated time is a step. Arrivals are a non-homogeneous
+# Poisson process over each store-day. The default curve is calibrated to the python
+# engine's hourly bands: 40% 8-10 AM, 30% 12-2 PM and 6% in each of 6:30-7, 7-8, 10-11,
+# 11-12 and 2:00-2:30:59 PM (rate = band share / band minutes).
+INTRADAY_INTENSITY = [
+    ('06:30', 6 / 30), ('07:00', 6 / 30),
+    ('07:00', 6 / 60), ('08:00', 6 / 60),
+    ('08:00', 40 / 120), ('10:00', 40 / 120),  # Morning peak
+    ('10:00', 6 / 60), ('12:00', 6 / 60),
+    ('12:00', 30 / 120), ('14:00', 30 / 120),  # Lunch peak
+    ('14:00', 6 / 31), ('14:31', 6 / 31)
+]
+# Arrival windows as (first minute, end minute), end exclusive
+TRADING_WINDOW = ('06:30', '14:31')  # 6:30:00 AM - 2:30:59 PM
+BATCH_FILTER_WINDOW = ('08:15', '13:46')  # Batch/Filter Coffee: 8:15:00 AM - 1:45:59 PM
+
+# Compact column types for integer-coded batches (strings are only decoded at write time)
+BATCH_DTYPES = {
+    'transaction_number': np.int32,
+    'order_number': np.int32,
+    'transaction_key': np.int64,  # Compact IDs only
+    'order_key': np.int64,  # Compact IDs only
+    'transaction_datetime': 'datetime64[s]',
+    'sku_code': np.int16,
+    'quantity': np.int8,
+    'unit_price': np.float32,
+    'line_total': np.float32,
+    'employee_code': np.int32,
+    'payment_code': np.int8,
+    'customer_code': np.int32,
+    'location_code': np.int32
+}
+DECODE_CHUNK_ROWS = 100000  # Line items decoded to strings at a time when writing a full-period batch
+
+POS_COLUMNS = ['transaction_id', 'order_id', 'transaction_datetime', 'category_name', 'item_name',
+               'variation_name', 'size', 'milk_type', 'quantity', 'unit_price', 'line_total',
+               'modifiers', 'employee_id', 'payment_method', 'customer_name', 'location_id']
+
+
+def build_customer_name_pool(seed=None, size=CUSTOMER_NAME_POOL_SIZE):
+    """Draw a fixed pool of customer first names so Faker is never called per transaction."""
+    pool_fake = Faker('en_AU')
+    pool_fake.seed_instance(seed)
+    return [pool_fake.first_name() for _ in range(size)]
+
+
+@lru_cache(maxsize=None)
+def customer_cdf(size=CUSTOMER_NAME_POOL_SIZE, zipf_exponent=CUSTOMER_ZIPF_EXPONENT):
+    """Cumulative visit weights for the customer pool (customer k has weight 1 / k**zipf_exponent)."""
+    if zipf_exponent is None:
+        weights = np.ones(size)
+    else:
+        weights = 1.0 / np.arange(1, size + 1) ** zipf_exponent
+    cdf = np.cumsum(weights) / weights.sum()
+    cdf[-1] = 1.0
+    return cdf
+
+
+@lru_cache(maxsize=None)
+def get_customer_pool(seed=None, size=CUSTOMER_NAME_POOL_SIZE, zipf_exponent=CUSTOMER_ZIPF_EXPONENT):
+    """Customer names and cumulative weights for the python engine, built once per process."""
+    return build_customer_name_pool(seed, size), customer_cdf(size, zipf_exponent)
+
+
+def draw_customers(rng, n, size=CUSTOMER_NAME_POOL_SIZE, zipf_exponent=CUSTOMER_ZIPF_EXPONENT):
+    """Vectorized customer draws: pool index per transaction, -1 (no name) for 15%."""
+    customer = np.searchsorted(customer_cdf(size, zipf_exponent), rng.random(n), side='right')
+    return np.where(rng.random(n) < 0.15, -1, customer)
+
+
+def minute_of_day(time_text):
+    """'HH:MM' -> minutes after midnight."""
+    hour, minute = time_text.split(':')
+    return int(hour) * 60 + int(minute)
+
+
+@lru_cache(maxsize=None)
+def arrival_cdf(window):
+    """Minute edges and cumulative arrival share over a window, from INTRADAY_INTENSITY."""
+    edges = np.arange(minute_of_day(window[0]), minute_of_day(window[1]) + 1)
+    knots = np.array([minute_of_day(time_text) for time_text, _ in INTRADAY_INTENSITY])
+    rates = np.array([rate for _, rate in INTRADAY_INTENSITY])
+    intensity = np.interp(edges[:-1] + 0.5, knots, rates)
+    cdf = np.concatenate([[0.0], np.cumsum(intensity)])
+    return edges, cdf / cdf[-1]
+
+
+def sorted_uniforms(rng, group_sizes):
+    """Ascending U(0, 1) draws for consecutive groups of the given sizes, without sorting.
+    
+    The partial sums of n + 1 exponential gaps, divided by their total, are
+    distributed as the order statistics of n uniforms.
+    """
+    group_sizes = np.asarray(group_sizes, dtype=np.int64)
+    group_ends = np.cumsum(group_sizes + 1)
+    totals = np.cumsum(rng.exponential(size=int(group_ends[-1]) if len(group_ends) else 0))
+    group_total = totals[group_ends - 1]
+    group_offset = np.concatenate([[0.0], group_total[:-1]])
+    keep = np.ones(len(totals), dtype=bool)
+    keep[group_ends - 1] = False
+    group = np.repeat(np.arange(len(group_sizes)), group_sizes)
+    return (totals[keep] - group_offset[group]) / (group_total - group_offset)[group]
+
+
+def draw_arrival_seconds(rng, group_sizes, window=TRADING_WINDOW, bursts=None):
+    """Arrival times (seconds after midnight) of a non-homogeneous Poisson process.
+    
+    Given the number of arrivals in each group (store-day), their times are
+    ordered draws from INTRADAY_INTENSITY over the window: sorted uniforms
+    pushed through the inverse cumulative intensity, so every group comes
+    back in ascending order. bursts (a SKEW_PROFILE) moves burst_share of the
+    intensity into burst_minutes random minutes per group.
+    """
+    edges, cdf = arrival_cdf(window)
+    uniforms = sorted_uniforms(rng, group_sizes)
+    if bursts is None:
+        minutes = np.interp(uniforms, cdf, edges)
+    else:
+        # One cumulative curve per group, offset by 2 * group so a single interp covers every group
+        n_groups = len(group_sizes)
+        burst_group = np.repeat(np.arange(n_groups), bursts['burst_minutes'])
+        burst_minute = rng.integers(0, len(edges) - 1, len(burst_group))
+        burst_mass = np.zeros((n_groups, len(edges)))
+        np.add.at(burst_mass, (burst_group, burst_minute + 1), 1.0 / bursts['burst_minutes'])
+        group_cdf = (1 - bursts['burst_share']) * cdf + bursts['burst_share'] * np.cumsum(burst_mass, axis=1)
+        group_cdf += 2 * np.arange(n_groups)[:, None]
+        group = np.repeat(np.arange(n_groups), group_sizes)
+        minutes = np.interp(uniforms + 2 * group, group_cdf.ravel(), np.tile(edges, n_groups))
+    return np.minimum(np.floor(minutes * 60), edges[-1] * 60 - 1).astype(np.int64)
+
+
+def daily_transaction_counts(scale_factor=SCALE_FACTOR, skew=None):
+    """Transactions per day for every location code.
+    
+    In stress mode LOC-001 takes skew['mega_store_share'] of the network total and
+    the other locations split the rest in their usual ratios.
+    """
+    counts = np.array([TRANSACTIONS_PER_LOCATION[base_location(location_id)]
+                       for location_id in location_ids(scale_factor)])
+    if skew is None:
+        return counts
+    total = counts.sum()
+    mega_store = int(round(total * skew['mega_store_share']))
+    share = counts[1:] * (total - mega_store) / counts[1:].sum()
+    others = np.floor(share).astype(int)
+    others[np.argsort(others - share, kind='stable')[:total - mega_store - others.sum()]] += 1  # Largest remainders
+    return np.concatenate([[mega_store], others])
+
+
+def draw_item_counts(rng, n_txn):
+    """Number of items per transaction: 70% single, 25% double, 5% triple+."""
+    items_count_rand = rng.random(n_txn)
+    return np.where(items_count_rand < 0.70, 1,
+                    np.where(items_count_rand < 0.95, 2, rng.integers(3, 5, n_txn)))
+
+
+def generate_transaction_batch(rng, dates, transaction_start=1, order_start=1, n_customer_names=CUSTOMER_NAME_POOL_SIZE,
+                               location_codes=None, num_items=None, customer_zipf=CUSTOMER_ZIPF_EXPONENT, roster=None,
+                               daily_counts=None, skew=None, id_shard=None):
+    """Draw every transaction for the given operating days as integer-coded numpy arrays.
+    
+    Transactions are numbered in blocks day by day and location by location,
+    like generate_all_transactions(), and in arrival order within each block;
+    line items come back sorted by transaction_datetime. Code -1 means None.
+    location_codes restricts the batch to some locations (indexes into
+    scale_factor.location_ids(), default: the base network), daily_counts
+    overrides their transactions per day and num_items supplies pre-drawn item
+    counts per transaction. With a RosterIndex, each sale goes to a
+    Barista/Front of House rostered at the location at that time
+    (morning/afternoon EMPLOYEES where nobody is). skew is a SKEW_PROFILE dict
+    for stress mode (hot variation, regular customers, burst minutes). With an
+    id_shard, compact 64-bit transaction_key/order_key columns are added; their
+    sequences count from 1 per store-day, so they need no offsets.
+    """
+    catalog = MENU_CATALOG
+    if location_codes is None:
+        location_codes = range(len(TRANSACTIONS_PER_LOCATION))
+    location_codes = np.asarray(location_codes)
+    if daily_counts is None:
+        daily_counts = np.array(list(TRANSACTIONS_PER_LOCATION.values()))[location_codes % STORES_PER_COPY]
+    daily_counts = np.asarray(daily_counts)
+    n_days = len(dates)
+    
+    # Transaction level: day and location, day-major then location-major
+    txn_location = np.tile(np.repeat(location_codes, daily_counts), n_days)
+    txn_day = np.repeat(np.arange(n_days), daily_counts.sum())
+    n_txn = len(txn_day)
+    
+    if num_items is None:
+        num_items = draw_item_counts(rng, n_txn)
+    line_txn = np.repeat(np.arange(n_txn), num_items)
+    n_lines = len(line_txn)
+    
+    # Line level: SKU (menu item, size, milk, modifiers), quantity and price
+    sku = catalog.sample(rng, n_lines)
+    if skew is not None:
+        hot = rng.random(n_lines) < skew['hot_variation_share']
+        sku[hot] = catalog.sample_variation(rng, skew['hot_variation'], int(hot.sum()))
+    quantity = np.where(rng.random(n_lines) < 0.80, 1, 2)
+    price_low = catalog.price_low[sku]
+    price_high = catalog.price_high[sku]
+    unit_price = np.round(price_low + (price_high - price_low) * rng.random(n_lines), 2)
+    line_total = np.round(unit_price * quantity, 2)
+    
+    # Transaction level: arrival time per store-day (Batch/Filter Coffee narrows the window).
+    # Each class comes back in time order, so merging the two gives the store-day's sequence.
+    has_batch_filter = np.bincount(line_txn, weights=catalog.variation_code[sku] == BATCH_FILTER_VARIATION, minlength=n_txn) > 0
+    store_day = txn_day * len(location_codes) + np.tile(np.repeat(np.arange(len(location_codes)), daily_counts), n_days)
+    n_store_days = n_days * len(location_codes)
+    seconds = np.empty(n_txn, dtype=np.int64)
+    arrival_keys = []
+    for window, txns in ((TRADING_WINDOW, np.flatnonzero(~has_batch_filter)),
+                         (BATCH_FILTER_WINDOW, np.flatnonzero(has_batch_filter))):
+        bursts = skew if skew is not None and window == TRADING_WINDOW else None
+        seconds[txns] = draw_arrival_seconds(rng, np.bincount(store_day[txns], minlength=n_store_days), window, bursts)
+        arrival_keys.append((txns, store_day[txns] * 86400 + seconds[txns]))
+    (regular, regular_key), (batch_filter, batch_filter_key) = arrival_keys
+    arrival_order = np.empty(n_txn, dtype=np.int64)
+    arrival_order[np.searchsorted(batch_filter_key, regular_key, side='left') + np.arange(len(regular))] = regular
+    arrival_order[np.searchsorted(regular_key, batch_filter_key, side='right') + np.arange(len(batch_filter))] = batch_filter
+    day_start = np.array(dates, dtype='datetime64[D]').astype('datetime64[s]')
+    txn_datetime = day_start[txn_day] + seconds.astype('timedelta64[s]')
+    
+    customer = draw_customers(rng, n_txn, n_customer_names, customer_zipf)
+    if skew is not None:
+        regular_customer = (customer >= 0) & (rng.random(n_txn) < skew['hot_customer_share'])
+        customer = np.where(regular_customer, rng.integers(0, min(skew['hot_customers'], n_customer_names), n_txn), customer)
+    payment_cdf = np.cumsum(list(PAYMENT_METHODS.values())) / sum(PAYMENT_METHODS.values())
+    payment = np.minimum(np.searchsorted(payment_cdf, rng.random(n_txn), side='right'), len(payment_cdf) - 1)
+    
+    morning = [EMPLOYEE_IDS.index(eid) for eid, data in EMPLOYEES.items() if data['shift'] in ['morning', 'all-day']]
+    afternoon = [EMPLOYEE_IDS.index(eid) for eid, data in EMPLOYEES.items() if data['shift'] in ['afternoon', 'all-day']]
+    employee = np.where(seconds < 12 * 3600,
+                        np.array(morning)[rng.integers(0, len(morning), n_txn)],
+                        np.array(afternoon)[rng.integers(0, len(afternoon), n_txn)])
+    employee = employee + (txn_location // STORES_PER_COPY) * EMPLOYEES_PER_COPY  # Staff of the location's copy
+    if roster is not None:
+        rostered = roster.assign(txn_location, txn_datetime, rng.random(n_txn))
+        employee = np.where(rostered >= 0, rostered, employee)
+    
+    # Line items in arrival order (transactions keep their items together, in order).
+    # Transaction and order numbers follow arrival order within each store-day block.
+    txn_rank = np.empty(n_txn, dtype=np.int64)
+    txn_rank[arrival_order] = np.arange(n_txn)
+    arrival_items = num_items[arrival_order]
+    first_line = np.cumsum(num_items) - num_items
+    order = np.repeat(first_line[arrival_order] - (np.cumsum(arrival_items) - arrival_items), arrival_items) + np.arange(n_lines)
+    sorted_txn = line_txn[order]
+    if id_shard is not None:
+        # Arrival order is store-day-major: sequences restart at 1 in every store-day
+        store_day_txns = np.bincount(store_day, minlength=n_store_days)
+        store_day_lines = np.bincount(store_day, weights=num_items, minlength=n_store_days).astype(np.int64)
+        line_sequence = np.arange(n_lines) - np.repeat(np.cumsum(store_day_lines) - store_day_lines, store_day_lines) + 1
+        txn_sequence = txn_rank - (np.cumsum(store_day_txns) - store_day_txns)[store_day] + 1
+        txn_date = np.array(dates, dtype='datetime64[D]')[txn_day]
+    line_number = np.arange(n_lines)
+    if len(location_codes) > 1:
+        # Store-days are each in time order; merge locations by time (stable sort over sorted runs)
+        line_number = np.argsort(txn_datetime[sorted_txn], kind='stable')
+        order = order[line_number]
+        sorted_txn = line_txn[order]
+    batch = {
+        'transaction_number': transaction_start + txn_rank[sorted_txn],
+        'order_number': order_start + line_number,
+        'transaction_datetime': txn_datetime[sorted_txn],
+        'sku_code': sku[order],
+        'quantity': quantity[order],
+        'unit_price': unit_price[order],
+        'line_total': line_total[order],
+        'employee_code': employee[sorted_txn],
+        'payment_code': payment[sorted_txn],
+        'customer_code': customer[sorted_txn],
+        'location_code': txn_location[sorted_txn],
+    }
+    if id_shard is not None:
+        batch['transaction_key'] = encode_ids(txn_date[sorted_txn], txn_location[sorted_txn], id_shard,
+                                              txn_sequence[sorted_txn])
+        batch['order_key'] = encode_ids(txn_date[sorted_txn], txn_location[sorted_txn], id_shard,
+                                        line_sequence[line_number])
+    return {key: values.astype(BATCH_DTYPES[key], copy=False) for key, values in batch.items()}
+
+
+def decode_scaled_ids(codes, base_ids, block):
+    """Decode codes into base_ids repeated once per scale-factor copy (code // len(base_ids) is the copy)."""
+    n_copies = int(codes.max()) // len(base_ids) + 1 if len(codes) else 1
+    ids = [scale_id(base_id, copy, block) for copy in range(n_copies) for base_id in base_ids]
+    return np.array(ids, dtype=object)[codes]
+
+
+def decode_labels(column, codes):
+    """Labels for integer codes of one batch column (SKU codes for category_name/item_name)."""
+    if column in ['category_name', 'item_name']:
+        return MENU_CATALOG.decode(column, codes)
+    if column == 'employee_id':
+        return decode_scaled_ids(codes, EMPLOYEE_IDS, EMPLOYEES_PER_COPY)
+    if column == 'location_id':
+        return decode_scaled_ids(codes, list(TRANSACTIONS_PER_LOCATION), STORES_PER_COPY)
+    if column == 'payment_method':
+        return np.array(list(PAYMENT_METHODS), dtype=object)[codes]
+    raise ValueError(f"Unknown batch column: {column}")
+
+
+def decode_money(values):
+    """float32 batch prices back to exact 2-decimal float64 values."""
+    return np.round(values.astype(np.float64), 2)
+
+
+def batch_to_dataframe(batch, customer_names):
+    """Decode an integer-coded batch into the pos_0.csv column layout.
+    
+    Batches with compact keys keep them as integers in transaction_id/order_id.
+    """
+    catalog = MENU_CATALOG
+    sku = batch['sku_code']
+    if 'transaction_key' in batch:
+        transaction_ids, order_ids = batch['transaction_key'], batch['order_key']
+    else:
+        date_str = np.datetime_as_string(batch['transaction_datetime'], unit='D')
+        transaction_ids = [f"TXN-{d.replace('-', '')}-{n:04d}" for d, n in zip(date_str, batch['transaction_number'])]
+        order_ids = [f"{prefix}{n:04d}" for prefix, n in zip(catalog.decode('order_prefix', sku), batch['order_number'])]
+    
+    df = pd.DataFrame({
+        'transaction_id': transaction_ids,
+        'order_id': order_ids,
+        'transaction_datetime': batch['transaction_datetime'],
+        'category_name': catalog.decode('category_name', sku),
+        'item_name': catalog.decode('item_name', sku),
+        'variation_name': catalog.decode('variation_name', sku),
+        'size': catalog.decode('size', sku),
+        'milk_type': catalog.decode('milk_type', sku),
+        'quantity': batch['quantity'],
+        'unit_price': decode_money(batch['unit_price']),
+        'line_total': decode_money(batch['line_total']),
+        'modifiers': catalog.decode('modifiers', sku),
+        'employee_id': decode_labels('employee_id', batch['employee_code']),
+        'payment_method': decode_labels('payment_method', batch['payment_code']),
+        'customer_name': np.array(list(customer_names) + [None], dtype=object)[batch['customer_code']],
+        'location_id': decode_labels('location_id', batch['location_code']),
+    })
+    return df[POS_COLUMNS]
+
+
+def split_batch(batch, rows=DECODE_CHUNK_ROWS):
+    """Yield consecutive slices of a batch with at most `rows` line items each."""
+    n_lines = len(batch['quantity'])
+    for start in range(0, n_lines, rows):
+        yield {key: values[start:start + rows] for key, values in batch.items()}
+
+
+def write_batches(batches, customer_names, output_file, output_format='csv', summary=None, clear=True,
+                  compression='none', threads=WRITER_THREADS, roll_rows=ROLL_ROWS):
+    """Decode batches and write them to one CSV (or rolling CSVs, or a Parquet dataset).
+    
+    Decoding to strings, encoding and compression run on a BackgroundWriter while
+    the next batch is generated; at most WRITER_QUEUE_SIZE batches wait as integer
+    columns. Each batch is added to `summary` as it is queued. Returns the
+    (transaction, order) numbers following the last batch, or (None, None) if
+    there were no batches. clear=False adds partitions to an existing Parquet dataset.
+    """
+    next_numbers = (None, None)
+    if output_format == 'parquet' and clear:
+        clear_dataset(parquet_path(output_file))
+    
+    with BackgroundWriter(output_file, 'pos', output_format, compression, threads, roll_rows=roll_rows,
+                          convert=lambda batch: batch_to_dataframe(batch, customer_names)) as writer:
+        for batch in batches:
+            writer.submit(batch, rows=len(batch['quantity']))
+            if summary is not None:
+                summary.add_batch(batch)
+            if len(batch['quantity']):
+                next_numbers = (int(batch['transaction_number'].max()) + 1, int(batch['order_number'].max()) + 1)
+    return next_numbers
+
+
+def concat_batches(batches):
+    """Concatenate batches and stable-sort the line items by transaction_datetime.
+    
+    Every shard is already in time order, so the stable sort (timsort) only
+    merges the sorted runs.
+    """
+    batch = {key: np.concatenate([b[key] for b in batches]) for key in batches[0]}
+    order = np.argsort(batch['transaction_datetime'], kind='stable')
+    return {key: values[order] for key, values in batch.items()}
+
+
+def plan_shards(operating_days, seed=RANDOM_SEED, n_customer_names=CUSTOMER_NAME_POOL_SIZE,
+                transaction_start=1, order_start=1, customer_zipf=CUSTOMER_ZIPF_EXPONENT, scale_factor=SCALE_FACTOR,
+                roster=None, skew=None, id_shard=None):
+    """Yield one shard per operating day (every location) for the numpy engine.
+    
+    Every shard gets its own RNG stream derived from the master seed and the
+    shard's date, so output does not depend on how shards are scheduled. A shard
+    covers all locations of its day, so the fixed cost of a generate_transaction_batch()
+    call is paid once per day rather than once per store-day. Item counts are
+    drawn up front from a separate stream so that transaction and order ID offsets
+    are known before any shard runs. With a RosterIndex, each shard carries the
+    shifts of its own day; skew (a SKEW_PROFILE) plans stress-mode shards and
+    id_shard compact IDs.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    daily_counts = daily_transaction_counts(scale_factor, skew)
+    location_codes = np.arange(len(daily_counts))
+    for date in operating_days:
+        counts_seed, shard_seed = np.random.SeedSequence(entropy, spawn_key=(date.toordinal(),)).spawn(2)
+        num_items = draw_item_counts(np.random.default_rng(counts_seed), int(daily_counts.sum())).astype(np.int8)
+        yield {
+            'date': date,
+            'location_codes': location_codes,
+            'seed': shard_seed,
+            'num_items': num_items,
+            'transaction_start': transaction_start,
+            'order_start': order_start,
+            'n_customer_names': n_customer_names,
+            'customer_zipf': customer_zipf,
+            'roster': roster.subset(location_codes, date) if roster is not None else None,
+            'daily_counts': daily_counts,
+            'skew': skew,
+            'id_shard': id_shard
+        }
+        transaction_start += int(daily_counts.sum())
+        order_start += int(num_items.sum())
+
+
+def generate_shard(shard):
+    """Generate one day shard planned by plan_shards()."""
+    return generate_transaction_batch(
+        np.random.default_rng(shard['seed']), [shard['date']],
+        transaction_start=shard['transaction_start'], order_start=shard['order_start'],
+        n_customer_names=shard['n_customer_names'], customer_zipf=shard['customer_zipf'],
+        location_codes=shard['location_codes'], num_items=shard['num_items'], roster=shard['roster'],
+        daily_counts=shard['daily_counts'], skew=shard['skew'], id_shard=shard['id_shard']
+    )
+
+
+def generate_shards(shards, workers=WORKERS):
+    """Generate shards in order, in a process pool when workers > 1."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(generate_shard, shards, chunksize=max(1, len(shards) // (workers * 4))))
+    return [generate_shard(shard) for shard in shards]
+
+
+def generate_transaction_columns(seed=RANDOM_SEED, workers=WORKERS, customer_pool_size=CUSTOMER_NAME_POOL_SIZE,
+                                 customer_zipf=CUSTOMER_ZIPF_EXPONENT, scale_factor=SCALE_FACTOR, roster=None, skew=None,
+                                 id_shard=None):
+    """Generate all transactions for the specified period as one integer-coded batch.
+    
+    Returns (batch, customer_names); the batch is sorted by transaction_datetime
+    and uses BATCH_DTYPES (about 40 bytes per line item). Output for a given
+    seed is identical for any number of workers.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    customer_names = build_customer_name_pool(entropy, customer_pool_size)
+    operating_days = get_operating_days(START_DATE, END_DATE)
+    shards = list(plan_shards(operating_days, entropy, len(customer_names), customer_zipf=customer_zipf,
+                              scale_factor=scale_factor, roster=roster, skew=skew, id_shard=id_shard))
+    return concat_batches(generate_shards(shards, workers)), customer_names
+
+
+def generate_all_transactions_numpy(seed=RANDOM_SEED, workers=WORKERS, customer_pool_size=CUSTOMER_NAME_POOL_SIZE,
+                                    customer_zipf=CUSTOMER_ZIPF_EXPONENT, scale_factor=SCALE_FACTOR, summary=None,
+                                    roster=None, skew=None, id_shard=None):
+    """Generate all transactions for the specified period with the numpy engine.
+    
+    Returns a DataFrame already sorted by transaction_datetime. The
+    integer-coded batch is added to `summary` (a PosSummary) before it is decoded.
+    """
+    batch, customer_names = generate_transaction_columns(seed, workers, customer_pool_size, customer_zipf, scale_factor,
+                                                         roster, skew, id_shard)
+    if summary is not None:
+        summary.add_batch(batch)
+    return batch_to_dataframe(batch, customer_names)
+
+
+def iter_day_batches(operating_days, seed=RANDOM_SEED, workers=WORKERS, n_customer_names=CUSTOMER_NAME_POOL_SIZE,
+                     transaction_start=1, order_start=1, customer_zipf=CUSTOMER_ZIPF_EXPONENT,
+                     scale_factor=SCALE_FACTOR, roster=None, skew=None, id_shard=None):
+    """Yield one batch per operating day, sorted by transaction_datetime.
+    
+    Shards are planned lazily and at most `workers` days are in flight, so
+    memory does not grow with the date range. Batches are identical to the
+    matching slice of generate_all_transactions_numpy() for the same seed.
+    """
+    shards = plan_shards(operating_days, seed, n_customer_names, transaction_start, order_start,
+                         customer_zipf, scale_factor, roster, skew, id_shard)
+    return iter_shard_batches(shards, workers)
+
+
+def iter_shard_batches(shards, workers=WORKERS):
+    """Generate planned day shards in order and yield their batches, with at most `workers` days in flight."""
+    if workers <= 1:
+        for shard in shards:
+            yield generate_shard(shard)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for shard in shards:
+            pending.append(executor.submit(generate_shard, shard))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_transactions_stream(output_file, seed=RANDOM_SEED, workers=WORKERS, output_format='csv',
+                              operating_days=None, transaction_start=1, order_start=1,
+                              customer_pool_size=CUSTOMER_NAME_POOL_SIZE, customer_zipf=CUSTOMER_ZIPF_EXPONENT,
+                              scale_factor=SCALE_FACTOR, summary=None, roster=None, skew=None, compression='none',
+                              writer_threads=WRITER_THREADS, roll_rows=ROLL_ROWS, id_shard=None):
+    """Generate and append transactions to a CSV (or Parquet dataset) one day at a time.
+    
+    Defaults to the full START_DATE-END_DATE range, in which case the CSV is
+    byte-identical to writing generate_all_transactions_numpy() with the same
+    seed. Each day is added to `summary` (a PosSummary) as it is written.
+    Returns the resolved seed entropy and next transaction/order numbers (plus
+    the other settings), so a later run can continue the sequence.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    customer_names = build_customer_name_pool(entropy, customer_pool_size)
+    if operating_days is None:
+        operating_days = get_operating_days(START_DATE, END_DATE)
+    batches = iter_day_batches(operating_days, entropy, workers, len(customer_names),
+                               transaction_start, order_start, customer_zipf, scale_factor, roster, skew, id_shard)
+    next_transaction, next_order = write_batches(batches, customer_names, output_file, output_format, summary,
+                                                 compression=compression, threads=writer_threads, roll_rows=roll_rows)
+    return {'entropy': entropy,
+            'next_transaction': next_transaction or transaction_start,
+            'next_order': next_order or order_start,
+            'customer_pool_size': customer_pool_size, 'customer_zipf': customer_zipf, 'scale_factor': scale_factor,
+            'skew': skew, 'id_shard': id_shard}
+
+
+def shard_config():
+    """Module configuration every numpy-engine shard reads (see generate_transaction_batch()).
+    
+    The compiled menu (prices and SKU probabilities), the arrival curve and windows,
+    the payment mix and the fallback staff bands; constants that only feed other
+    paths (python engine, targets, stress defaults) are left out.
+    """
+    catalog = MENU_CATALOG
+    return fingerprint(catalog.records, catalog.price_low, catalog.price_high, catalog.probability,
+                       INTRADAY_INTENSITY, TRADING_WINDOW, BATCH_FILTER_WINDOW, PAYMENT_METHODS, EMPLOYEES,
+                       EMPLOYEE_IDS, list(TRANSACTIONS_PER_LOCATION))
+
+
+def shard_partitions(shard):
+    """Parquet partition keys (transaction_date=.../location_id=...) written by a day shard."""
+    return [f"transaction_date={shard['date']}/location_id=LOC-{code + 1:03d}" for code in shard['location_codes']]
+
+
+def partition_digests(shards, seed, output_settings=None):
+    """Input hash per Parquet partition of planned shards.
+    
+    A partition is generated with the rest of its day, so it depends on its day
+    shard's inputs: the shard configuration above, the seed and the day's stream,
+    the output settings (compression, rolling), the day's transaction/order offsets,
+    item counts and transactions per location, the customer pool, (with a roster)
+    the day's shifts, (in stress mode) the skew profile and (with compact IDs) the
+    ID shard. Editing one location's daily count still moves the legacy ID offsets
+    of every later day.
+    """
+    config = fingerprint(shard_config(), np.random.SeedSequence(seed).entropy, output_settings)
+    digests = {}
+    for shard in shards:
+        roster = shard['roster']
+        shifts = None if roster is None else (roster.location_codes, roster.starts, roster.ends, roster.employee_codes)
+        day = fingerprint(config, shard['date'], shard['transaction_start'], shard['order_start'], shard['num_items'],
+                          shard['daily_counts'], shard['n_customer_names'], shard['customer_zipf'], shifts,
+                          shard['skew'], shard['id_shard'])
+        for key in shard_partitions(shard):
+            digests[key] = fingerprint(day, key)
+    return digests
+
+
+def parse_args():
+    """Parse command line options (defaults come from the configuration above)."""
+    parser = argparse.ArgumentParser(description='Generate fake cafe POS transaction data.')
+    parser.add_argument('--engine', choices=['numpy', 'python'], default=ENGINE,
+                        help='numpy: vectorized day batches, python: one transaction at a time')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help='random seed for reproducible output')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='worker processes for the numpy engine (0 = all cores)')
+    parser.add_argument('--stream', action='store_true', default=STREAM_OUTPUT,
+                        help='write one day at a time with bounded memory (numpy engine only)')
+    parser.add_argument('--append', action='store_true',
+                        help='continue from the saved state and write only the next day(s) to pos_<n>.csv')
+    parser.add_argument('--days', type=int, default=APPEND_DAYS, help='operating days to add per --append run')
+    parser.add_argument('--customer-pool-size', type=int, default=CUSTOMER_NAME_POOL_SIZE,
+                        help='number of distinct customer names generated up front')
+    parser.add_argument('--customer-zipf', type=float, default=CUSTOMER_ZIPF_EXPONENT,
+                        help='Zipf exponent for repeat customers, e.g. 1.1 (default: uniform)')
+    parser.add_argument('--roster', default=ROSTER_PATH,
+                        help='roster CSV, Parquet dataset or folder of roster_<n> outputs that sales are attributed to')
+    parser.add_argument('--no-roster', action='store_true',
+                        help='ignore the roster and assign staff by morning/afternoon shift bands')
+    parser.add_argument('--skew', action='store_true',
+                        help='stress mode: one mega-store, a dominant variation, a few very frequent customers '
+                             'and bursty minutes (numpy engine only)')
+    parser.add_argument('--skew-set', nargs='+', default=[], metavar='KEY=VALUE',
+                        help='override SKEW_PROFILE entries for --skew, e.g. mega_store_share=0.9 hot_customers=3')
+    parser.add_argument('--id-scheme', choices=['legacy', 'compact'], default=ID_SCHEME,
+                        help='legacy: TXN-YYYYMMDD-NNNN/ORD-NNNN strings, compact: sortable 64-bit keys that encode '
+                             'date, location, shard and sequence (numpy engine only)')
+    parser.add_argument('--id-shard', type=int, default=ID_SHARD,
+                        help='shard field of compact keys, so independent runs for the same days never collide')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_writer_arguments(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+    if (args.stream or args.append or args.skew or args.id_scheme == 'compact') and args.engine != 'numpy':
+        parser.error('--stream, --append, --skew and --id-scheme compact require --engine numpy')
+    if not 0 <= args.id_shard < 1 << SHARD_BITS:
+        parser.error(f"--id-shard must be between 0 and {(1 << SHARD_BITS) - 1}")
+    if args.skew_set and not args.skew:
+        parser.error('--skew-set requires --skew')
+    
+    # Resolve the stress-mode profile (values take the type of the SKEW_PROFILE default)
+    skew = dict(SKEW_PROFILE) if args.skew else None
+    for setting in args.skew_set:
+        key, _, value = setting.partition('=')
+        if key not in SKEW_PROFILE:
+            parser.error(f"unknown --skew-set key '{key}' (choose from {', '.join(SKEW_PROFILE)})")
+        try:
+            skew[key] = type(SKEW_PROFILE[key])(value)
+        except ValueError:
+            parser.error(f"invalid --skew-set value for {key}: '{value}'")
+    if skew is not None:
+        if skew['hot_variation'] not in MENU_CATALOG.variations:
+            parser.error(f"unknown hot_variation '{skew['hot_variation']}'")
+        if not all(0 <= skew[key] <= 1 for key in ['mega_store_share', 'hot_variation_share', 'hot_customer_share',
+                                                   'burst_share']):
+            parser.error('skew shares must be between 0 and 1')
+    args.skew = skew
+    args.id_shard = args.id_shard if args.id_scheme == 'compact' else None
+    return args
+
+
 def main():
     """Main function to generate and save POS transaction data."""
+    args = parse_args()
     print("Generating POS transaction data...")
+    print(f"Engine: {args.engine}" + (f" ({args.workers or os.cpu_count()} workers)" if args.engine == 'numpy' else ''))
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}")
     print(f"Operating days: {OPERATING_DAYS} (Monday-Friday only)")
-    print(f"Target transactions: ~{TARGET_TRANSACTIONS}")
-    print(f"Target total sales: ${TARGET_TOTAL_SALES:,.2f} AUD")
-    print(f"Location distribution: LOC-001: 50%, LOC-002: 20%, LOC-003: 20%, LOC-004: 10%\n")
-    
-    # Generate transactions
-    transactions = generate_all_transactions()
-    
-    # Create DataFrame
-    df = pd.DataFrame(transactions)
-    
-    # Sort by transaction_datetime
-    df['transaction_datetime'] = pd.to_datetime(df['transaction_datetime'])
-    df = df.sort_values('transaction_datetime').reset_index(drop=True)
+    print(f"Scale factor: {args.scale_factor} ({len(location_ids(args.scale_factor))} locations)")
+    print(f"Target transactions: ~{TARGET_TRANSACTIONS * args.scale_factor}")
+    print(f"Target total sales: ${TARGET_TOTAL_SALES * args.scale_factor:,.2f} AUD")
+    print(f"Location distribution: LOC-001: 50%, LOC-002: 20%, LOC-003: 20%, LOC-004: 10% (repeated per copy)\n")
+    if args.skew:
+        print("Stress mode: " + ', '.join(f"{key}={value}" for key, value in args.skew.items()) + "\n")
+    if args.id_shard is not None:
+        print(f"IDs: compact 64-bit keys (shard {args.id_shard})\n")
     
-    # Save to CSV
-    import os
     output_dir = '../data/pos'
     os.makedirs(output_dir, exist_ok=True)
     output_file = os.path.join(output_dir, 'pos_0.csv')
-    df.to_csv(output_file, index=False)
-    print(f"Data saved to {output_file}")
+    workers = args.workers or os.cpu_count()
+    file_index = 0
+    
+    # Rostered Barista/Front of House shifts decide who rang up each sale; the roster's
+    # coverage flags sales made while none of them were on the floor (e.g. on a break)
+    df_roster = None if args.no_roster else read_roster(args.roster)
+    roster = coverage = None
+    if df_roster is not None and len(df_roster):
+        roster = RosterIndex.from_frame(df_roster)
+        coverage = CoverageIndex.from_frame(df_roster)
+        print(f"Roster: {len(roster):,} Barista/Front of House shifts from {args.roster}\n")
+    else:
+        print("Roster: not used (staff assigned by morning/afternoon shift bands)\n")
+    summary = PosSummary(decode_labels, coverage)
+    
+    # Content-addressed cache (numpy engine, full period): hash every (day, location) partition
+    # and regenerate only partitions whose inputs changed since the last run (needs --seed).
+    # Parquet replaces just those partition folders; a CSV holds every partition in one
+    # file, so any change rewrites it (an unchanged run still skips generation entirely)
+    seed = args.seed
+    manifest = None
+    if args.engine == 'numpy' and not args.append:
+        seed = np.random.SeedSequence(args.seed).entropy
+        shards = list(plan_shards(get_operating_days(START_DATE, END_DATE), seed, args.customer_pool_size,
+                                  customer_zipf=args.customer_zipf, scale_factor=args.scale_factor, roster=roster,
+                                  skew=args.skew, id_shard=args.id_shard))
+        digests = partition_digests(shards, seed, (args.compression, args.roll_rows))
+        manifest = PartitionManifest(f"pos_{args.format}",
+                                     output_path(output_file, args.format, args.compression, args.roll_rows))
+        changed = set(manifest.changed(digests) if args.cache else digests)
+        removed = manifest.removed(digests)
+        if not changed and not removed:
+            print(f"All {len(digests):,} partitions unchanged since the last run; nothing to regenerate")
+            return
+        print(f"Partitions to regenerate: {len(changed):,} of {len(digests):,}")
+    else:
+        # The python engine and --append rewrite output without partition hashes
+        PartitionManifest(f"pos_{args.format}", output_path(output_file, args.format, args.compression,
+                                                            args.roll_rows)).clear()
+    
+    if manifest is not None and args.format == 'parquet' and len(changed) < len(digests):
+        # Only the days with changed partitions are regenerated and replaced; the summary covers those
+        changed_shards = [shard for shard in shards if changed.intersection(shard_partitions(shard))]
+        rewritten = [key for shard in changed_shards for key in shard_partitions(shard)]
+        remove_partitions(parquet_path(output_file), rewritten + removed)
+        customer_names = build_customer_name_pool(seed, args.customer_pool_size)
+        write_batches(iter_shard_batches(changed_shards, workers), customer_names, output_file, 'parquet',
+                      summary, clear=False, compression=args.compression, threads=args.writer_threads)
+        print(f"Data saved to {parquet_path(output_file)}")
+    elif args.stream or args.append:
+        state = load_state('pos') if args.append else None
+        if state:
+            # Append: continue numbering and RNG streams from the saved state, new days only
+            file_index = state['file_index'] + 1
+            operating_days = next_operating_days(state['last_date'], args.days)
+            output_file = os.path.join(output_dir, f'pos_{file_index}.csv')
+            print(f"Appending {len(operating_days)} day(s): {operating_days[0]} to {operating_days[-1]}")
+            totals = write_transactions_stream(output_file, state['entropy'], workers, args.format, operating_days,
+                                               state['next_transaction'], state['next_order'],
+                                               state.get('customer_pool_size', CUSTOMER_NAME_POOL_SIZE),
+                                               state.get('customer_zipf', CUSTOMER_ZIPF_EXPONENT),
+                                               state.get('scale_factor', SCALE_FACTOR), summary, roster,
+                                               state.get('skew'), args.compression, args.writer_threads,
+                                               args.roll_rows, state.get('id_shard'))
+        else:
+            # Streaming: each day is written as soon as it is generated
+            operating_days = get_operating_days(START_DATE, END_DATE)
+            totals = write_transactions_stream(output_file, seed, workers, args.format,
+                                               customer_pool_size=args.customer_pool_size,
+                                               customer_zipf=args.customer_zipf,
+                                               scale_factor=args.scale_factor, summary=summary, roster=roster,
+                                               skew=args.skew, compression=args.compression,
+                                               writer_threads=args.writer_threads, roll_rows=args.roll_rows,
+                                               id_shard=args.id_shard)
+        
+        if args.append:
+            save_state('pos', {
+                'last_date': operating_days[-1].isoformat(),
+                'file_index': file_index,
+                'entropy': totals['entropy'],
+                'next_transaction': totals['next_transaction'],
+                'next_order': totals['next_order'],
+                'customer_pool_size': totals['customer_pool_size'],
+                'customer_zipf': totals['customer_zipf'],
+                'scale_factor': totals['scale_factor'],
+                'skew': totals['skew'],
+                'id_shard': totals['id_shard']
+            })
+        print(f"Data saved to {output_path(output_file, args.format, args.compression, args.roll_rows)}")
+    else:
+        # Generate transactions
+        if args.engine == 'numpy':
+            # Integer-coded columns come back already sorted by transaction_datetime and are
+            # decoded to strings one chunk at a time by the background writer
+            batch, customer_names = generate_transaction_columns(seed, workers, args.customer_pool_size,
+                                                                 args.customer_zipf, args.scale_factor, roster,
+                                                                 args.skew, args.id_shard)
+            summary.add_batch(batch)
+            write_batches(split_batch(batch), customer_names, output_file, args.format, compression=args.compression,
+                          threads=args.writer_threads, roll_rows=args.roll_rows)
+            saved_path = output_path(output_file, args.format, args.compression, args.roll_rows)
+        else:
+            random.seed(args.seed)
+            fake.seed_instance(args.seed)
+            customer_pool = get_customer_pool(args.seed, args.customer_pool_size, args.customer_zipf)
+            transactions = generate_all_transactions(customer_pool, args.scale_factor, summary, roster)
+            
+            # Create DataFrame
+            df = pd.DataFrame(transactions)
+            
+            # Sort by transaction_datetime
+            df['transaction_datetime'] = pd.to_datetime(df['transaction_datetime'])
+            df = df.sort_values('transaction_datetime').reset_index(drop=True)
+            
+            # Save to CSV (or Parquet)
+            saved_path = write_output(df, output_file, 'pos', args.format, args.compression, args.writer_threads,
+                                      args.roll_rows)
+        print(f"Data saved to {saved_path}")
+    if manifest is not None:
+        manifest.save(digests)
+    
+    # Summary statistics come from the accumulator (no extra pass over the data)
+    report = summary.report()
+    report_path = write_report(report, f'pos_{file_index}')
+    print(f"Summary report saved to {report_path}")
     
     # Print summary statistics
     print("\n" + "="*60)
@@ -529,55 +1375,53 @@ def main():
     print("="*60)
     
     # Total transactions (unique transaction IDs)
-    unique_transactions = df['transaction_id'].nunique()
-    print(f"\nTotal Transactions: {unique_transactions:,}")
-    print(f"Total Line Items: {len(df):,}")
+    print(f"\nTotal Transactions: {report['transactions']:,}")
+    print(f"Total Line Items: {report['line_items']:,}")
     
     # Total revenue
-    total_revenue = df['line_total'].sum()
-    print(f"\nTotal Revenue: ${total_revenue:,.2f} AUD")
-    print(f"Target Revenue: ${TARGET_TOTAL_SALES:,.2f} AUD")
-    print(f"Average Transaction Value: ${total_revenue / unique_transactions:.2f} AUD")
+    print(f"\nTotal Revenue: ${report['revenue']:,.2f} AUD")
+    print(f"Target Revenue: ${TARGET_TOTAL_SALES * args.scale_factor:,.2f} AUD")
+    print(f"Average Transaction Value: ${report['average_transaction_value']:.2f} AUD")
     print(f"Target Average: ${TARGET_AVG_TRANSACTION_VALUE:.2f} AUD")
     
     # Items sold by category_name
     print("\nItems Sold by Category:")
-    category_counts = df['category_name'].value_counts()
-    for category, count in category_counts.items():
+    for category, count in report['items_by_category'].items():
         print(f"  {category}: {count:,}")
     
     # Items sold by item_name
     print("\nItems Sold by Item Type:")
-    item_counts = df['item_name'].value_counts()
-    for item, count in item_counts.items():
+    for item, count in report['items_by_item'].items():
         print(f"  {item}: {count:,}")
     
     # Location distribution
     print("\nLocation Distribution:")
-    location_counts = df['location_id'].value_counts()
-    location_revenue = df.groupby('location_id')['line_total'].sum()
-    for location in ['LOC-001', 'LOC-002', 'LOC-003', 'LOC-004']:
-        count = location_counts.get(location, 0)
-        revenue = location_revenue.get(location, 0)
-        pct = (count / len(df)) * 100
+    for location, count in report['items_by_location'].items():
+        revenue = report['revenue_by_location'][location]
+        pct = (count / report['line_items']) * 100
         print(f"  {location}: {count:,} items ({pct:.1f}%), Revenue: ${revenue:,.2f}")
     
     # Payment method distribution
     print("\nPayment Method Distribution:")
-    payment_counts = df['payment_method'].value_counts()
-    for method, count in payment_counts.items():
-        pct = (count / len(df)) * 100
+    for method, count in report['items_by_payment_method'].items():
+        pct = (count / report['line_items']) * 100
         print(f"  {method}: {count:,} ({pct:.1f}%)")
     
     # Employee distribution
     print("\nEmployee Distribution (Top 10):")
-    employee_counts = df['employee_id'].value_counts().head(10)
-    for emp, count in employee_counts.items():
-        pct = (count / len(df)) * 100
+    for emp, count in list(report['items_by_employee'].items())[:10]:
+        pct = (count / report['line_items']) * 100
         print(f"  {emp}: {count:,} items ({pct:.1f}%)")
     
+    # Sales outside rostered coverage
+    if coverage is not None:
+        unstaffed = report['unstaffed_transactions_by_location']
+        print(f"\nTransactions with no Barista/Front of House on shift: {sum(unstaffed.values()):,}")
+        for location, count in unstaffed.items():
+            print(f"  {location}: {count:,}")
+    
     # Date range
-    print(f"\nDate Range: {df['transaction_datetime'].min()} to {df['transaction_datetime'].max()}")
+    print(f"\nDate Range: {report['first_transaction']} to {report['last_transaction']}")
     
     print("\n" + "="*60)
     print("Generation complete!")
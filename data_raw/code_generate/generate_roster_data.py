@@ -3,11 +3,24 @@ Generate realistic fake cafe rostering data matching POS transaction data.
 Generates 65 operating days (Monday-Friday only) of shift schedules.
 """
 
+import os
 import random
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict, deque
+from functools import lru_cache
 from datetime import datetime, timedelta, date as date_module
 from faker import Faker
+import numpy as np
 import pandas as pd
+from output_writers import add_output_arguments, add_writer_arguments, write_output
+from generator_state import load_state, save_state, next_operating_days
+from scale_factor import (SCALE_FACTOR, STORES_PER_COPY, EMPLOYEES_PER_COPY, add_scale_argument,
+                          base_location, location_ids, scale_id, split_id)
+from summary_stats import RosterSummary, write_report
+from roster_solver import MAX_CONSECUTIVE_DAYS, WEEK_DAYS, RosterSolver, location_clusters, pattern_shortfalls
+from demand_profile import POS_PATH, read_demand
 
 # Initialize Faker
 fake = Faker('en_AU')  # Australian locale for realistic names
@@ -26,6 +39,10 @@ while current_date <= end_date:
 OPERATING_DAYS = operating_days_count
 CAFE_OPEN = datetime(2025, 10, 1, 6, 30)  # 6:30 AM
 CAFE_CLOSE = datetime(2025, 10, 1, 14, 30)  # 2:30 PM
+APPEND_DAYS = 1  # Operating days added by each --append run
+ROSTER_HISTORY_DAYS = 8  # Trailing calendar days of shifts kept in the state file for work-pattern checks
+ROSTER_SOLVER = 'greedy'  # 'greedy' (staffing templates, one copy at a time) or 'constraint' (roster_solver.py)
+WORKERS = 1  # Processes rostering independent location clusters (output is identical for any worker count)
 
 # Employee Master List
 EMPLOYEES = {
@@ -55,9 +72,42 @@ EMPLOYEES = {
     'EMP-019': {'role': 'Kitchen', 'pay_rate_range': (28.50, 33.00), 'primary_locations': ['LOC-004'], 'work_pattern': 'full-time', 'fixed_location': 'LOC-004'},
 }
 
-# Locations
+# Locations (base network; --scale-factor adds copies with their own staff)
 LOCATIONS = ['LOC-001', 'LOC-002', 'LOC-003', 'LOC-004']
 
+# Daily staffing per location for the constraint solver: (role, shift, employees, share of days).
+# Copies added by --scale-factor use the requirements of the base location they were copied from
+STAFFING_REQUIREMENTS = {
+    'LOC-001': [
+        ('Front of House', 'opening', 1, 1.0),
+        ('Barista', 'opening', 2, 1.0),
+        ('Kitchen', 'kitchen', 1, 1.0),
+        ('Front of House', 'mid', 1, 1.0),
+        ('Barista', 'mid', 1, 0.7)  # Peak coverage on 70% of days
+    ],
+    **{location: [
+        ('Front of House', 'opening', 1, 1.0),
+        ('Barista', 'opening', 1, 1.0),
+        ('Kitchen', 'kitchen', 1, 1.0),
+        ('Front of House', 'part-time', 1, 0.3)  # Peak coverage on 30% of days
+    ] for location in ['LOC-002', 'LOC-003', 'LOC-004']}
+}
+
+# Demand-driven staffing (--demand, constraint solver): service staff per location and weekday are
+# sized from the busiest average POS hour in each window (hours [start, end) on the 24-hour clock)
+TRANSACTIONS_PER_STAFF_HOUR = 18  # Transactions one Barista/Front of House handles in an hour
+DEMAND_WINDOWS = {
+    'opening': (6, 8),  # Opening shifts only
+    'peak': (8, 11),  # Opening + mid shifts
+    'closing': (11, 15)  # Opening + mid + part-time shifts
+}
+BARISTA_SHARE = 0.6  # Share of each window's extra service staff who are Baristas
+
+# Roster columns; string columns are held as categoricals and times as datetime64 until written
+ROSTER_COLUMNS = ['employee_id', 'role', 'start_time', 'end_time',
+                  'area_department', 'pay_rate', 'notes', 'published', 'break_duration']
+ROSTER_CATEGORICAL_COLUMNS = ['employee_id', 'role', 'area_department', 'notes', 'published']
+
 # Shift notes templates
 SHIFT_NOTES = [
     'Opening shift',
@@ -89,6 +139,21 @@ for emp_id, emp_data in EMPLOYEES.items():
     }
 
 
+def extend_employee_master(scale_factor=SCALE_FACTOR):
+    """Add the staff of every copy beyond the base network to employee_master."""
+    for copy in range(1, scale_factor):
+        for emp_id, emp_data in EMPLOYEES.items():
+            scaled_id = scale_id(emp_id, copy, EMPLOYEES_PER_COPY)
+            employee_master[scaled_id] = {
+                'employee_id': scaled_id,
+                'employee_name': fake.name(),
+                'role': emp_data['role'],
+                'primary_location': scale_id(emp_data['primary_locations'][0], copy, STORES_PER_COPY),
+                'pay_rate': round(random.uniform(*emp_data['pay_rate_range']), 2),
+                'work_pattern': emp_data['work_pattern']
+            }
+
+
 def get_operating_days(start_date, end_date):
     """Generate list of operating days (Monday-Friday only) between start and end dates."""
     operating_days = []
@@ -158,83 +223,103 @@ def generate_part_time_shift(date, location):
     return start_time, end_time
 
 
-def get_available_employees(role, location, date, existing_shifts, all_shifts_so_far):
-    """Get employees available for a role at a location on a date."""
+def generate_kitchen_shift(date, location):
+    """Generate kitchen shift (morning only, 6:30 AM - 2 PM)."""
+    start_time = datetime(date.year, date.month, date.day, 6, 30)
+    end_time = datetime(date.year, date.month, date.day, 14, 0)  # 2 PM
+    return start_time, end_time
+
+
+# Shift kinds used in STAFFING_REQUIREMENTS
+SHIFT_GENERATORS = {
+    'opening': generate_opening_shift,
+    'mid': generate_mid_shift,
+    'part-time': generate_part_time_shift,
+    'kitchen': generate_kitchen_shift
+}
+
+
+class RosterState:
+    """Per-employee work-pattern counters, updated as shifts are assigned.
+    
+    Keeps each employee's shift dates within the trailing WEEK_DAYS calendar days
+    (older dates are dropped as rostering moves forward), the last date they
+    worked and the streak of consecutive days ending on it, so availability
+    checks no longer rescan every shift so far. Shifts must be added in date order.
+    """
+    
+    def __init__(self, shifts=()):
+        self.recent = defaultdict(deque)  # employee_id -> shift dates, oldest first
+        self.last_date = {}
+        self.streak = {}
+        for shift in shifts:
+            self.add(shift)
+    
+    def add(self, shift):
+        """Count an assigned shift (employee_id, start_time, ...)."""
+        emp_id = shift['employee_id']
+        shift_date = shift['start_time'].date()
+        self.recent[emp_id].append(shift_date)
+        last_date = self.last_date.get(emp_id)
+        if last_date != shift_date:
+            continued = last_date == shift_date - timedelta(days=1)
+            self.streak[emp_id] = self.streak[emp_id] + 1 if continued else 1
+            self.last_date[emp_id] = shift_date
+    
+    def shifts_in_window(self, emp_id, date):
+        """Shifts in the WEEK_DAYS calendar days ending on `date` (the window roster_solver checks)."""
+        recent = self.recent[emp_id]
+        cutoff = date - timedelta(days=WEEK_DAYS - 1)
+        while recent and recent[0] < cutoff:
+            recent.popleft()
+        return len(recent)
+    
+    def consecutive_days(self, emp_id, date):
+        """Consecutive days worked up to the day before `date` (the streak a shift on `date` would extend)."""
+        last_date = self.last_date.get(emp_id)
+        if last_date == date:
+            return self.streak[emp_id] - 1
+        return self.streak[emp_id] if last_date == date - timedelta(days=1) else 0
+
+
+@lru_cache(maxsize=None)
+def eligible_employees(role, location):
+    """Employees of a role who work at a location (Kitchen staff only at their fixed location), in EMPLOYEES order."""
+    return [emp_id for emp_id, emp_data in EMPLOYEES.items()
+            if emp_data['role'] == role
+            and (role != 'Kitchen' or emp_data.get('fixed_location') == location)
+            and location in emp_data['primary_locations']]
+
+
+def get_available_employees(role, location, date, existing_shifts, roster_state):
+    """Get employees available for a role at a location on a date.
+    
+    existing_shifts are the shifts already assigned at the location that day;
+    roster_state is the RosterState of every earlier shift.
+    """
+    date_obj = date.date() if isinstance(date, datetime) else date
+    rostered_today = {shift['employee_id'] for shift in existing_shifts}
     available = []
-    for emp_id, emp_data in EMPLOYEES.items():
-        if emp_data['role'] != role:
-            continue
-        
-        # Kitchen staff only work at fixed location
-        if role == 'Kitchen':
-            if emp_data.get('fixed_location') != location:
-                continue
-        
-        # Check if employee works at this location
-        if location not in emp_data['primary_locations']:
-            continue
-        
-        # Check for overlapping shifts (same day)
-        has_overlap = False
-        date_obj = date.date() if isinstance(date, datetime) else date
-        for shift in existing_shifts:
-            if shift['employee_id'] == emp_id:
-                shift_date = shift['start_time'].date() if isinstance(shift['start_time'], datetime) else shift['start_time']
-                if shift_date == date_obj:
-                    has_overlap = True
-                    break
-        
-        # Check work pattern constraints
-        if not should_employee_work(emp_id, date, all_shifts_so_far):
-            continue
-        
-        if not has_overlap:
+    for emp_id in eligible_employees(role, location):
+        # Work pattern constraints are checked (and drawn) even for staff already on today
+        if should_employee_work(emp_id, date_obj, roster_state) and emp_id not in rostered_today:
             available.append(emp_id)
     
     return available
 
 
-def should_employee_work(emp_id, date, all_shifts_so_far):
+def should_employee_work(emp_id, date, roster_state):
     """Determine if employee should work based on work pattern and recent shifts."""
-    emp_data = EMPLOYEES[emp_id]
-    work_pattern = emp_data['work_pattern']
-    
-    # Convert date to date object if it's datetime
-    if isinstance(date, datetime):
-        date_obj = date.date()
-    else:
-        date_obj = date
-    
-    # Get recent shifts for this employee (last 7 days)
-    recent_shifts = [s for s in all_shifts_so_far 
-                    if s['employee_id'] == emp_id and 
-                    isinstance(s['start_time'], datetime) and
-                    (date_obj - s['start_time'].date()).days <= 7 and
-                    (date_obj - s['start_time'].date()).days >= 0]
-    
-    # Check consecutive days
-    consecutive_days = 0
-    check_date = date_obj
-    while True:
-        day_shifts = [s for s in all_shifts_so_far 
-                     if s['employee_id'] == emp_id and 
-                     isinstance(s['start_time'], datetime) and
-                     s['start_time'].date() == check_date]
-        if day_shifts:
-            consecutive_days += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
+    work_pattern = EMPLOYEES[emp_id]['work_pattern']
+    date_obj = date.date() if isinstance(date, datetime) else date
     
-    # Don't work more than 5 consecutive days
-    if consecutive_days >= 5:
+    # Don't work more than MAX_CONSECUTIVE_DAYS consecutive days
+    if roster_state.consecutive_days(emp_id, date_obj) >= MAX_CONSECUTIVE_DAYS:
         return False
     
     # Full-time: 4-5 shifts per week
     if work_pattern == 'full-time':
-        shifts_this_week = len([s for s in recent_shifts 
-                               if isinstance(s['start_time'], datetime) and
-                               (date_obj - s['start_time'].date()).days <= 7])
+        shifts_this_week = roster_state.shifts_in_window(emp_id, date_obj)
         if shifts_this_week >= 5:
             return False
         # 80% chance if they have 0-3 shifts this week
@@ -243,33 +328,36 @@ def should_employee_work(emp_id, date, all_shifts_so_far):
     
     # Part-time: 2-3 shifts per week
     elif work_pattern == 'part-time':
-        shifts_this_week = len([s for s in recent_shifts 
-                               if isinstance(s['start_time'], datetime) and
-                               (date_obj - s['start_time'].date()).days <= 7])
+        shifts_this_week = roster_state.shifts_in_window(emp_id, date_obj)
         if shifts_this_week >= 3:
             return False
         # 50% chance if they have 0-2 shifts this week
-        if shifts_this_week < 3:
-            return random.random() < 0.5
+        return random.random() < 0.5
     
     return True
 
 
-def generate_roster():
-    """Generate complete roster for all operating days."""
-    operating_days = get_operating_days(START_DATE, END_DATE)
+def generate_shifts(operating_days, shift_history=None, locations=LOCATIONS):
+    """Generate shifts for the base network (LOCATIONS and EMPLOYEES, or some of its locations).
+    
+    shift_history holds earlier shifts (employee_id, start_time, end_time, location)
+    that count towards work-pattern limits; only the new shifts are returned.
+    Work patterns are tracked in a RosterState, so the cost is linear in the
+    number of days.
+    """
+    roster_state = RosterState(shift_history or [])
     all_shifts = []
     
     for date in operating_days:
         # Generate shifts for each location
-        for location in LOCATIONS:
+        for location in locations:
             location_shifts = []
             
             # LOC-001 has higher staffing requirements
             if location == 'LOC-001':
                 # Opening: 1 FOH + 2 Baristas
-                foh_available = get_available_employees('Front of House', location, date, location_shifts, all_shifts)
-                barista_available = get_available_employees('Barista', location, date, location_shifts, all_shifts)
+                foh_available = get_available_employees('Front of House', location, date, location_shifts, roster_state)
+                barista_available = get_available_employees('Barista', location, date, location_shifts, roster_state)
                 
                 # Opening FOH
                 if foh_available:
@@ -297,8 +385,8 @@ def generate_roster():
                 
                 # Peak coverage: Additional FOH and Baristas
                 if random.random() < 0.7:  # 70% chance of additional peak coverage
-                    foh_available = get_available_employees('Front of House', location, date, location_shifts, all_shifts)
-                    barista_available = get_available_employees('Barista', location, date, location_shifts, all_shifts)
+                    foh_available = get_available_employees('Front of House', location, date, location_shifts, roster_state)
+                    barista_available = get_available_employees('Barista', location, date, location_shifts, roster_state)
                     
                     if foh_available:
                         emp_id = random.choice(foh_available)
@@ -321,11 +409,10 @@ def generate_roster():
                         })
                 
                 # Kitchen staff (morning only, 6:30 AM - 2 PM)
-                kitchen_available = get_available_employees('Kitchen', location, date, location_shifts, all_shifts)
+                kitchen_available = get_available_employees('Kitchen', location, date, location_shifts, roster_state)
                 if kitchen_available:
                     emp_id = kitchen_available[0]  # Only one kitchen staff per location
-                    start_time = datetime(date.year, date.month, date.day, 6, 30)
-                    end_time = datetime(date.year, date.month, date.day, 14, 0)  # 2 PM
+                    start_time, end_time = generate_kitchen_shift(date, location)
                     location_shifts.append({
                         'employee_id': emp_id,
                         'start_time': start_time,
@@ -334,8 +421,8 @@ def generate_roster():
                     })
                 
                 # Closing: Additional FOH and Barista
-                foh_available = get_available_employees('Front of House', location, date, location_shifts, all_shifts)
-                barista_available = get_available_employees('Barista', location, date, location_shifts, all_shifts)
+                foh_available = get_available_employees('Front of House', location, date, location_shifts, roster_state)
+                barista_available = get_available_employees('Barista', location, date, location_shifts, roster_state)
                 
                 if foh_available and len([s for s in location_shifts if EMPLOYEES[s['employee_id']]['role'] == 'Front of House']) < 2:
                     emp_id = random.choice(foh_available)
@@ -359,8 +446,8 @@ def generate_roster():
             
             else:  # LOC-002, LOC-003, LOC-004
                 # Opening: 1 FOH + 1 Barista
-                foh_available = get_available_employees('Front of House', location, date, location_shifts, all_shifts)
-                barista_available = get_available_employees('Barista', location, date, location_shifts, all_shifts)
+                foh_available = get_available_employees('Front of House', location, date, location_shifts, roster_state)
+                barista_available = get_available_employees('Barista', location, date, location_shifts, roster_state)
                 
                 # Opening FOH
                 if foh_available:
@@ -385,11 +472,10 @@ def generate_roster():
                     })
                 
                 # Kitchen staff (morning only)
-                kitchen_available = get_available_employees('Kitchen', location, date, location_shifts, all_shifts)
+                kitchen_available = get_available_employees('Kitchen', location, date, location_shifts, roster_state)
                 if kitchen_available:
                     emp_id = kitchen_available[0]
-                    start_time = datetime(date.year, date.month, date.day, 6, 30)
-                    end_time = datetime(date.year, date.month, date.day, 14, 0)  # 2 PM
+                    start_time, end_time = generate_kitchen_shift(date, location)
                     location_shifts.append({
                         'employee_id': emp_id,
                         'start_time': start_time,
@@ -399,7 +485,7 @@ def generate_roster():
                 
                 # Peak coverage: Additional staff (30% chance)
                 if random.random() < 0.3:
-                    foh_available = get_available_employees('Front of House', location, date, location_shifts, all_shifts)
+                    foh_available = get_available_employees('Front of House', location, date, location_shifts, roster_state)
                     if foh_available:
                         emp_id = random.choice(foh_available)
                         start_time, end_time = generate_part_time_shift(date, location)
@@ -411,10 +497,196 @@ def generate_roster():
                         })
             
             # Add all location shifts to main list
+            for shift in location_shifts:
+                roster_state.add(shift)
             all_shifts.extend(location_shifts)
     
-    # Convert to roster format
-    roster_data = []
+    return all_shifts
+
+
+def network_employees(scale_factor=SCALE_FACTOR):
+    """EMPLOYEES for every copy of the network, with scaled employee and location IDs."""
+    employees = {}
+    for copy in range(scale_factor):
+        for emp_id, emp_data in EMPLOYEES.items():
+            scaled = {**emp_data, 'primary_locations': [scale_id(location, copy, STORES_PER_COPY)
+                                                        for location in emp_data['primary_locations']]}
+            if 'fixed_location' in emp_data:
+                scaled['fixed_location'] = scale_id(emp_data['fixed_location'], copy, STORES_PER_COPY)
+            employees[scale_id(emp_id, copy, EMPLOYEES_PER_COPY)] = scaled
+    return employees
+
+
+def solve_shifts(operating_days, shift_history, employees, requirements):
+    """Roster locations with the constraint solver (roster_solver.py).
+    
+    requirements maps every location to its staffing (see network_requirements());
+    shift times come from SHIFT_GENERATORS. Returns the new shifts (employee_id,
+    start_time, end_time, location) and the (date, location, role, shift) slots
+    nobody could fill.
+    """
+    assignments, gaps = RosterSolver(employees, requirements, shift_history).solve(operating_days)
+    shifts = []
+    for date, location, role, shift, emp_id in assignments:
+        start_time, end_time = SHIFT_GENERATORS[shift](date, location)
+        shifts.append({'employee_id': emp_id, 'start_time': start_time, 'end_time': end_time, 'location': location})
+    return shifts, gaps
+
+
+def scale_shift(shift, copy):
+    """Move a base-network shift to the matching employee and location of another copy."""
+    return {**shift,
+            'employee_id': scale_id(shift['employee_id'], copy, EMPLOYEES_PER_COPY),
+            'location': scale_id(shift['location'], copy, STORES_PER_COPY)}
+
+
+def demand_staffing(hourly, base_requirements):
+    """Requirements for one location-weekday from its average transactions per hour (24 values).
+    
+    Each DEMAND_WINDOWS window needs enough service staff for its busiest hour at
+    TRANSACTIONS_PER_STAFF_HOUR; opening shifts (at least one Barista and one
+    Front of House) cover the whole day, mid shifts the peak onwards and part-time
+    shifts the closing hours. Kitchen requirements are kept from base_requirements.
+    """
+    need = {window: int(np.ceil(hourly[start:end].max() / TRANSACTIONS_PER_STAFF_HOUR))
+            for window, (start, end) in DEMAND_WINDOWS.items()}
+    opening = max(2, need['opening'])
+    staff = {
+        'opening': opening,
+        'mid': max(0, need['peak'] - opening),
+        'part-time': max(0, need['closing'] - max(opening, need['peak']))
+    }
+    requirements = []
+    for shift, n_staff in staff.items():
+        minimum = 1 if shift == 'opening' else 0
+        baristas = max(minimum, int(n_staff * BARISTA_SHARE + 0.5))
+        for role, count in (('Front of House', max(minimum, n_staff - baristas)), ('Barista', baristas)):
+            if count:
+                requirements.append((role, shift, count, 1.0))
+    return requirements + [requirement for requirement in base_requirements if requirement[0] == 'Kitchen']
+
+
+def network_requirements(locations, demand=None):
+    """Staffing requirements per location: the STAFFING_REQUIREMENTS of its base location, or,
+    with demand (DemandHistogram.hourly(), by location code), per weekday from its POS demand."""
+    requirements = {}
+    for location_code, location in enumerate(locations):
+        base_requirements = STAFFING_REQUIREMENTS[base_location(location)]
+        if demand is None or location_code >= len(demand):
+            requirements[location] = base_requirements
+            continue
+        requirements[location] = {
+            weekday: demand_staffing(demand[location_code, weekday], base_requirements)
+            if demand[location_code, weekday].any() else base_requirements
+            for weekday in range(7)
+        }
+    return requirements
+
+
+def plan_clusters(operating_days, shift_history=None, scale_factor=SCALE_FACTOR, solver=ROSTER_SOLVER,
+                  demand=None):
+    """One rostering task per location cluster (roster_solver.location_clusters()).
+    
+    Each task carries its cluster's staff, staffing requirements (from demand
+    if given, see network_requirements()) and shift history, and a seed derived
+    from one draw of the global random state and the cluster's first location,
+    so results do not depend on how clusters are scheduled.
+    """
+    employees = network_employees(scale_factor)
+    locations = location_ids(scale_factor)
+    requirements = network_requirements(locations, demand)
+    entropy = random.getrandbits(64)
+    history = defaultdict(list)
+    for shift in shift_history or []:
+        history[shift['employee_id']].append(shift)
+    tasks = []
+    for cluster_locations, cluster_employees in location_clusters(employees, locations):
+        seed_sequence = np.random.SeedSequence(entropy, spawn_key=(locations.index(cluster_locations[0]),))
+        tasks.append({
+            'solver': solver,
+            'operating_days': operating_days,
+            'locations': cluster_locations,
+            'employees': {emp_id: employees[emp_id] for emp_id in cluster_employees},
+            'requirements': {location: requirements[location] for location in cluster_locations},
+            'history': sorted((shift for emp_id in cluster_employees for shift in history[emp_id]),
+                              key=lambda shift: shift['start_time']),
+            'seed': int(seed_sequence.generate_state(1)[0])
+        })
+    return tasks
+
+
+def roster_cluster(task):
+    """Roster one cluster planned by plan_clusters(); returns (shifts with notes and published flag, gaps).
+    
+    The greedy solver works on the base network, so the cluster (always within
+    one copy) is mapped to base IDs and back.
+    """
+    random.seed(task['seed'])
+    if task['solver'] == 'constraint':
+        shifts, gaps = solve_shifts(task['operating_days'], task['history'], task['employees'], task['requirements'])
+    else:
+        copy = split_id(task['locations'][0], STORES_PER_COPY)[1]
+        base_history = [{**shift, 'location': split_id(shift['location'], STORES_PER_COPY)[0],
+                         'employee_id': split_id(shift['employee_id'], EMPLOYEES_PER_COPY)[0]}
+                        for shift in task['history']]
+        base_locations = [split_id(location, STORES_PER_COPY)[0] for location in task['locations']]
+        shifts = [scale_shift(shift, copy) for shift in generate_shifts(task['operating_days'], base_history,
+                                                                        base_locations)]
+        gaps = []
+    for shift in shifts:
+        shift['notes'] = generate_shift_notes()
+        shift['published'] = 'Yes' if random.random() < 0.95 else 'No'
+    return shifts, gaps
+
+
+def roster_clusters(tasks, workers=WORKERS):
+    """Roster planned clusters, in a process pool when workers > 1 (results in task order)."""
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(roster_cluster, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    # Clusters reseed the global random module; keep the caller's stream as a pool would
+    state = random.getstate()
+    results = [roster_cluster(task) for task in tasks]
+    random.setstate(state)
+    return results
+
+
+def generate_roster(operating_days=None, shift_history=None, scale_factor=SCALE_FACTOR, summary=None,
+                    solver=ROSTER_SOLVER, workers=WORKERS, demand=None):
+    """Generate complete roster for all operating days.
+    
+    shift_history holds earlier shifts (employee_id, start_time, end_time, location)
+    that count towards work-pattern limits but are not returned again. Staff only
+    work within their location cluster (each copy added by scale_factor is at
+    least one), so clusters are rostered independently, `workers` at a time, by
+    the greedy templates or the constraint solver (STAFFING_REQUIREMENTS, or
+    staffing sized from demand, a DemandHistogram.hourly() array), and merged by
+    start_time and location. New shifts are added to `summary` (a RosterSummary)
+    while their datetimes are still at hand.
+    """
+    if operating_days is None:
+        operating_days = get_operating_days(START_DATE, END_DATE)
+    
+    results = roster_clusters(plan_clusters(operating_days, shift_history, scale_factor, solver, demand), workers)
+    location_rank = {location: i for i, location in enumerate(location_ids(scale_factor))}
+    all_shifts = sorted((shift for shifts, _ in results for shift in shifts),
+                        key=lambda shift: (shift['start_time'], location_rank[shift['location']]))
+    if summary is not None:
+        for _, gaps in results:
+            for _, _, role, _ in gaps:
+                summary.add_gap(role)
+        
+        # Weekly minimums are targets, not hard limits: count the employee-weeks that missed them
+        employees = network_employees(scale_factor)
+        operating_dates = [day.date() if isinstance(day, datetime) else day for day in operating_days]
+        shift_dates = defaultdict(list)
+        for shift in list(shift_history or []) + all_shifts:
+            shift_dates[shift['employee_id']].append(shift['start_time'].date())
+        for emp_id, _, _, _ in pattern_shortfalls(employees, shift_dates, operating_dates):
+            summary.add_shortfall(employees[emp_id]['work_pattern'])
+    
+    # Convert to roster columns
+    columns = {column: [] for column in ROSTER_COLUMNS}
     for shift in all_shifts:
         emp_id = shift['employee_id']
         emp_info = employee_master[emp_id]
@@ -422,68 +694,173 @@ def generate_roster():
         start_time = shift['start_time']
         end_time = shift['end_time']
         break_duration = calculate_break_duration(start_time, end_time)
-        notes = generate_shift_notes()
-        published = 'Yes' if random.random() < 0.95 else 'No'
+        notes = shift['notes']
+        published = shift['published']
+        if summary is not None:
+            summary.add_shift(emp_id, emp_info['role'], shift['location'], start_time, end_time,
+                              break_duration, emp_info['pay_rate'], published)
         
-        roster_data.append({
-            'employee_id': emp_id,
-            'role': emp_info['role'],
-            'start_time': start_time.strftime('%Y-%m-%d %H:%M'),
-            'end_time': end_time.strftime('%Y-%m-%d %H:%M'),
-            'area_department': shift['location'],
-            'pay_rate': emp_info['pay_rate'],
-            'notes': notes,
-            'published': published,
-            'break_duration': break_duration
-        })
-    
-    return roster_data
+        columns['employee_id'].append(emp_id)
+        columns['role'].append(emp_info['role'])
+        columns['start_time'].append(start_time)
+        columns['end_time'].append(end_time)
+        columns['area_department'].append(shift['location'])
+        columns['pay_rate'].append(emp_info['pay_rate'])
+        columns['notes'].append(notes)
+        columns['published'].append(published)
+        columns['break_duration'].append(break_duration)
+    
+    return roster_frame(columns)
+
+
+def roster_frame(columns):
+    """Typed roster DataFrame: categorical strings, datetime64[s] times, float32 pay rates."""
+    df_roster = pd.DataFrame({
+        'start_time': np.array(columns['start_time'], dtype='datetime64[s]'),
+        'end_time': np.array(columns['end_time'], dtype='datetime64[s]'),
+        'pay_rate': np.array(columns['pay_rate'], dtype=np.float32),
+        'break_duration': np.array(columns['break_duration'], dtype=np.int8),
+        **{column: pd.Categorical(columns[column]) for column in ROSTER_CATEGORICAL_COLUMNS}
+    })
+    return df_roster[ROSTER_COLUMNS]
+
+
+def shifts_from_roster(df_roster):
+    """Turn roster rows back into the shift dicts used for work-pattern checks."""
+    return [{
+        'employee_id': employee_id,
+        'start_time': start_time.to_pydatetime(),
+        'end_time': end_time.to_pydatetime(),
+        'location': location
+    } for employee_id, start_time, end_time, location in zip(
+        df_roster['employee_id'], df_roster['start_time'], df_roster['end_time'], df_roster['area_department'])]
+
+
+def build_roster_state(last_date, file_index, shift_history, scale_factor=SCALE_FACTOR):
+    """State saved after an --append run: RNG state, employee master and recent shifts."""
+    cutoff = last_date - timedelta(days=ROSTER_HISTORY_DAYS)
+    version, internal_state, gauss_next = random.getstate()
+    return {
+        'last_date': last_date.isoformat(),
+        'file_index': file_index,
+        'scale_factor': scale_factor,
+        'random_state': [version, list(internal_state), gauss_next],
+        'employee_master': employee_master,
+        'shift_history': [
+            {**shift, 'start_time': shift['start_time'].isoformat(), 'end_time': shift['end_time'].isoformat()}
+            for shift in shift_history if shift['start_time'].date() > cutoff
+        ]
+    }
+
+
+def restore_roster_state(state):
+    """Restore RNG state and employee master from a saved state; returns the shift history."""
+    version, internal_state, gauss_next = state['random_state']
+    random.setstate((version, tuple(internal_state), gauss_next))
+    employee_master.update(state['employee_master'])
+    return [
+        {**shift, 'start_time': datetime.fromisoformat(shift['start_time']), 'end_time': datetime.fromisoformat(shift['end_time'])}
+        for shift in state['shift_history']
+    ]
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate fake cafe roster and employee data.')
+    parser.add_argument('--append', action='store_true',
+                        help='continue from the saved state and write only the next day(s) to roster_<n>.csv')
+    parser.add_argument('--days', type=int, default=APPEND_DAYS, help='operating days to add per --append run')
+    parser.add_argument('--solver', choices=['greedy', 'constraint'], default=ROSTER_SOLVER,
+                        help='greedy: fixed staffing templates per copy, constraint: fill STAFFING_REQUIREMENTS '
+                             'across the whole network within work-pattern limits')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='processes rostering independent location clusters (0 = all cores)')
+    parser.add_argument('--demand', nargs='?', const=POS_PATH, metavar='POS_PATH',
+                        help='size staffing from the hourly demand in POS output (CSV, Parquet or a folder of '
+                             f'pos_<n> outputs, default {POS_PATH}); requires --solver constraint')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    add_writer_arguments(parser)
+    args = parser.parse_args()
+    if args.demand and args.solver != 'constraint':
+        parser.error('--demand requires --solver constraint')
+    return args
 
 
 def main():
     """Main function to generate and save roster data."""
+    args = parse_args()
     print("Generating roster data...")
     print(f"Date range: {START_DATE.strftime('%Y-%m-%d')} to {END_DATE.strftime('%Y-%m-%d')}")
     print(f"Operating days: {OPERATING_DAYS} (Monday-Friday only)")
-    print(f"Locations: {len(LOCATIONS)}")
-    print(f"Total employees: {len(EMPLOYEES)}\n")
     
-    # Generate roster
-    roster_data = generate_roster()
-    
-    # Create DataFrame
-    df_roster = pd.DataFrame(roster_data)
-    
-    # Sort by start_time, then location
-    df_roster['start_time_dt'] = pd.to_datetime(df_roster['start_time'])
-    df_roster = df_roster.sort_values(['start_time_dt', 'area_department']).reset_index(drop=True)
-    df_roster = df_roster.drop('start_time_dt', axis=1)
+    # Generate roster (append runs continue from the saved state with only the next day(s))
+    state = load_state('roster') if args.append else None
+    if state:
+        file_index = state['file_index'] + 1
+        scale_factor = state.get('scale_factor', SCALE_FACTOR)
+        shift_history = restore_roster_state(state)
+        operating_days = next_operating_days(state['last_date'], args.days)
+        print(f"Appending {len(operating_days)} day(s): {operating_days[0]} to {operating_days[-1]}")
+    else:
+        file_index = 0
+        scale_factor = args.scale_factor
+        shift_history = []
+        operating_days = get_operating_days(START_DATE, END_DATE)
+        extend_employee_master(scale_factor)
+    locations = location_ids(scale_factor)
+    print(f"Locations: {len(locations)}")
+    print(f"Total employees: {len(employee_master)}")
+    workers = args.workers or os.cpu_count()
+    print(f"Solver: {args.solver} ({workers} workers)\n")
+    
+    # Demand-driven staffing: one streaming pass over the POS output
+    demand = None
+    if args.demand:
+        histogram = read_demand(args.demand)
+        if histogram is None:
+            print(f"Demand: no POS output at {args.demand}, using STAFFING_REQUIREMENTS\n")
+        else:
+            demand = histogram.hourly()
+            print(f"Demand: {len(histogram):,} transactions at {len(demand)} locations from {args.demand} "
+                  f"({TRANSACTIONS_PER_STAFF_HOUR} per service staff-hour)\n")
+    summary = RosterSummary()
+    df_roster = generate_roster(operating_days, shift_history, scale_factor, summary, args.solver, workers, demand)
     
-    # Reorder columns
-    column_order = ['employee_id', 'role', 'start_time', 'end_time', 
-                   'area_department', 'pay_rate', 'notes', 'published', 'break_duration']
-    df_roster = df_roster[column_order]
+    # Sort by start_time, then location (categories are in ID order)
+    df_roster = df_roster.sort_values(['start_time', 'area_department']).reset_index(drop=True)
     
     # Save roster CSV
-    import os
     roster_dir = '../data/roster'
     employee_dir = '../data/employee'
     os.makedirs(roster_dir, exist_ok=True)
     os.makedirs(employee_dir, exist_ok=True)
     
-    output_file = os.path.join(roster_dir, 'roster_0.csv')
-    df_roster.to_csv(output_file, index=False)
-    print(f"Roster data saved to {output_file}")
+    output_file = os.path.join(roster_dir, f'roster_{file_index}.csv')
+    saved_path = write_output(df_roster, output_file, 'roster', args.format, args.compression, args.writer_threads,
+                              args.roll_rows)
+    print(f"Roster data saved to {saved_path}")
     
-    # Create employee master CSV
-    employee_master_list = []
-    for emp_id, emp_info in employee_master.items():
-        employee_master_list.append(emp_info)
+    if args.append:
+        save_state('roster', build_roster_state(operating_days[-1], file_index,
+                                                shift_history + shifts_from_roster(df_roster), scale_factor))
     
-    df_employees = pd.DataFrame(employee_master_list)
-    employee_file = os.path.join(employee_dir, 'employee_0.csv')
-    df_employees.to_csv(employee_file, index=False)
-    print(f"Employee master data saved to {employee_file}")
+    # Create employee master CSV (append runs keep the existing one)
+    if file_index == 0:
+        employee_master_list = []
+        for emp_id, emp_info in employee_master.items():
+            employee_master_list.append(emp_info)
+        
+        df_employees = pd.DataFrame(employee_master_list)
+        employee_file = os.path.join(employee_dir, 'employee_0.csv')
+        saved_path = write_output(df_employees, employee_file, 'employee', args.format, args.compression,
+                                  args.writer_threads)
+        print(f"Employee master data saved to {saved_path}")
+    
+    # Summary statistics come from the accumulator (no re-parsing of start/end times)
+    report = summary.report()
+    report_path = write_report(report, f'roster_{file_index}')
+    print(f"Summary report saved to {report_path}")
     
     # Print summary statistics
     print("\n" + "="*60)
@@ -491,54 +868,51 @@ def main():
     print("="*60)
     
     # Total shifts
-    print(f"\nTotal Shifts Generated: {len(df_roster):,}")
+    print(f"\nTotal Shifts Generated: {report['shifts']:,}")
     
     # Shifts per role
     print("\nShifts by Role:")
-    role_counts = df_roster['role'].value_counts()
-    for role, count in role_counts.items():
-        pct = (count / len(df_roster)) * 100
+    for role, count in report['shifts_by_role'].items():
+        pct = (count / report['shifts']) * 100
         print(f"  {role}: {count:,} ({pct:.1f}%)")
     
+    # Staffing requirements nobody could fill (constraint solver)
+    if report['unfilled_slots']:
+        print(f"\nUnfilled Slots: {sum(report['unfilled_slots'].values()):,}")
+        for role, count in report['unfilled_slots'].items():
+            print(f"  {role}: {count:,}")
+    
+    # Work-pattern minimums missed (full calendar weeks only)
+    if report['weeks_below_minimum_shifts']:
+        print(f"\nEmployee-Weeks Below Minimum Shifts: {sum(report['weeks_below_minimum_shifts'].values()):,}")
+        for work_pattern, count in report['weeks_below_minimum_shifts'].items():
+            print(f"  {work_pattern}: {count:,}")
+    
     # Average shifts per employee
-    shifts_per_emp = df_roster['employee_id'].value_counts()
-    print(f"\nAverage Shifts per Employee: {shifts_per_emp.mean():.1f}")
-    print(f"Min Shifts: {shifts_per_emp.min()}")
-    print(f"Max Shifts: {shifts_per_emp.max()}")
+    print(f"\nAverage Shifts per Employee: {report['average_shifts_per_employee']:.1f}")
+    print(f"Min Shifts: {report['min_shifts_per_employee']}")
+    print(f"Max Shifts: {report['max_shifts_per_employee']}")
     
     # Shifts per location
     print("\nShifts by Location:")
-    location_counts = df_roster['area_department'].value_counts()
-    for location in LOCATIONS:
-        count = location_counts.get(location, 0)
-        pct = (count / len(df_roster)) * 100
+    for location in locations:
+        count = report['shifts_by_location'].get(location, 0)
+        pct = (count / report['shifts']) * 100
         print(f"  {location}: {count:,} ({pct:.1f}%)")
     
-    # Calculate labor cost
-    df_roster['start_time_dt'] = pd.to_datetime(df_roster['start_time'])
-    df_roster['end_time_dt'] = pd.to_datetime(df_roster['end_time'])
-    df_roster['hours_worked'] = (df_roster['end_time_dt'] - df_roster['start_time_dt']).dt.total_seconds() / 3600
-    df_roster['break_hours'] = df_roster['break_duration'] / 60
-    df_roster['paid_hours'] = df_roster['hours_worked'] - df_roster['break_hours']
-    df_roster['shift_cost'] = df_roster['paid_hours'] * df_roster['pay_rate']
-    
-    total_labor_cost = df_roster['shift_cost'].sum()
-    print(f"\nTotal Labor Cost: ${total_labor_cost:,.2f} AUD")
+    # Labor cost
+    print(f"\nTotal Labor Cost: ${report['total_labor_cost']:,.2f} AUD")
     
     # Average daily staffing cost by location
     print("\nAverage Daily Staffing Cost by Location:")
-    df_roster['date'] = df_roster['start_time_dt'].dt.date
-    daily_costs = df_roster.groupby(['area_department', 'date'])['shift_cost'].sum().reset_index()
-    avg_daily_costs = daily_costs.groupby('area_department')['shift_cost'].mean()
-    for location in LOCATIONS:
-        cost = avg_daily_costs.get(location, 0)
+    for location in locations:
+        cost = report['average_daily_cost_by_location'].get(location, 0)
         print(f"  {location}: ${cost:,.2f}")
     
     # Published status
     print("\nPublished Status:")
-    published_counts = df_roster['published'].value_counts()
-    for status, count in published_counts.items():
-        pct = (count / len(df_roster)) * 100
+    for status, count in report['published'].items():
+        pct = (count / report['shifts']) * 100
         print(f"  {status}: {count:,} ({pct:.1f}%)")
     
     print("\n" + "="*60)
@@ -0,0 +1,37 @@
+"""
+Generate the store master data (store_0.csv).
+Scale factor 1 gives the original four Melbourne cafes; larger scale factors add
+numbered copies of the network that match the POS, roster and financial data.
+"""
+
+import argparse
+import pandas as pd
+from output_writers import add_output_arguments, write_output
+from scale_factor import add_scale_argument, generate_stores
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Generate cafe store master data.')
+    add_scale_argument(parser)
+    add_output_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main function to generate and save store data."""
+    args = parse_args()
+    print("Generating store data...")
+    print(f"Scale factor: {args.scale_factor}\n")
+
+    df = pd.DataFrame(generate_stores(args.scale_factor))
+
+    output_file = '../data/store/store_0.csv'
+    saved_path = write_output(df, output_file, 'store', args.format)
+    print(f"Store data saved to {saved_path}")
+    print(f"Total Stores: {len(df):,}")
+    print("Generation complete!")
+
+
+if __name__ == '__main__':
+    main()
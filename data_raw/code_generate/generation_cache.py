@@ -0,0 +1,154 @@
+"""
+Content-addressed generation cache.
+Generators hash their effective configuration (module constants and options) plus seed
+for every output partition and keep the hashes in a manifest next to the generator
+state, so a rerun only regenerates and rewrites partitions whose inputs changed.
+"""
+
+import os
+import glob
+import json
+import shutil
+import hashlib
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+from generator_state import STATE_DIR
+from output_writers import parquet_path, partition_keys, write_output, write_parquet
+
+CACHE_OUTPUT = True  # Skip partitions whose configuration hash is unchanged since the last run
+
+# Constants that choose what to generate rather than how (the partition keys cover them)
+RUN_CONSTANTS = {'START_DATE', 'END_DATE', 'OPERATING_DAYS', 'RANDOM_SEED', 'WORKERS', 'ENGINE',
+                 'STREAM_OUTPUT', 'APPEND_DAYS', 'DECODE_CHUNK_ROWS', 'CACHE_OUTPUT', 'WRITER_THREADS'}
+CONFIG_TYPES = (dict, list, tuple, set, frozenset, str, int, float, bool, type(None), date, datetime)
+
+
+def add_cache_argument(parser):
+    """Add the shared --no-cache option to a generator's argument parser."""
+    parser.add_argument('--no-cache', dest='cache', action='store_false', default=CACHE_OUTPUT,
+                        help='regenerate every partition even if its configuration is unchanged')
+
+
+def canonical(value):
+    """Stable text for hashing (sets sorted, numpy arrays by content)."""
+    if isinstance(value, np.ndarray):
+        return f"ndarray:{value.dtype.str}:{hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}"
+    if isinstance(value, dict):
+        return '{' + ', '.join(f"{canonical(k)}: {canonical(v)}" for k, v in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(canonical(v) for v in value) + ']'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ', '.join(sorted(canonical(v) for v in value)) + '}'
+    return repr(value)
+
+
+def fingerprint(*parts):
+    """SHA-256 hex digest of the canonical form of parts."""
+    return hashlib.sha256(canonical(parts).encode()).hexdigest()
+
+
+def module_config(namespace, exclude=RUN_CONSTANTS):
+    """A generator's effective configuration: the upper-case constants in its globals(), minus run controls."""
+    return {name: value for name, value in namespace.items()
+            if name.isupper() and name not in exclude and isinstance(value, CONFIG_TYPES)}
+
+
+def output_signature(output_path):
+    """[path, size, mtime] of every file at output_path (a file, dataset directory or glob pattern)."""
+    files = []
+    for path in glob.glob(output_path):
+        if os.path.isdir(path):
+            files.extend(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        else:
+            files.append(path)
+    return [[path, os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in sorted(files)]
+
+
+class PartitionManifest:
+    """Configuration hash per output partition from the last run that wrote `output_path`
+    (a file, a dataset directory or a glob pattern of rolled files).
+
+    The manifest also records the size and mtime of every output file, so output
+    rewritten outside the cache (another engine, --append) invalidates it.
+    """
+
+    def __init__(self, name, output_path):
+        self.path = os.path.join(STATE_DIR, f"{name}_manifest.json")
+        self.output_path = output_path
+        self.partitions = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                manifest = json.load(f)
+            if manifest['output_path'] == output_path and manifest.get('output') == output_signature(output_path):
+                self.partitions = manifest['partitions']
+
+    def changed(self, digests):
+        """Partition keys whose hash differs from (or is missing in) the manifest."""
+        return [key for key, digest in digests.items() if self.partitions.get(key) != digest]
+
+    def removed(self, digests):
+        """Partition keys in the manifest that are no longer generated."""
+        return [key for key in self.partitions if key not in digests]
+
+    def save(self, digests):
+        """Atomically replace the manifest with the hashes of the partitions just written."""
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'output_path': self.output_path, 'output': output_signature(self.output_path),
+                       'partitions': digests}, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.partitions = dict(digests)
+
+    def clear(self):
+        """Forget every partition (call before writing output the manifest does not describe)."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.partitions = {}
+
+
+def remove_partitions(dataset_dir, keys):
+    """Delete hive partition folders (e.g. 'month=2025-10') from a Parquet dataset."""
+    for key in keys:
+        partition_dir = os.path.join(dataset_dir, key)
+        if os.path.isdir(partition_dir):
+            shutil.rmtree(partition_dir)
+
+
+def write_cached_output(df, output_file, table, output_format='csv', config=None, cache=CACHE_OUTPUT):
+    """Write a generator DataFrame, rewriting only partitions whose configuration changed.
+
+    Each partition (TABLE_PARTITIONS, e.g. per month) is hashed from `config` and its
+    key. Unchanged partitions keep the rows already on disk: a CSV is spliced from the
+    existing file, a Parquet dataset only has the changed partition folders replaced.
+    Returns (saved path, DataFrame as written (for Parquet: as generated), number of
+    partitions rewritten).
+    """
+    saved_path = output_file if output_format == 'csv' else parquet_path(output_file)
+    keys = partition_keys(df, table)
+    digests = {key: fingerprint(config, key) for key in pd.unique(keys)}
+    manifest = PartitionManifest(f"{table}_{output_format}", saved_path)
+    changed = manifest.changed(digests) if cache else list(digests)
+    removed = manifest.removed(digests)
+    if not changed and not removed:
+        return saved_path, pd.read_csv(output_file) if output_format == 'csv' else df, 0
+
+    if output_format == 'csv':
+        if len(changed) < len(digests):
+            # Keep the rows of unchanged partitions, in the order of the new partition list
+            existing = pd.read_csv(output_file)
+            existing_keys = partition_keys(existing, table)
+            kept = existing[existing_keys.isin(digests) & ~existing_keys.isin(changed)]
+            merged = pd.concat([kept, df[keys.isin(changed)]], ignore_index=True)
+            rank = {key: i for i, key in enumerate(digests)}
+            order = partition_keys(merged, table).map(rank).to_numpy().argsort(kind='stable')
+            df = merged.iloc[order].reset_index(drop=True)
+        write_output(df, output_file, table, output_format)
+    elif len(changed) == len(digests):
+        write_output(df, output_file, table, output_format)
+    else:
+        remove_partitions(saved_path, changed + removed)
+        write_parquet(df[keys.isin(changed)], saved_path, table)
+    manifest.save(digests)
+    return saved_path, df, len(changed)
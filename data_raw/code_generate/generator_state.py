@@ -0,0 +1,47 @@
+"""
+Resumable generator state for incremental (append) runs.
+State files live in ../data/state, outside the folders read by the bronze layer.
+"""
+
+import os
+import json
+from datetime import date, timedelta
+
+STATE_DIR = '../data/state'
+
+
+def state_path(name):
+    """Path of the state file for a generator (e.g. 'pos' -> ../data/state/pos_state.json)."""
+    return os.path.join(STATE_DIR, f"{name}_state.json")
+
+
+def load_state(name):
+    """Load a generator's saved state, or None if it has never run in append mode."""
+    path = state_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(name, state):
+    """Atomically write a generator's state (dates must already be ISO strings)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = state_path(name)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def next_operating_days(last_date, n_days):
+    """The next n_days operating days (Monday-Friday) after last_date."""
+    if isinstance(last_date, str):
+        last_date = date.fromisoformat(last_date)
+    days = []
+    current_date = last_date + timedelta(days=1)
+    while len(days) < n_days:
+        if current_date.weekday() < 5:  # Monday=0, Friday=4
+            days.append(current_date)
+        current_date += timedelta(days=1)
+    return days
@@ -0,0 +1,252 @@
+"""
+Inject data-quality faults into generated POS, roster, employee and store CSV files.
+Writes corrupted copies (null IDs, negative prices, inverted shifts, malformed timestamps,
+truncated lines, extra columns) for testing the bronze badRecordsPath and the silver
+expectations, plus a ground-truth sidecar per file listing every corrupted row.
+The clean source files are left untouched.
+"""
+
+import os
+import zlib
+import argparse
+import numpy as np
+import pandas as pd
+
+# Configuration
+INPUT_DIR = '../data'  # Generated {table}/{table}_<n>.csv files
+OUTPUT_DIR = '../data/faulty'  # Corrupted copies in {table}/, sidecars in ground_truth/
+FAULT_RATE = 0.01  # Share of rows corrupted in every file
+FAULT_SEED = 42
+TABLES = ['pos', 'roster', 'employee', 'store']
+
+# Fault kinds per table and the columns each may hit (None = the whole CSV line)
+TABLE_FAULTS = {
+    'pos': {
+        'null_id': ['transaction_id', 'order_id', 'employee_id', 'location_id'],
+        'negative_price': ['unit_price', 'line_total'],
+        'bad_quantity': ['quantity'],
+        'malformed_timestamp': ['transaction_datetime'],
+        'truncated_line': None,
+        'extra_column': None
+    },
+    'roster': {
+        'null_id': ['employee_id'],
+        'negative_price': ['pay_rate'],
+        'inverted_time_range': ['end_time'],
+        'malformed_timestamp': ['start_time', 'end_time'],
+        'truncated_line': None,
+        'extra_column': None
+    },
+    'employee': {
+        'null_id': ['employee_id'],
+        'negative_price': ['pay_rate'],
+        'truncated_line': None,
+        'extra_column': None
+    },
+    'store': {
+        'null_id': ['location_id'],
+        'truncated_line': None,
+        'extra_column': None
+    }
+}
+
+# Where each column fault should be caught: silver.sql expectation or the bronze
+# TIMESTAMP cast (blank = not checked by the pipeline yet). Line faults break the
+# column count and should land in badRecordsPath.
+FAULT_CHECKS = {
+    ('pos', 'null_id', 'transaction_id'): 'valid_transaction_id',
+    ('pos', 'null_id', 'order_id'): 'valid_order_id',
+    ('pos', 'null_id', 'employee_id'): 'valid_employee_id',
+    ('pos', 'null_id', 'location_id'): 'valid_location_id',
+    ('pos', 'negative_price', 'unit_price'): 'valid_unit_price',
+    ('pos', 'negative_price', 'line_total'): 'valid_line_total',
+    ('pos', 'bad_quantity', 'quantity'): 'valid_quantity',
+    ('pos', 'malformed_timestamp', 'transaction_datetime'): 'timestamp_cast',
+    ('roster', 'null_id', 'employee_id'): 'valid_employee_id',
+    ('roster', 'inverted_time_range', 'end_time'): 'valid_time_range',
+    ('roster', 'malformed_timestamp', 'start_time'): 'valid_start_time',
+    ('roster', 'malformed_timestamp', 'end_time'): 'valid_end_time',
+    ('employee', 'null_id', 'employee_id'): 'valid_employee_id',
+    ('store', 'null_id', 'location_id'): 'valid_location_id'
+}
+LINE_CHECK = 'badRecordsPath'
+
+# Values no timestamp parser accepts (Spark to_timestamp and pandas both give NULL/NaT or an error)
+MALFORMED_TIMESTAMPS = ['2025-13-45 25:61:00', 'not a timestamp', '31/02/2025 8:00', '2025-10-01T99:99', '1759276800']
+EXTRA_COLUMN_VALUE = 'UNEXPECTED'
+
+GROUND_TRUTH_COLUMNS = ['row', 'line', 'fault', 'column', 'original_value', 'check']
+
+
+def source_files(input_dir, table):
+    """Generated CSV files of a table ({input_dir}/{table}/{table}_<n>.csv), in name order."""
+    table_dir = os.path.join(input_dir, table)
+    if not os.path.isdir(table_dir):
+        return []
+    return [os.path.join(table_dir, name) for name in sorted(os.listdir(table_dir))
+            if name.startswith(f"{table}_") and name.endswith('.csv')]
+
+
+def file_rng(seed, file_name):
+    """Random stream of one file, so a file gets the same faults on every run."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(zlib.crc32(file_name.encode()),)))
+
+
+def choose_faults(rng, n_rows, table, rate=FAULT_RATE, kinds=None):
+    """Pick the corrupted rows and a fault and column for each.
+
+    Each row is corrupted with probability `rate`; faults are spread evenly over the
+    table's kinds (those in `kinds` if given) and columns evenly within a kind
+    (blank for line faults). Returns rows, faults and columns, sorted by row.
+    """
+    table_faults = {kind: columns for kind, columns in TABLE_FAULTS[table].items() if kinds is None or kind in kinds}
+    rows = np.flatnonzero(rng.random(n_rows) < rate) if table_faults else np.array([], dtype=np.int64)
+    n_faulty = len(rows)
+    faults = np.array(list(table_faults), dtype=object)[rng.integers(0, len(table_faults), n_faulty)]
+    columns = np.full(n_faulty, '', dtype=object)
+    for kind, kind_columns in table_faults.items():
+        hit = faults == kind
+        if kind_columns and hit.any():
+            columns[hit] = np.array(kind_columns, dtype=object)[rng.integers(0, len(kind_columns), hit.sum())]
+    return rows, faults, columns
+
+
+def corrupt_values(rng, df, rows, faults, columns):
+    """Apply the column faults to df (the CSV text as strings) in place.
+
+    Returns the original value of every fault (blank for line faults).
+    """
+    original = np.full(len(rows), '', dtype=object)
+    for fault, column in sorted({(fault, column) for fault, column in zip(faults, columns) if column}):
+        hit = np.flatnonzero((faults == fault) & (columns == column))
+        target = rows[hit]
+        values = df[column].to_numpy()[target]
+        original[hit] = values
+        if fault == 'null_id':
+            corrupted = np.full(len(target), '', dtype=object)
+        elif fault == 'negative_price':
+            corrupted = '-' + values
+        elif fault == 'bad_quantity':
+            corrupted = np.where(rng.random(len(target)) < 0.5, '0', '-' + values)
+        elif fault == 'malformed_timestamp':
+            corrupted = np.array(MALFORMED_TIMESTAMPS, dtype=object)[rng.integers(0, len(MALFORMED_TIMESTAMPS), len(target))]
+        elif fault == 'inverted_time_range':
+            # The shift ends before it starts: swap start and end
+            corrupted = df['start_time'].to_numpy()[target]
+            df.iloc[target, df.columns.get_loc('start_time')] = values
+        else:
+            raise ValueError(f"Unknown column fault: {fault}")
+        df.iloc[target, df.columns.get_loc(column)] = corrupted
+    return original
+
+
+def corrupt_lines(rng, df, lines, rows, faults):
+    """Apply the line faults to the CSV data lines (numpy object array) in place.
+
+    A truncated line stops partway through a field with at least one column
+    missing (never inside quotes, so the next line still parses); an extra
+    column adds one field at the end.
+    """
+    truncated = rows[faults == 'truncated_line']
+    keep = rng.integers(1, len(df.columns) - 1, len(truncated))  # Complete fields kept
+    for n_fields in np.unique(keep):
+        target = truncated[keep == n_fields]
+        head = df.iloc[target, :n_fields].to_csv(header=False, index=False, lineterminator='\n').split('\n')[:-1]
+        cut_field = df.iloc[target, n_fields].to_numpy().astype(str)
+        cut = (rng.random(len(target)) * np.char.str_len(cut_field)).astype(np.int64)
+        plain = (np.char.find(cut_field, ',') < 0) & (np.char.find(cut_field, '"') < 0)
+        partial = np.where(plain, [value[:end] for value, end in zip(cut_field, cut)], '')
+        lines[target] = np.array(head, dtype=object) + ',' + partial.astype(object)
+    extra = rows[faults == 'extra_column']
+    lines[extra] = lines[extra] + ',' + EXTRA_COLUMN_VALUE
+
+
+def inject_file(input_file, output_file, table, rate=FAULT_RATE, seed=FAULT_SEED, kinds=None):
+    """Write a corrupted copy of one generated CSV and return its ground truth DataFrame.
+
+    Values are read and written back as text, so rows without a fault are
+    byte-identical to the source.
+    """
+    df = pd.read_csv(input_file, dtype=str, keep_default_na=False)
+    rng = file_rng(seed, os.path.basename(input_file))
+    rows, faults, columns = choose_faults(rng, len(df), table, rate, kinds)
+    original = corrupt_values(rng, df, rows, faults, columns)
+
+    header, *lines = df.to_csv(index=False, lineterminator='\n').split('\n')[:-1]
+    lines = np.array(lines, dtype=object)
+    corrupt_lines(rng, df, lines, rows, faults)
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, 'w') as f:
+        f.write('\n'.join([header, *lines]) + '\n')
+
+    checks = [FAULT_CHECKS.get((table, fault, column), '') if column else LINE_CHECK
+              for fault, column in zip(faults, columns)]
+    return pd.DataFrame({
+        'row': rows,
+        'line': rows + 2,  # 1-based line in the CSV file, after the header
+        'fault': faults,
+        'column': columns,
+        'original_value': original,
+        'check': checks
+    }, columns=GROUND_TRUTH_COLUMNS)
+
+
+def inject_faults(input_dir=INPUT_DIR, output_dir=OUTPUT_DIR, tables=TABLES, rate=FAULT_RATE, seed=FAULT_SEED,
+                  kinds=None):
+    """Corrupt every generated file of the given tables.
+
+    Copies go to {output_dir}/{table}/ (same file names, so they can be uploaded in
+    place of data_source/{table}/) and ground truth to {output_dir}/ground_truth/
+    {file}_faults.csv. Returns {input file: ground truth DataFrame}.
+    """
+    results = {}
+    for table in tables:
+        for input_file in source_files(input_dir, table):
+            file_name = os.path.basename(input_file)
+            ground_truth = inject_file(input_file, os.path.join(output_dir, table, file_name), table, rate, seed, kinds)
+            truth_file = os.path.join(output_dir, 'ground_truth', f"{os.path.splitext(file_name)[0]}_faults.csv")
+            os.makedirs(os.path.dirname(truth_file), exist_ok=True)
+            ground_truth.to_csv(truth_file, index=False)
+            results[input_file] = ground_truth
+    return results
+
+
+def parse_args():
+    """Parse command line options."""
+    all_kinds = sorted({kind for table_faults in TABLE_FAULTS.values() for kind in table_faults})
+    parser = argparse.ArgumentParser(description='Inject data-quality faults into generated cafe CSV files.')
+    parser.add_argument('--input-dir', default=INPUT_DIR, help='folder holding the generated {table}/ folders')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='folder the corrupted copies and ground truth go to')
+    parser.add_argument('--tables', nargs='+', choices=TABLES, default=TABLES, help='tables to corrupt (default: all)')
+    parser.add_argument('--rate', type=float, default=FAULT_RATE, help='share of rows corrupted in every file')
+    parser.add_argument('--faults', nargs='+', choices=all_kinds,
+                        help='fault kinds to inject (default: every kind a table supports)')
+    parser.add_argument('--seed', type=int, default=FAULT_SEED, help='random seed for reproducible faults')
+    args = parser.parse_args()
+    if not 0 <= args.rate <= 1:
+        parser.error('--rate must be between 0 and 1')
+    return args
+
+
+def main():
+    """Main function to inject faults into the generated data."""
+    args = parse_args()
+    print("Injecting data-quality faults...")
+    print(f"Tables: {', '.join(args.tables)}")
+    print(f"Fault rate: {args.rate:.2%} of rows per file")
+    print(f"Output directory: {args.output_dir}\n")
+
+    results = inject_faults(args.input_dir, args.output_dir, args.tables, args.rate, args.seed, args.faults)
+    if not results:
+        print(f"No generated CSV files found in {args.input_dir}")
+        return
+    for input_file, ground_truth in results.items():
+        counts = ', '.join(f"{fault} {count:,}" for fault, count in ground_truth['fault'].value_counts().items())
+        print(f"{input_file}: {len(ground_truth):,} rows corrupted ({counts or 'none'})")
+    print(f"\nGround truth saved to {os.path.join(args.output_dir, 'ground_truth')}")
+    print("Fault injection complete!")
+
+
+if __name__ == '__main__':
+    main()
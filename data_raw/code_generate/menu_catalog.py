@@ -0,0 +1,163 @@
+"""
+Compiled menu catalog for the POS generators and validation tools.
+Flattens every (category, item, variation, size, milk, modifiers) combination into
+integer-coded columns with a joint probability vector and alias tables for O(1) sampling.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+
+
+def clean_variation(variation):
+    """Variation name as used in order IDs (ORD-{VARIATION}-####)."""
+    return variation.upper().replace(' ', '').replace('&', '').replace('-', '').replace('/', '')
+
+
+def build_alias_table(probability):
+    """Build Walker/Vose alias tables for O(1) sampling from a discrete distribution."""
+    n = len(probability)
+    scaled = np.asarray(probability, dtype=float) * n / np.sum(probability)
+    alias_probability = np.ones(n)
+    alias_index = np.arange(n)
+
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        alias_probability[s] = scaled[s]
+        alias_index[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # Whatever is left over is 1.0 up to rounding error
+    return alias_probability, alias_index
+
+
+class MenuCatalog:
+    """Flattened SKU table compiled once from the menu.
+
+    Each SKU is one (category, item, variation, size, milk, modifiers) combination.
+    Columns ending in `_code` index into the matching value lists (`categories`,
+    `items`, `variations`, `sizes`, `milk_types`, `modifier_sets`); None is an
+    ordinary value in `sizes` and `milk_types`.
+    """
+
+    def __init__(self, skus):
+        """Compile the catalog from SKU dicts.
+
+        Each SKU dict has category_name, item_key, item_name, variation, size,
+        milk_type, modifiers (list), price_range (low, high) and probability.
+        """
+        self.categories = list(dict.fromkeys(sku['category_name'] for sku in skus))
+        self.items = list(dict.fromkeys(sku['item_key'] for sku in skus))
+        self.variations = list(dict.fromkeys(sku['variation'] for sku in skus))
+        self.sizes = list(dict.fromkeys(sku['size'] for sku in skus))
+        self.milk_types = list(dict.fromkeys(sku['milk_type'] for sku in skus))
+        self.modifier_sets = list(dict.fromkeys(json.dumps(sku['modifiers']) for sku in skus))
+
+        # Integer-coded SKU columns
+        self.category_code = np.array([self.categories.index(sku['category_name']) for sku in skus], dtype=np.int16)
+        self.item_code = np.array([self.items.index(sku['item_key']) for sku in skus], dtype=np.int16)
+        self.variation_code = np.array([self.variations.index(sku['variation']) for sku in skus], dtype=np.int16)
+        self.size_code = np.array([self.sizes.index(sku['size']) for sku in skus], dtype=np.int16)
+        self.milk_code = np.array([self.milk_types.index(sku['milk_type']) for sku in skus], dtype=np.int16)
+        self.modifier_code = np.array([self.modifier_sets.index(json.dumps(sku['modifiers'])) for sku in skus], dtype=np.int16)
+        self.price_low = np.array([sku['price_range'][0] for sku in skus])
+        self.price_high = np.array([sku['price_range'][1] for sku in skus])
+
+        # Joint probability, cumulative weights and alias tables
+        self.probability = np.array([sku['probability'] for sku in skus], dtype=float)
+        self.probability /= self.probability.sum()
+        self.cumulative = np.cumsum(self.probability)
+        self.cumulative[-1] = 1.0
+        self.alias_probability, self.alias_index = build_alias_table(self.probability)
+
+        # Per-variation lookups
+        item_names = {sku['item_key']: sku['item_name'] for sku in skus}
+        self.item_names = [item_names[item_key] for item_key in self.items]
+        self.variation_category = {sku['variation']: sku['category_name'] for sku in skus}
+        self.variation_item = {sku['variation']: sku['item_name'] for sku in skus}
+        self.order_prefix = np.array([f"ORD-{clean_variation(variation)}-" for variation in self.variations], dtype=object)
+
+        # Ready-made get_menu_item() results, one per SKU
+        self.records = [{
+            'category_name': sku['category_name'],
+            'item_name': sku['item_name'],
+            'variation': sku['variation'],
+            'variation_name': sku['variation'],
+            'size': sku['size'],
+            'milk_type': sku['milk_type'],
+            'modifiers': sku['modifiers'],
+            'item_key': sku['item_key'],
+            'order_prefix': f"ORD-{clean_variation(sku['variation'])}-",
+            'modifiers_json': json.dumps(sku['modifiers'])
+        } for sku in skus]
+
+    def __len__(self):
+        return len(self.probability)
+
+    def sample(self, rng, size):
+        """Draw `size` SKU codes with a numpy Generator using the alias tables."""
+        slot = rng.integers(0, len(self), size)
+        keep = rng.random(size) < self.alias_probability[slot]
+        return np.where(keep, slot, self.alias_index[slot])
+
+    def sample_variation(self, rng, variation, size):
+        """Draw `size` SKU codes of one variation, in proportion to their probability."""
+        skus = np.flatnonzero(self.variation_code == self.variations.index(variation))
+        cumulative = np.cumsum(self.probability[skus])
+        return skus[np.minimum(np.searchsorted(cumulative, rng.random(size) * cumulative[-1], side='right'), len(skus) - 1)]
+
+    def sample_one(self, rand):
+        """Draw one SKU code with a `random` module (or random.Random) instance."""
+        slot = int(rand.random() * len(self))
+        if rand.random() < self.alias_probability[slot]:
+            return slot
+        return int(self.alias_index[slot])
+
+    def decode(self, column, sku):
+        """Decode SKU codes into an object array of values for one column.
+
+        column is one of 'category_name', 'item_name', 'variation_name', 'size',
+        'milk_type', 'modifiers' (JSON strings) or 'order_prefix'.
+        """
+        variation = self.variation_code[sku]
+        if column == 'category_name':
+            return np.array(self.categories, dtype=object)[self.category_code[sku]]
+        if column == 'item_name':
+            return np.array(self.item_names, dtype=object)[self.item_code[sku]]
+        if column == 'variation_name':
+            return np.array(self.variations, dtype=object)[variation]
+        if column == 'size':
+            return np.array(self.sizes, dtype=object)[self.size_code[sku]]
+        if column == 'milk_type':
+            return np.array(self.milk_types, dtype=object)[self.milk_code[sku]]
+        if column == 'modifiers':
+            return np.array(self.modifier_sets, dtype=object)[self.modifier_code[sku]]
+        if column == 'order_prefix':
+            return self.order_prefix[variation]
+        raise ValueError(f"Unknown catalog column: {column}")
+
+    def category_for_variation(self, variation_name):
+        """Map a variation name (e.g. 'Flat White') to its category name."""
+        return self.variation_category[variation_name]
+
+    def to_dataframe(self):
+        """SKU table as a DataFrame (one row per SKU) for inspection and validation."""
+        sku = np.arange(len(self))
+        return pd.DataFrame({
+            'sku': sku,
+            'category_name': self.decode('category_name', sku),
+            'item_name': self.decode('item_name', sku),
+            'variation_name': self.decode('variation_name', sku),
+            'size': self.decode('size', sku),
+            'milk_type': self.decode('milk_type', sku),
+            'modifiers': self.decode('modifiers', sku),
+            'price_low': self.price_low,
+            'price_high': self.price_high,
+            'probability': self.probability
+        })
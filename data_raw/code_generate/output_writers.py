@@ -0,0 +1,486 @@
+"""
+Shared output helpers for the data generators.
+Writes generator DataFrames as CSV or as hive-partitioned Parquet (via Arrow) with
+column types matching the bronze schemas in databricks_pipeline/transformations/bronze.sql.
+Batches are encoded and compressed on background threads (BackgroundWriter), so a
+generator keeps producing while earlier batches are written.
+"""
+
+import os
+import glob
+import gzip
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from scale_factor import non_negative_int, positive_int
+
+OUTPUT_FORMATS = ['csv', 'parquet']
+PARQUET_ROW_GROUP_SIZE = 128 * 1024  # Rows per row group (min/max statistics are kept per group)
+PARQUET_COMPRESSION = 'snappy'
+
+# Background writer
+COMPRESSIONS = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}  # CSV compression -> file extension
+WRITER_THREADS = 2  # Encode/compress threads (0 = encode and write on the generating thread)
+WRITER_QUEUE_SIZE = 4  # Batches waiting to be written before the generator blocks
+WRITE_CHUNK_ROWS = 100000  # Rows per batch when a whole DataFrame is written
+ROLL_ROWS = None  # Start a new CSV file once this many rows are written (None = one file)
+
+# Column types per table: bronze.sql types for POS/roster/employee/store,
+# plus the financial tables (STRING, TIMESTAMP, DATE, INT, BIGINT, DOUBLE)
+TABLE_SCHEMAS = {
+    'pos': {
+        'transaction_id': 'STRING',
+        'order_id': 'STRING',
+        'transaction_datetime': 'TIMESTAMP',
+        'category_name': 'STRING',
+        'item_name': 'STRING',
+        'variation_name': 'STRING',
+        'size': 'STRING',
+        'milk_type': 'STRING',
+        'quantity': 'INT',
+        'unit_price': 'DOUBLE',
+        'line_total': 'DOUBLE',
+        'modifiers': 'STRING',
+        'employee_id': 'STRING',
+        'payment_method': 'STRING',
+        'customer_name': 'STRING',
+        'location_id': 'STRING'
+    },
+    'roster': {
+        'employee_id': 'STRING',
+        'role': 'STRING',
+        'start_time': 'TIMESTAMP',
+        'end_time': 'TIMESTAMP',
+        'area_department': 'STRING',
+        'pay_rate': 'DOUBLE',
+        'notes': 'STRING',
+        'published': 'STRING',
+        'break_duration': 'DOUBLE'
+    },
+    'coverage': {
+        'location_id': 'STRING',
+        'role': 'STRING',
+        'slot_start': 'TIMESTAMP',
+        'staff': 'INT'
+    },
+    'employee': {
+        'employee_id': 'STRING',
+        'employee_name': 'STRING',
+        'role': 'STRING',
+        'primary_location': 'STRING',
+        'pay_rate': 'DOUBLE',
+        'work_pattern': 'STRING'
+    },
+    'store': {
+        'location_id': 'STRING',
+        'cafe_name': 'STRING',
+        'address': 'STRING'
+    },
+    'company_expenses': {
+        'Month': 'DATE',
+        'Expense Category': 'STRING',
+        'Expense Items': 'STRING',
+        'Expense Values': 'DOUBLE'
+    },
+    'income_statement': {
+        'Month': 'DATE',
+        'Expense Category': 'STRING',
+        'Expense Items': 'STRING',
+        'Expense Values': 'DOUBLE'
+    },
+    'channel_revenues': {
+        'Month & Year': 'STRING',
+        'First Date': 'DATE',
+        'Channel': 'STRING',
+        'Category': 'STRING',
+        'Sales Values': 'DOUBLE'
+    },
+    'balance_sheet': {
+        'Year': 'INT',
+        'Balance Sheet Type': 'STRING',
+        'Category': 'STRING',
+        'Sub Category': 'STRING',
+        'Balance Sheet Values': 'DOUBLE'
+    },
+    'cash_flow': {
+        'Year': 'INT',
+        'Cash Flow Type': 'STRING',
+        'Cash Flow Category': 'STRING',
+        'Cash Flow Sub Category': 'STRING',
+        'Cash Flow Values': 'DOUBLE'
+    }
+}
+
+# strftime format for TIMESTAMP columns held as datetime64 when writing CSV
+TABLE_DATE_FORMATS = {
+    'roster': '%Y-%m-%d %H:%M',
+    'coverage': '%Y-%m-%d %H:%M'
+}
+
+# Hive partition columns per table: name -> (source column, strftime format),
+# or None to partition on an existing column
+TABLE_PARTITIONS = {
+    'pos': {'transaction_date': ('transaction_datetime', '%Y-%m-%d'), 'location_id': None},
+    'roster': {'shift_date': ('start_time', '%Y-%m-%d'), 'area_department': None},
+    'coverage': {'slot_date': ('slot_start', '%Y-%m-%d'), 'location_id': None},
+    'employee': {},
+    'store': {},
+    'company_expenses': {'month': ('Month', '%Y-%m')},
+    'income_statement': {'month': ('Month', '%Y-%m')},
+    'channel_revenues': {'month': ('First Date', '%Y-%m')},
+    'balance_sheet': {'Year': None},
+    'cash_flow': {'Year': None}
+}
+
+
+def add_output_arguments(parser):
+    """Add the shared --format option to a generator's argument parser."""
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+                        help='csv: single file, parquet: hive-partitioned Parquet dataset')
+
+
+def add_writer_arguments(parser):
+    """Add the shared background writer options (compression, threads, rolling files)."""
+    parser.add_argument('--compression', choices=list(COMPRESSIONS), default='none',
+                        help='CSV compression (.gz/.zst), or the Parquet codec instead of snappy')
+    parser.add_argument('--writer-threads', type=non_negative_int, default=WRITER_THREADS,
+                        help='threads encoding and compressing batches in the background (0 = none)')
+    parser.add_argument('--roll-rows', type=positive_int, default=ROLL_ROWS,
+                        help='start a new CSV file (<name>-00001.csv, ...) after this many rows (default: one file)')
+
+
+def parquet_path(output_file):
+    """Dataset directory used in place of a CSV path (pos_0.csv -> pos_0/)."""
+    return os.path.splitext(output_file)[0]
+
+
+def partition_values(df, table):
+    """Hive partition values (strings) for every row, by partition column."""
+    values = {}
+    for column, source in TABLE_PARTITIONS[table].items():
+        if source is None:
+            values[column] = df[column].astype(str)
+        else:
+            source_column, date_format = source
+            values[column] = pd.to_datetime(df[source_column]).dt.strftime(date_format)
+    return values
+
+
+def partition_keys(df, table):
+    """Partition folder of every row within the Parquet dataset (e.g. 'month=2025-10')."""
+    parts = [column + '=' + values for column, values in partition_values(df, table).items()]
+    keys = parts[0] if parts else pd.Series('', index=df.index)
+    for part in parts[1:]:
+        keys = keys + '/' + part
+    return keys
+
+
+def to_arrow_table(df, table):
+    """Convert a generator DataFrame to an Arrow table typed like the bronze schema.
+
+    String columns are dictionary-encoded; partition columns are added as strings.
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        'STRING': pa.dictionary(pa.int32(), pa.string()),
+        'TIMESTAMP': pa.timestamp('us'),
+        'DATE': pa.date32(),
+        'INT': pa.int32(),
+        'BIGINT': pa.int64(),
+        'DOUBLE': pa.float64()
+    }
+
+    arrays = {}
+    fields = []
+    for column, column_type in TABLE_SCHEMAS[table].items():
+        values = df[column]
+        if column_type in ['TIMESTAMP', 'DATE']:
+            values = pd.to_datetime(values)
+        if column_type == 'DATE':
+            values = values.dt.date
+        if column_type == 'STRING':
+            if pd.api.types.is_integer_dtype(values):
+                values = values.astype(str)  # e.g. compact POS IDs
+            values = values.astype(object).where(values.notna(), None)
+            arrays[column] = pa.array(values, type=pa.string()).dictionary_encode()
+        else:
+            arrays[column] = pa.array(values, type=arrow_types[column_type], from_pandas=True)
+        fields.append(pa.field(column, arrow_types[column_type]))
+
+    for column, values in partition_values(df, table).items():
+        if TABLE_PARTITIONS[table][column] is not None:
+            arrays[column] = pa.array(values, type=pa.string())
+            fields.append(pa.field(column, pa.string()))
+
+    return pa.Table.from_arrays(list(arrays.values()), schema=pa.schema(fields))
+
+
+def write_parquet(df, dataset_dir, table, part=0, compression=PARQUET_COMPRESSION):
+    """Write a DataFrame into a hive-partitioned Parquet dataset.
+
+    Each call adds files named part-{part}-*.parquet, so repeated calls with
+    different `part` numbers append batches to the same dataset.
+    """
+    import pyarrow.parquet as pq
+
+    os.makedirs(dataset_dir, exist_ok=True)
+    arrow_table = to_arrow_table(df, table)
+    partition_cols = list(TABLE_PARTITIONS[table])
+    kwargs = {
+        'row_group_size': PARQUET_ROW_GROUP_SIZE,
+        'compression': compression,
+        'write_statistics': True,
+        'use_dictionary': True
+    }
+    if partition_cols:
+        pq.write_to_dataset(arrow_table, dataset_dir, partition_cols=partition_cols,
+                            basename_template=f"part-{part:05d}-{{i}}.parquet",
+                            existing_data_behavior='overwrite_or_ignore', **kwargs)
+    else:
+        pq.write_table(arrow_table, os.path.join(dataset_dir, f"part-{part:05d}-0.parquet"), **kwargs)
+
+
+def csv_path(output_file, compression='none', roll_index=None):
+    """CSV file written for output_file: compression extension, and a -NNNNN suffix for rolled files."""
+    stem, extension = os.path.splitext(output_file)
+    if roll_index is not None:
+        stem = f"{stem}-{roll_index:05d}"
+    return stem + extension + COMPRESSIONS[compression]
+
+
+def output_path(output_file, output_format='csv', compression='none', roll_rows=ROLL_ROWS):
+    """Path a writer produces for output_file (a glob pattern for rolled CSV files)."""
+    if output_format == 'parquet':
+        return parquet_path(output_file)
+    return csv_path(output_file, compression, None) if roll_rows is None else \
+        csv_path(output_file, compression, 0).replace('-00000', '-*')
+
+
+def compress(data, compression='none'):
+    """Compress one encoded batch as a self-contained gzip member or zstd frame.
+
+    Concatenated members/frames form a valid file, so batches can be compressed
+    independently (and in parallel) and the bytes do not depend on thread count.
+    """
+    if compression == 'gzip':
+        return gzip.compress(data, mtime=0)
+    if compression == 'zstd':
+        import pyarrow as pa
+        return pa.compress(data, codec='zstd', asbytes=True)
+    return data
+
+
+def encode_csv(df, table, header=True, compression='none'):
+    """CSV bytes of a DataFrame, as df.to_csv() would write them to a file."""
+    text = df.to_csv(header=header, index=False, date_format=TABLE_DATE_FORMATS.get(table))
+    return compress(text.encode('utf-8'), compression)
+
+
+class BackgroundWriter:
+    """Encode, compress and write batches while the generator produces the next ones.
+
+    submit() hands a DataFrame (or anything `convert` turns into one) to a pool of
+    encoding threads through a bounded queue; a writer thread appends the results
+    to the output in submission order, so the bytes are the same for any number
+    of threads. CSV output rolls over to a new file (with its own header) once
+    `roll_rows` rows are written; Parquet batches become part files of one
+    dataset. close() (or leaving a with block) waits for every batch.
+    """
+
+    def __init__(self, output_file, table, output_format='csv', compression='none', threads=WRITER_THREADS,
+                 queue_size=WRITER_QUEUE_SIZE, roll_rows=ROLL_ROWS, convert=None):
+        if roll_rows is not None and roll_rows < 1:
+            raise ValueError(f"roll_rows must be at least 1, got {roll_rows}")
+        if threads < 0:
+            raise ValueError(f"threads must be at least 0, got {threads}")
+        self.output_file = output_file
+        self.table = table
+        self.output_format = output_format
+        self.compression = compression
+        self.roll_rows = roll_rows
+        self.convert = convert
+        self.paths = []
+        self.batches = 0
+        self.roll_index = None
+        self.file_rows = 0
+        self.handle = None
+        self.error = None
+        if output_format == 'csv':
+            output_dir = os.path.dirname(output_file)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+        remove_stale_outputs(output_file, output_format)
+        self.executor = ThreadPoolExecutor(threads) if threads > 0 else None
+        self.pending = queue.Queue(maxsize=max(queue_size, 1))
+        self.thread = None
+        if self.executor is not None:
+            self.thread = threading.Thread(target=self.drain, daemon=True)
+            self.thread.start()
+
+    def encode(self, item, part, header):
+        """Convert and encode one batch (runs on an encoding thread)."""
+        df = self.convert(item) if self.convert is not None else item
+        if self.output_format == 'parquet':
+            compression = PARQUET_COMPRESSION if self.compression == 'none' else self.compression
+            write_parquet(df, parquet_path(self.output_file), self.table, part=part, compression=compression)
+            return None
+        return encode_csv(df, self.table, header, self.compression)
+
+    def submit(self, item, rows=None):
+        """Queue one batch (blocks while the queue is full).
+
+        rows is the batch's row count when `convert` is used (needed for rolling).
+        The file a batch goes to is decided here, in submission order; with
+        `roll_rows`, a batch is split so that no file gets more than roll_rows rows.
+        """
+        if self.error is not None:
+            raise self.error
+        if self.output_format != 'csv' or self.roll_rows is None:
+            self.queue(item, rows)
+            return
+        rows = len(item) if rows is None else rows
+        start = 0
+        while True:
+            room = self.roll_rows
+            if self.roll_index is not None and self.file_rows < self.roll_rows:
+                room -= self.file_rows
+            stop = min(rows, start + room)
+            self.queue(item if stop - start == rows else slice_rows(item, start, stop), stop - start)
+            start = stop
+            if start >= rows:
+                return
+
+    def queue(self, item, rows=None):
+        """Queue one batch for the current CSV file (or the next one once it is full)."""
+        roll_index = None
+        header = False
+        if self.output_format == 'csv':
+            rows = len(item) if rows is None else rows
+            if self.roll_index is None or (self.roll_rows is not None and self.file_rows >= self.roll_rows):
+                self.roll_index = 0 if self.roll_index is None else self.roll_index + 1
+                self.file_rows = 0
+                header = True
+            self.file_rows += rows
+            roll_index = self.roll_index
+        part = self.batches
+        self.batches += 1
+        if self.executor is None:
+            self.write(roll_index, self.encode(item, part, header))
+        else:
+            self.pending.put((roll_index, self.executor.submit(self.encode, item, part, header)))
+
+    def write(self, roll_index, data):
+        """Append encoded bytes to the file of roll_index (runs on the writer thread)."""
+        if data is None:
+            return
+        path = csv_path(self.output_file, self.compression, None if self.roll_rows is None else roll_index)
+        if not self.paths or self.paths[-1] != path:
+            if self.handle is not None:
+                self.handle.close()
+            self.handle = open(path, 'wb')
+            self.paths.append(path)
+        self.handle.write(data)
+
+    def drain(self):
+        """Writer thread: write finished batches in submission order until close()."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            roll_index, future = item
+            try:
+                if self.error is None:
+                    self.write(roll_index, future.result())
+            except Exception as error:  # Re-raised on the generating thread
+                self.error = error
+
+    def finish(self):
+        """Wait for the queued batches and close the output file."""
+        if self.executor is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.executor.shutdown()
+            self.executor = None
+        if self.output_format == 'csv' and not self.paths and self.error is None:
+            self.write(0, b'')  # Nothing submitted: still leave an (empty) file
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def close(self):
+        """Wait for every queued batch, close the output and return the paths written."""
+        self.finish()
+        if self.error is not None:
+            raise self.error
+        return self.paths if self.output_format == 'csv' else [parquet_path(self.output_file)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.finish()  # Keep the original exception
+        return False
+
+
+def slice_rows(item, start, stop):
+    """Rows start:stop of a DataFrame or of a dict of equal-length column arrays (a POS batch)."""
+    if isinstance(item, dict):
+        return {key: values[start:stop] for key, values in item.items()}
+    return item.iloc[start:stop]
+
+
+def output_variants(output_file):
+    """CSV files earlier runs may have written for output_file: any compression, rolled or not."""
+    stem, extension = os.path.splitext(output_file)
+    paths = []
+    for suffix in COMPRESSIONS.values():
+        paths.extend(glob.glob(glob.escape(stem + extension + suffix)))
+        paths.extend(glob.glob(glob.escape(stem) + '-[0-9][0-9][0-9][0-9][0-9]' + glob.escape(extension + suffix)))
+    return sorted(paths)
+
+
+def remove_stale_outputs(output_file, output_format='csv'):
+    """Delete the CSV variants of output_file (and, before a CSV write, its Parquet dataset).
+
+    Readers of an output folder (bronze ingestion, demand_profile) take every file
+    in it as data, so a run must not leave an earlier run's format, compression or
+    rolled files next to its own. A Parquet dataset is cleared by the Parquet
+    writer itself, which may also add to it.
+    """
+    for path in output_variants(output_file):
+        os.remove(path)
+    if output_format == 'csv':
+        clear_dataset(parquet_path(output_file))
+
+
+def clear_dataset(dataset_dir):
+    """Remove a previously generated Parquet dataset before rewriting it."""
+    if os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+
+
+def write_output(df, output_file, table, output_format='csv', compression='none', threads=WRITER_THREADS,
+                 roll_rows=ROLL_ROWS):
+    """Write a generator DataFrame as CSV or as a Parquet dataset next to it.
+
+    CSV is encoded and compressed in WRITE_CHUNK_ROWS chunks by a BackgroundWriter
+    (uncompressed, one file: the same bytes as df.to_csv()). Returns the path that
+    was written (a glob pattern for rolled files).
+    """
+    if output_format == 'parquet':
+        dataset_dir = parquet_path(output_file)
+        remove_stale_outputs(output_file, 'parquet')
+        clear_dataset(dataset_dir)
+        write_parquet(df, dataset_dir, table, compression=PARQUET_COMPRESSION if compression == 'none' else compression)
+        return dataset_dir
+
+    with BackgroundWriter(output_file, table, 'csv', compression, threads, roll_rows=roll_rows) as writer:
+        for start in range(0, max(len(df), 1), WRITE_CHUNK_ROWS):
+            writer.submit(df.iloc[start:start + WRITE_CHUNK_ROWS])
+    return output_path(output_file, 'csv', compression, roll_rows)
@@ -0,0 +1,217 @@
+"""
+Replay POS transactions into a landing directory in (simulated) real time.
+Emits micro-batch CSV files in transaction_datetime order at a configurable speed-up,
+so end-to-end freshness of the bronze -> silver -> gold pipeline can be measured.
+"""
+
+import os
+import csv
+import time
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+import generate_pos_data as pos
+from event_anomalies import (LATE_SHARE, DUPLICATE_SHARE, REORDER_SHARE, MAX_DELAY_FILES, ANOMALY_SEED,
+                             EventAnomalies)
+
+# Configuration
+LANDING_DIR = '../data/landing/pos'
+LOG_FILE = '../data/state/replay_log.csv'
+ANOMALY_MANIFEST = '../data/state/replay_anomalies.csv'  # Late, duplicate and reordered events (--anomalies)
+SPEEDUP = 1440  # Simulated seconds per wall-clock second (1440 = one day per minute)
+INTERVAL_SECONDS = 1.0  # Wall-clock seconds between micro-batches
+MAX_ROWS_PER_FILE = 5000  # Larger micro-batches are split across several files
+SKIP_IDLE_GAPS = True  # Jump over nights and weekends instead of waiting through them
+
+LOG_COLUMNS = ['file_name', 'rows', 'first_transaction_datetime', 'last_transaction_datetime',
+               'simulated_time', 'emitted_at']
+
+
+def iter_source_frames(input_file=None, seed=pos.RANDOM_SEED, workers=pos.WORKERS,
+                       customer_pool_size=pos.CUSTOMER_NAME_POOL_SIZE, customer_zipf=pos.CUSTOMER_ZIPF_EXPONENT,
+                       scale_factor=pos.SCALE_FACTOR, roster=None):
+    """Yield time-ordered POS DataFrames from an existing CSV or straight from the numpy engine."""
+    if input_file:
+        for chunk in pd.read_csv(input_file, chunksize=50000, parse_dates=['transaction_datetime']):
+            yield chunk
+        return
+
+    entropy = np.random.SeedSequence(seed).entropy
+    customer_names = pos.build_customer_name_pool(entropy, customer_pool_size)
+    operating_days = pos.get_operating_days(pos.START_DATE, pos.END_DATE)
+    for batch in pos.iter_day_batches(operating_days, entropy, workers, len(customer_names),
+                                      customer_zipf=customer_zipf, scale_factor=scale_factor, roster=roster):
+        yield pos.batch_to_dataframe(batch, customer_names)
+
+
+def micro_batch_name(sequence):
+    """File name of the micro-batch with the given sequence number."""
+    return f"pos_replay_{sequence:06d}.csv"
+
+
+def write_micro_batch(df, landing_dir, sequence):
+    """Write one micro-batch atomically (temp file + rename) and return its file name."""
+    file_name = micro_batch_name(sequence)
+    tmp_path = os.path.join(landing_dir, f".{file_name}.tmp")  # Hidden from read_files until renamed
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(landing_dir, file_name))
+    return file_name
+
+
+def replay(frames, landing_dir=LANDING_DIR, log_file=LOG_FILE, speedup=SPEEDUP, interval=INTERVAL_SECONDS,
+           max_rows=MAX_ROWS_PER_FILE, skip_idle_gaps=SKIP_IDLE_GAPS, anomalies=None):
+    """Emit rows from `frames` whose transaction_datetime has passed on the simulated clock.
+
+    Every `interval` wall-clock seconds the simulated clock advances by
+    interval * speedup seconds and all rows up to it are written as one or more
+    micro-batch files. Each file is logged with its wall-clock emit time.
+    With an EventAnomalies, some transactions land late or twice and some
+    files are emitted out of order. Returns (files written, rows written).
+    """
+    os.makedirs(landing_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    frames = iter(frames)
+    pending = next(frames, None)
+    if pending is None:
+        return 0, 0
+
+    sim_clock = pending['transaction_datetime'].iloc[0]
+    sequence = 0
+    files_written = 0
+    rows_written = 0
+    next_tick = time.monotonic()
+
+    with open(log_file, 'w', newline='') as log:
+        writer = csv.writer(log)
+        writer.writerow(LOG_COLUMNS)
+
+        def emit(files):
+            """Write and log (sequence, DataFrame) micro-batches."""
+            nonlocal files_written, rows_written
+            for file_sequence, frame in files:
+                file_name = write_micro_batch(frame, landing_dir, file_sequence)
+                writer.writerow([file_name, len(frame), frame['transaction_datetime'].min(),
+                                 frame['transaction_datetime'].max(), sim_clock,
+                                 datetime.now().isoformat(timespec='milliseconds')])
+                log.flush()
+                files_written += 1
+                rows_written += len(frame)
+
+        while pending is not None:
+            next_tick += interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            sim_clock += timedelta(seconds=interval * speedup)
+            if skip_idle_gaps and pending['transaction_datetime'].iloc[0] > sim_clock:
+                sim_clock = pending['transaction_datetime'].iloc[0]
+
+            # Collect every row that is due, pulling more source frames as needed
+            due_parts = []
+            while pending is not None:
+                n_due = int(np.searchsorted(pending['transaction_datetime'].values, np.datetime64(sim_clock), side='right'))
+                due_parts.append(pending.iloc[:n_due])
+                pending = pending.iloc[n_due:]
+                if len(pending):
+                    break
+                pending = next(frames, None)
+            due = pd.concat(due_parts, ignore_index=True)
+
+            for start in range(0, len(due), max_rows):
+                chunk = due.iloc[start:start + max_rows]
+                emit(anomalies.release(chunk, sequence) if anomalies is not None else [(sequence, chunk)])
+                sequence += 1
+
+        if anomalies is not None:
+            emit(anomalies.flush(sequence))  # Held-back file and transactions due after the last batch
+
+    return files_written, rows_written
+
+
+def write_anomaly_manifest(anomalies, manifest_file=ANOMALY_MANIFEST):
+    """Write the injected anomalies (with micro-batch file names) to a CSV and return it."""
+    manifest = anomalies.manifest()
+    for column in ['original_file', 'landed_file']:
+        manifest[column] = manifest[column].map(micro_batch_name)
+    os.makedirs(os.path.dirname(manifest_file) or '.', exist_ok=True)
+    manifest.to_csv(manifest_file, index=False)
+    return manifest
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Replay POS transactions into a landing directory in real time.')
+    parser.add_argument('--input', help='existing POS CSV to replay (default: generate with the numpy engine)')
+    parser.add_argument('--seed', type=int, default=pos.RANDOM_SEED, help='random seed when generating')
+    parser.add_argument('--workers', type=int, default=pos.WORKERS, help='worker processes when generating')
+    parser.add_argument('--customer-pool-size', type=int, default=pos.CUSTOMER_NAME_POOL_SIZE,
+                        help='number of distinct customer names when generating')
+    parser.add_argument('--customer-zipf', type=float, default=pos.CUSTOMER_ZIPF_EXPONENT,
+                        help='Zipf exponent for repeat customers when generating (default: uniform)')
+    pos.add_scale_argument(parser)
+    parser.add_argument('--roster', default=pos.ROSTER_PATH,
+                        help='roster that sales are attributed to when generating')
+    parser.add_argument('--no-roster', action='store_true',
+                        help='assign staff by morning/afternoon shift bands when generating')
+    parser.add_argument('--landing-dir', default=LANDING_DIR, help='directory the micro-batch files land in')
+    parser.add_argument('--log-file', default=LOG_FILE, help='CSV log of emitted files and their emit times')
+    parser.add_argument('--speedup', type=float, default=SPEEDUP,
+                        help='simulated seconds per wall-clock second (1440 = one day per minute)')
+    parser.add_argument('--interval', type=float, default=INTERVAL_SECONDS,
+                        help='wall-clock seconds between micro-batches')
+    parser.add_argument('--max-rows', type=int, default=MAX_ROWS_PER_FILE, help='maximum rows per file')
+    parser.add_argument('--keep-gaps', action='store_true', help='wait through nights and weekends')
+    parser.add_argument('--anomalies', action='store_true',
+                        help='emit late, duplicate and out-of-order events and record them in a manifest')
+    parser.add_argument('--late-share', type=float, default=LATE_SHARE,
+                        help='share of transactions landing in a later file (with --anomalies)')
+    parser.add_argument('--duplicate-share', type=float, default=DUPLICATE_SHARE,
+                        help='share of transactions sent twice (with --anomalies)')
+    parser.add_argument('--reorder-share', type=float, default=REORDER_SHARE,
+                        help='share of files emitted after the file that follows them (with --anomalies)')
+    parser.add_argument('--max-delay-files', type=int, default=MAX_DELAY_FILES,
+                        help='late and re-sent transactions land up to this many files later (with --anomalies)')
+    parser.add_argument('--anomaly-seed', type=int, default=ANOMALY_SEED, help='random seed for the anomalies')
+    parser.add_argument('--anomaly-manifest', default=ANOMALY_MANIFEST, help='CSV the injected anomalies are listed in')
+    args = parser.parse_args()
+    if args.anomalies and args.late_share + args.duplicate_share > 1:
+        parser.error('--late-share plus --duplicate-share must not exceed 1')
+    if args.anomalies and args.max_delay_files < 1:
+        parser.error('--max-delay-files must be at least 1')
+    return args
+
+
+def main():
+    """Main function to replay POS data."""
+    args = parse_args()
+    print("Replaying POS transaction data...")
+    print(f"Source: {args.input or 'numpy engine'}")
+    print(f"Landing directory: {args.landing_dir}")
+    print(f"Speed-up: {args.speedup:g}x, one micro-batch every {args.interval:g}s (max {args.max_rows:,} rows per file)")
+    print(f"Emit log: {args.log_file}")
+    if args.anomalies:
+        print(f"Anomalies: {args.late_share:.1%} late, {args.duplicate_share:.1%} duplicated, "
+              f"{args.reorder_share:.1%} of files reordered (up to {args.max_delay_files} files late)")
+    print()
+
+    roster = None if args.input or args.no_roster else pos.load_roster_index(args.roster)
+    frames = iter_source_frames(args.input, args.seed, args.workers or os.cpu_count(),
+                                args.customer_pool_size, args.customer_zipf, args.scale_factor, roster)
+    anomalies = None
+    if args.anomalies:
+        anomalies = EventAnomalies(args.late_share, args.duplicate_share, args.reorder_share,
+                                   args.max_delay_files, args.anomaly_seed)
+    files, rows = replay(frames,
+                         args.landing_dir, args.log_file, args.speedup, args.interval,
+                         args.max_rows, not args.keep_gaps, anomalies)
+
+    print(f"Emitted {rows:,} line items in {files:,} files")
+    if anomalies is not None:
+        manifest = write_anomaly_manifest(anomalies, args.anomaly_manifest)
+        counts = ', '.join(f"{anomaly} {count:,}" for anomaly, count in manifest['anomaly'].value_counts().items())
+        print(f"Anomalies: {counts or 'none'} (manifest: {args.anomaly_manifest})")
+    print("Replay complete!")
+
+
+if __name__ == '__main__':
+    main()
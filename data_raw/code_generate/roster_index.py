@@ -0,0 +1,137 @@
+"""
+Interval index over rostered shifts, used to attribute POS sales to staff on shift.
+Shifts are held per location as sorted start/end arrays; the breakpoints between them
+split each location's timeline into segments with a fixed set of staff on shift, so a
+whole batch of (location, time) lookups is one searchsorted call.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+ROSTER_PATH = '../data/roster'  # roster_<n>.csv files and/or roster_<n>/ Parquet datasets
+SERVICE_ROLES = ['Barista', 'Front of House']  # Roles that ring up sales
+KEY_STRIDE = 2 ** 32  # Location code * stride + epoch seconds keeps every location's timeline apart
+DAY_SECONDS = 24 * 60 * 60
+
+
+def id_codes(ids):
+    """Integer codes for IDs like 'EMP-023' or 'LOC-006' (the number minus one)."""
+    return pd.Series(ids).astype(str).str.rsplit('-', n=1).str[-1].astype(np.int64).to_numpy() - 1
+
+
+def epoch_seconds(times):
+    """datetime64 values (or anything numpy can convert) as int64 seconds since 1970."""
+    return np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+
+
+class RosterIndex:
+    """Shifts by location as an interval index.
+
+    location_codes and employee_codes are integer codes (LOC-001 -> 0, EMP-001 -> 0,
+    matching the POS batch columns); starts and ends are shift times (end exclusive).
+    """
+
+    def __init__(self, location_codes, starts, ends, employee_codes):
+        location_codes = np.asarray(location_codes, dtype=np.int64)
+        starts = epoch_seconds(starts)
+        ends = epoch_seconds(ends)
+        order = np.lexsort((starts, location_codes))
+        self.location_codes = location_codes[order]
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.employee_codes = np.asarray(employee_codes, dtype=np.int64)[order]
+        self.start_keys = self.location_codes * KEY_STRIDE + self.starts
+        end_keys = self.location_codes * KEY_STRIDE + self.ends
+
+        # Segment i runs from breakpoints[i] to breakpoints[i + 1]; list the staff on shift in each
+        self.breakpoints = np.unique(np.concatenate([self.start_keys, end_keys]))
+        first = np.searchsorted(self.breakpoints, self.start_keys)
+        n_segments = np.searchsorted(self.breakpoints, end_keys) - first
+        segment = np.repeat(first - (np.cumsum(n_segments) - n_segments), n_segments) + np.arange(n_segments.sum())
+        shift = np.repeat(np.arange(len(self.starts)), n_segments)
+        by_segment = np.argsort(segment, kind='stable')
+        self.on_shift = self.employee_codes[shift[by_segment]]
+        self.counts = np.bincount(segment, minlength=len(self.breakpoints))
+        self.offsets = np.cumsum(self.counts) - self.counts
+        self._day_index = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_frame(cls, df_roster, roles=SERVICE_ROLES):
+        """Index the shifts of a roster DataFrame (generate_roster() output or a loaded roster file)."""
+        df_roster = df_roster[df_roster['role'].isin(roles)]
+        return cls(id_codes(df_roster['area_department']), df_roster['start_time'].to_numpy(),
+                   df_roster['end_time'].to_numpy(), id_codes(df_roster['employee_id']))
+
+    def subset(self, location_codes, day):
+        """Index of the shifts starting at some locations on one day (small enough to ship to a worker)."""
+        day_starts = np.atleast_1d(location_codes) * KEY_STRIDE + epoch_seconds(np.datetime64(day, 'D'))
+        first = np.searchsorted(self.start_keys, day_starts)
+        last = np.searchsorted(self.start_keys, day_starts + DAY_SECONDS)
+        rows = np.concatenate([np.arange(a, b) for a, b in zip(first, last)] + [np.arange(0)])
+        return RosterIndex(self.location_codes[rows], self.starts[rows].astype('datetime64[s]'),
+                           self.ends[rows].astype('datetime64[s]'), self.employee_codes[rows])
+
+    def day_index(self):
+        """The same shifts stretched over their whole day (fallback when nobody is on shift)."""
+        if self._day_index is None:
+            day_starts = self.starts - self.starts % DAY_SECONDS
+            self._day_index = RosterIndex(self.location_codes, day_starts.astype('datetime64[s]'),
+                                          (day_starts + DAY_SECONDS).astype('datetime64[s]'), self.employee_codes)
+        return self._day_index
+
+    def lookup(self, location_codes, times, draws):
+        """Employee code on shift at each (location, time), or -1 where nobody is.
+
+        draws are U(0, 1) values choosing uniformly among the staff on shift.
+        """
+        if len(self.on_shift) == 0:
+            return np.full(len(draws), -1, dtype=np.int64)
+        keys = np.asarray(location_codes, dtype=np.int64) * KEY_STRIDE + epoch_seconds(times)
+        segment = np.searchsorted(self.breakpoints, keys, side='right') - 1
+        count = np.where(segment >= 0, self.counts[segment], 0)
+        pick = np.minimum(self.offsets[segment] + (np.asarray(draws) * count).astype(np.int64), len(self.on_shift) - 1)
+        return np.where(count > 0, self.on_shift[pick], -1)
+
+    def assign(self, location_codes, times, draws):
+        """Employee code for each (location, time): someone on shift at that time, else
+        someone rostered at the location that day, else -1."""
+        employee = self.lookup(location_codes, times, draws)
+        missing = np.flatnonzero(employee < 0)
+        if len(missing):
+            employee[missing] = self.day_index().lookup(np.asarray(location_codes)[missing],
+                                                        np.asarray(times)[missing], np.asarray(draws)[missing])
+        return employee
+
+
+def read_roster(path=ROSTER_PATH):
+    """Read shifts from a roster CSV, a roster Parquet dataset or a folder of roster_<n> outputs.
+
+    Returns None when there is nothing to read.
+    """
+    columns = ['employee_id', 'role', 'start_time', 'end_time', 'area_department', 'break_duration']
+    if os.path.isfile(path):
+        return pd.read_csv(path, usecols=columns, parse_dates=['start_time', 'end_time'])
+    if not os.path.isdir(path):
+        return None
+    if any(name.startswith('shift_date=') for name in os.listdir(path)):
+        df_roster = pd.read_parquet(path, columns=columns)
+        for column in ['employee_id', 'role', 'area_department']:
+            df_roster[column] = df_roster[column].astype(str)
+        return df_roster
+    frames = [read_roster(os.path.join(path, name)) for name in sorted(os.listdir(path))
+              if name.startswith('roster_')]
+    frames = [frame for frame in frames if frame is not None]
+    # A run written as both CSV and Parquet must not count its shifts twice
+    return pd.concat(frames, ignore_index=True).drop_duplicates() if frames else None
+
+
+def load_roster_index(path=ROSTER_PATH):
+    """RosterIndex of the Barista/Front of House shifts at path, or None if there is no roster."""
+    df_roster = read_roster(path)
+    if df_roster is None or len(df_roster) == 0:
+        return None
+    return RosterIndex.from_frame(df_roster)
@@ -0,0 +1,207 @@
+"""
+Constraint-based roster solver for large store networks.
+Fills per-location staffing requirements day by day from the staff eligible for each
+location and role, within the work-pattern limits. Availability is held as bitsets
+over the staff list, so finding the candidates for a slot is one AND of two Python
+ints. Slots are filled most-constrained first, each going to the candidate who can
+work at the fewest locations (keeping flexible staff for the slots only they can
+fill), then to whoever is furthest below their weekly target, then at random.
+
+Maximum shifts per week and consecutive days are hard limits. Weekly minimums
+(the work-pattern targets) are only preferred while filling slots; whether they
+were met is checked afterwards by pattern_shortfalls().
+"""
+
+import random
+from collections import defaultdict
+from datetime import date
+import numpy as np
+
+WEEK_DAYS = 7  # Work-pattern limits apply to any 7 consecutive calendar days
+MAX_CONSECUTIVE_DAYS = 5  # Nobody is rostered once they reach this many consecutive days
+FULL_WEEK_OPERATING_DAYS = 5  # Calendar weeks with fewer operating days are not checked against minimums
+
+# Shifts per week by work pattern: (target, maximum); the target is also the weekly minimum
+WORK_PATTERN_SHIFTS = {
+    'full-time': (4, 5),
+    'part-time': (2, 3)
+}
+
+
+def to_bitset(mask):
+    """Boolean array -> Python int with bit i set where mask[i] is True."""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def eligible_locations(employee):
+    """Locations an employee (an EMPLOYEES entry) can be rostered at."""
+    return [employee['fixed_location']] if employee.get('fixed_location') else employee['primary_locations']
+
+
+def location_clusters(employees, locations):
+    """Split a network into independent rostering problems.
+
+    Clusters are the connected components of the employee-location graph: nobody
+    in one cluster can work at a location of another, so clusters can be rostered
+    separately. Returns (locations, employee_ids) pairs, ordered by their first
+    location, with locations and employees in their input order.
+    """
+    parent = {location: location for location in locations}
+
+    def find(location):
+        while parent[location] != location:
+            parent[location] = parent[parent[location]]
+            location = parent[location]
+        return location
+
+    for employee in employees.values():
+        first, *others = eligible_locations(employee)
+        for location in others:
+            parent[find(location)] = find(first)
+
+    clusters = {}
+    for location in locations:
+        clusters.setdefault(find(location), ([], []))[0].append(location)
+    for emp_id, employee in employees.items():
+        clusters[find(eligible_locations(employee)[0])][1].append(emp_id)
+    return list(clusters.values())
+
+
+def pattern_shortfalls(employees, shift_dates, operating_days):
+    """Calendar weeks in which staff were rostered below their work pattern's minimum.
+
+    shift_dates maps employee_id -> dates of their shifts (earlier history included);
+    only Monday-Sunday weeks with at least FULL_WEEK_OPERATING_DAYS operating days
+    are checked, so partial weeks at either end of a period are not. Returns
+    (employee_id, week Monday, shifts, minimum) tuples.
+    """
+    week_days = defaultdict(int)
+    for day in operating_days:
+        week_days[day.toordinal() - day.weekday()] += 1
+    weeks = sorted(week for week, n_days in week_days.items() if n_days >= FULL_WEEK_OPERATING_DAYS)
+    shortfalls = []
+    for emp_id, data in employees.items():
+        minimum = WORK_PATTERN_SHIFTS[data['work_pattern']][0]
+        week_shifts = defaultdict(int)
+        for day in shift_dates.get(emp_id, ()):
+            week_shifts[day.toordinal() - day.weekday()] += 1
+        shortfalls.extend((emp_id, date.fromordinal(week), week_shifts[week], minimum)
+                          for week in weeks if week_shifts[week] < minimum)
+    return shortfalls
+
+
+def iter_bits(bitset):
+    """Indexes of the set bits of a Python int, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class RosterSolver:
+    """Rosters a store network from staffing requirements.
+
+    employees maps employee_id -> {'role', 'primary_locations', 'work_pattern'[,
+    'fixed_location']} (the EMPLOYEES layout); requirements maps location ->
+    [(role, shift, employees, share of days)], or location -> {weekday: [...]}
+    for requirements that change by weekday. history holds earlier shifts
+    (employee_id, start_time, ...) in date order that count towards the limits.
+    """
+
+    def __init__(self, employees, requirements, history=()):
+        self.employee_ids = list(employees)
+        self.index = {emp_id: i for i, emp_id in enumerate(self.employee_ids)}
+        self.requirements = requirements
+        n_employees = len(self.employee_ids)
+        patterns = [WORK_PATTERN_SHIFTS[data['work_pattern']] for data in employees.values()]
+        self.target = [target for target, _ in patterns]
+        self.maximum = np.array([maximum for _, maximum in patterns])
+
+        # Eligibility bitset per (location, role); Kitchen staff only work at their fixed location
+        eligible = {}
+        self.n_locations = []
+        for i, data in enumerate(employees.values()):
+            locations = eligible_locations(data)
+            for location in locations:
+                eligible[(location, data['role'])] = eligible.get((location, data['role']), 0) | (1 << i)
+            self.n_locations.append(len(locations))
+        self.eligible = eligible
+
+        # Rolling counters: shifts per calendar day for the last WEEK_DAYS days (ring
+        # buffer by date ordinal), last worked day and consecutive-day streak
+        self.shifts_by_day = np.zeros((WEEK_DAYS, n_employees), dtype=np.int8)
+        self.last_worked = np.full(n_employees, -2, dtype=np.int64)
+        self.streak = np.zeros(n_employees, dtype=np.int64)
+        self.current = None
+        for shift in history:
+            if shift['employee_id'] in self.index:
+                self.assign(self.index[shift['employee_id']], shift['start_time'].date().toordinal())
+
+    def advance(self, ordinal):
+        """Move the rolling window forward to the day `ordinal`, clearing the days it drops."""
+        if self.current is not None and ordinal <= self.current:
+            return
+        first = ordinal - WEEK_DAYS + 1 if self.current is None else max(self.current + 1, ordinal - WEEK_DAYS + 1)
+        for day in range(first, ordinal + 1):
+            self.shifts_by_day[day % WEEK_DAYS] = 0
+        self.current = ordinal
+
+    def assign(self, i, ordinal):
+        """Count a shift of employee i on the day `ordinal`."""
+        self.advance(ordinal)
+        self.shifts_by_day[ordinal % WEEK_DAYS, i] += 1
+        if self.last_worked[i] != ordinal:
+            self.streak[i] = self.streak[i] + 1 if self.last_worked[i] == ordinal - 1 else 1
+            self.last_worked[i] = ordinal
+
+    def available(self, ordinal):
+        """Bitset of employees who may take a shift on the day `ordinal`, and their shifts this week."""
+        self.advance(ordinal)
+        week_shifts = self.shifts_by_day.sum(axis=0)
+        streak = np.where(self.last_worked == ordinal - 1, self.streak, 0)
+        free = (week_shifts < self.maximum) & (streak < MAX_CONSECUTIVE_DAYS) & (self.last_worked != ordinal)
+        return to_bitset(free), week_shifts.tolist()
+
+    def day_slots(self, date, rng):
+        """(location, role, shift) slots to fill on one day; optional requirements are drawn by share."""
+        slots = []
+        for location, location_requirements in self.requirements.items():
+            if isinstance(location_requirements, dict):
+                location_requirements = location_requirements.get(date.weekday(), [])
+            for role, shift, count, share in location_requirements:
+                if share >= 1 or rng.random() < share:
+                    slots.extend([(location, role, shift)] * count)
+        return slots
+
+    def solve(self, operating_days, rng=random):
+        """Roster the operating days (in date order).
+
+        Returns (assignments, gaps): assignments are (date, location, role, shift,
+        employee_id) tuples in location and requirement order per day; gaps are the
+        (date, location, role, shift) slots nobody could fill.
+        """
+        assignments = []
+        gaps = []
+        for date in operating_days:
+            ordinal = date.toordinal()
+            free, week_shifts = self.available(ordinal)
+            slots = self.day_slots(date, rng)
+            # Most constrained first: fewest candidates at the start of the day
+            candidates = [(self.eligible.get((location, role), 0) & free).bit_count() for location, role, _ in slots]
+            chosen = {}
+            for slot in sorted(range(len(slots)), key=candidates.__getitem__):
+                location, role, shift = slots[slot]
+                best, best_key = None, None
+                for i in iter_bits(self.eligible.get((location, role), 0) & free):
+                    key = (-self.n_locations[i], self.target[i] - week_shifts[i], rng.random())
+                    if best_key is None or key > best_key:
+                        best, best_key = i, key
+                if best is None:
+                    gaps.append((date, location, role, shift))
+                    continue
+                free &= ~(1 << best)
+                week_shifts[best] += 1
+                self.assign(best, ordinal)
+                chosen[slot] = self.employee_ids[best]
+            assignments.extend((date, *slots[slot], chosen[slot]) for slot in sorted(chosen))
+        return assignments, gaps
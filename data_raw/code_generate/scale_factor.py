@@ -0,0 +1,89 @@
+"""
+TPC-style scale factor shared by the data generators.
+Scale factor N repeats the base network (4 stores, 19 employees) N times: store k of
+copy c is LOC-{4c + k} and employee n of copy c is EMP-{19c + n}. Stores, staff,
+transactions and financial values grow linearly while every ID stays consistent
+between the POS, roster, employee, store and financial outputs.
+"""
+
+import argparse
+
+SCALE_FACTOR = 1  # 1 = the original 4-store dataset
+
+# Base store network (scale factor 1 reproduces store_0.csv exactly)
+BASE_STORES = [
+    {'location_id': 'LOC-001', 'cafe_name': 'The Corner Brew', 'address': '123 Collins Street Melbourne VIC 3000'},
+    {'location_id': 'LOC-002', 'cafe_name': 'Morning Glory Cafe', 'address': '456 Bourke Street Melbourne VIC 3000'},
+    {'location_id': 'LOC-003', 'cafe_name': 'Bean & Beyond', 'address': '789 Swanston Street Melbourne VIC 3000'},
+    {'location_id': 'LOC-004', 'cafe_name': 'Sunrise Espresso Bar', 'address': '321 Flinders Lane Melbourne VIC 3000'}
+]
+STORES_PER_COPY = len(BASE_STORES)
+EMPLOYEES_PER_COPY = 19  # EMP-001 to EMP-019 in generate_roster_data.EMPLOYEES
+STREET_NUMBER_STEP = 1000  # Street numbers of copy c are offset by c * 1000
+
+
+def positive_int(value):
+    """argparse type for integers >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def non_negative_int(value):
+    """argparse type for integers >= 0."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, got {value}")
+    return number
+
+
+def add_scale_argument(parser):
+    """Add the shared --scale-factor option to a generator's argument parser."""
+    parser.add_argument('--scale-factor', type=positive_int, default=SCALE_FACTOR,
+                        help='repeat the 4-store network N times (stores, staff, transactions and financials grow N-fold)')
+
+
+def scale_id(base_id, copy, block):
+    """ID of a base entity in copy `copy` (scale_id('EMP-003', 1, 19) -> 'EMP-022')."""
+    prefix, number = base_id.rsplit('-', 1)
+    return f"{prefix}-{int(number) + copy * block:03d}"
+
+
+def split_id(scaled_id, block):
+    """Inverse of scale_id(): (base ID, copy) for a scaled ID."""
+    prefix, number = scaled_id.rsplit('-', 1)
+    copy, offset = divmod(int(number) - 1, block)
+    return f"{prefix}-{offset + 1:03d}", copy
+
+
+def location_ids(scale_factor=SCALE_FACTOR):
+    """All location IDs at a scale factor, copy by copy (LOC-001 ... LOC-{4N})."""
+    return [scale_id(store['location_id'], copy, STORES_PER_COPY)
+            for copy in range(scale_factor) for store in BASE_STORES]
+
+
+def base_location(location_id):
+    """Base location a scaled location was copied from (LOC-006 -> LOC-002)."""
+    return split_id(location_id, STORES_PER_COPY)[0]
+
+
+def generate_stores(scale_factor=SCALE_FACTOR):
+    """Store master rows; copies get a numbered cafe name and offset street number."""
+    stores = []
+    for copy in range(scale_factor):
+        for store in BASE_STORES:
+            street_number, street = store['address'].split(' ', 1)
+            stores.append({
+                'location_id': scale_id(store['location_id'], copy, STORES_PER_COPY),
+                'cafe_name': store['cafe_name'] if copy == 0 else f"{store['cafe_name']} {copy + 1}",
+                'address': f"{int(street_number) + copy * STREET_NUMBER_STEP} {street}"
+            })
+    return stores
+
+
+def scale_values(values, scale_factor=SCALE_FACTOR):
+    """Scale monetary values (a pandas Series) to the size of the network."""
+    if scale_factor == 1:
+        return values
+    return (values * scale_factor).round(2)
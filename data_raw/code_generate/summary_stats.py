@@ -0,0 +1,198 @@
+"""
+Single-pass summary statistics for the POS and roster generators.
+Accumulators are updated while batches/shifts are generated, so the printed summary
+and the JSON report need no extra pass over the finished DataFrame.
+Reports are written to ../data/reports, outside the folders read by the bronze layer.
+"""
+
+import os
+import json
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+from roster_index import SERVICE_ROLES, id_codes
+
+REPORT_DIR = '../data/reports'
+
+
+def add_code_counts(counter, codes, decode, weights=None):
+    """Add per-label counts (or weight sums) for integer codes to a Counter."""
+    if len(codes) == 0:
+        return
+    present = np.flatnonzero(np.bincount(codes))
+    totals = np.bincount(codes, weights=weights)[present]
+    for label, total in zip(decode(present), totals):
+        counter[label] += total.item()
+
+
+def sorted_counts(counter):
+    """Counter as a plain dict, largest first (like value_counts())."""
+    return dict(counter.most_common())
+
+
+class PosSummary:
+    """Running POS statistics: line items, transactions and revenue by category, item,
+    location, payment method and employee.
+
+    `decode(column, codes)` turns integer codes of a numpy batch into labels for
+    'category_name', 'item_name' (SKU codes), 'location_id', 'payment_method'
+    and 'employee_id'. With a CoverageIndex, transactions rung up while no
+    Barista/Front of House staff were on shift are counted by location.
+    """
+
+    def __init__(self, decode=None, coverage=None):
+        self.decode = decode
+        self.coverage = coverage
+        self.transactions = 0
+        self.line_items = 0
+        self.revenue = 0.0
+        self.first = None
+        self.last = None
+        self.items_by_category = Counter()
+        self.items_by_item = Counter()
+        self.items_by_location = Counter()
+        self.revenue_by_location = Counter()
+        self.items_by_payment_method = Counter()
+        self.items_by_employee = Counter()
+        self.unstaffed_by_location = Counter()  # Location -> transactions with no service staff on shift
+
+    def update_range(self, first, last):
+        """Widen the transaction_datetime range seen so far."""
+        first, last = np.datetime64(first, 's'), np.datetime64(last, 's')
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+
+    def add_batch(self, batch):
+        """Add an integer-coded batch from the numpy engine."""
+        if len(batch['quantity']) == 0:
+            return
+        _, first = np.unique(batch['transaction_number'], return_index=True)
+        self.transactions += len(first)
+        self.line_items += len(batch['quantity'])
+        line_total = np.round(batch['line_total'].astype(np.float64), 2)  # float32 in batches
+        self.revenue += line_total.sum().item()
+        self.update_range(batch['transaction_datetime'].min(), batch['transaction_datetime'].max())
+
+        decode = self.decode
+        sku = batch['sku_code']
+        add_code_counts(self.items_by_category, sku, lambda codes: decode('category_name', codes))
+        add_code_counts(self.items_by_item, sku, lambda codes: decode('item_name', codes))
+        add_code_counts(self.items_by_location, batch['location_code'], lambda codes: decode('location_id', codes))
+        add_code_counts(self.revenue_by_location, batch['location_code'], lambda codes: decode('location_id', codes),
+                        weights=line_total)
+        add_code_counts(self.items_by_payment_method, batch['payment_code'], lambda codes: decode('payment_method', codes))
+        add_code_counts(self.items_by_employee, batch['employee_code'], lambda codes: decode('employee_id', codes))
+        if self.coverage is not None:
+            location_codes = batch['location_code'][first]
+            staff = self.coverage.staff(location_codes, batch['transaction_datetime'][first], SERVICE_ROLES)
+            add_code_counts(self.unstaffed_by_location, location_codes[staff == 0],
+                            lambda codes: decode('location_id', codes))
+
+    def add_transaction(self, line_items):
+        """Add one transaction (line item dicts) from the python engine."""
+        self.transactions += 1
+        self.line_items += len(line_items)
+        self.update_range(line_items[0]['transaction_datetime'], line_items[0]['transaction_datetime'])
+        for line in line_items:
+            self.revenue += line['line_total']
+            self.items_by_category[line['category_name']] += 1
+            self.items_by_item[line['item_name']] += 1
+            self.items_by_location[line['location_id']] += 1
+            self.revenue_by_location[line['location_id']] += line['line_total']
+            self.items_by_payment_method[line['payment_method']] += 1
+            self.items_by_employee[line['employee_id']] += 1
+        if self.coverage is not None:
+            first = line_items[0]
+            staff = self.coverage.staff(id_codes([first['location_id']]), [first['transaction_datetime']], SERVICE_ROLES)
+            if staff[0] == 0:
+                self.unstaffed_by_location[first['location_id']] += 1
+
+    def report(self):
+        """Summary as a JSON-serialisable dict."""
+        return {
+            'transactions': self.transactions,
+            'line_items': self.line_items,
+            'revenue': round(self.revenue, 2),
+            'average_transaction_value': round(self.revenue / self.transactions, 2) if self.transactions else None,
+            'first_transaction': str(pd.Timestamp(self.first)) if self.first is not None else None,
+            'last_transaction': str(pd.Timestamp(self.last)) if self.last is not None else None,
+            'items_by_category': sorted_counts(self.items_by_category),
+            'items_by_item': sorted_counts(self.items_by_item),
+            'items_by_location': dict(sorted(self.items_by_location.items())),
+            'revenue_by_location': {location: round(revenue, 2) for location, revenue in sorted(self.revenue_by_location.items())},
+            'items_by_payment_method': sorted_counts(self.items_by_payment_method),
+            'items_by_employee': sorted_counts(self.items_by_employee),
+            'unstaffed_transactions_by_location': dict(sorted(self.unstaffed_by_location.items()))
+        }
+
+
+class RosterSummary:
+    """Running roster statistics: shifts by role, employee, location and published
+    status, plus paid hours and labor cost per location-day."""
+
+    def __init__(self):
+        self.shifts = 0
+        self.shifts_by_role = Counter()
+        self.shifts_by_employee = Counter()
+        self.shifts_by_location = Counter()
+        self.published = Counter()
+        self.labor_hours = defaultdict(float)  # (location, date) -> paid hours
+        self.labor_cost = defaultdict(float)  # (location, date) -> cost
+        self.unfilled = Counter()  # Role -> staffing slots the roster solver could not fill
+        self.below_minimum = Counter()  # Work pattern -> employee-weeks below the pattern's minimum shifts
+
+    def add_shift(self, employee_id, role, location, start_time, end_time, break_minutes, pay_rate, published):
+        """Add one shift (start_time/end_time as datetimes, break in minutes)."""
+        self.shifts += 1
+        self.shifts_by_role[role] += 1
+        self.shifts_by_employee[employee_id] += 1
+        self.shifts_by_location[location] += 1
+        self.published[published] += 1
+        paid_hours = (end_time - start_time).total_seconds() / 3600 - break_minutes / 60
+        key = (location, start_time.date().isoformat())
+        self.labor_hours[key] += paid_hours
+        self.labor_cost[key] += paid_hours * pay_rate
+
+    def add_gap(self, role):
+        """Add one staffing slot nobody could be rostered to."""
+        self.unfilled[role] += 1
+
+    def add_shortfall(self, work_pattern):
+        """Add one employee-week rostered below the work pattern's minimum shifts."""
+        self.below_minimum[work_pattern] += 1
+
+    def report(self):
+        """Summary as a JSON-serialisable dict."""
+        shifts_per_employee = list(self.shifts_by_employee.values()) or [0]
+        daily_costs = defaultdict(list)
+        for (location, _), cost in self.labor_cost.items():
+            daily_costs[location].append(cost)
+        return {
+            'shifts': self.shifts,
+            'shifts_by_role': sorted_counts(self.shifts_by_role),
+            'average_shifts_per_employee': round(float(np.mean(shifts_per_employee)), 1),
+            'min_shifts_per_employee': min(shifts_per_employee),
+            'max_shifts_per_employee': max(shifts_per_employee),
+            'shifts_by_location': dict(sorted(self.shifts_by_location.items())),
+            'published': sorted_counts(self.published),
+            'unfilled_slots': sorted_counts(self.unfilled),
+            'weeks_below_minimum_shifts': sorted_counts(self.below_minimum),
+            'total_labor_hours': round(sum(self.labor_hours.values()), 2),
+            'total_labor_cost': round(sum(self.labor_cost.values()), 2),
+            'average_daily_cost_by_location': {location: round(float(np.mean(costs)), 2)
+                                               for location, costs in sorted(daily_costs.items())},
+            'labor_by_location_day': [
+                {'location': location, 'date': day, 'paid_hours': round(self.labor_hours[(location, day)], 2),
+                 'labor_cost': round(cost, 2)}
+                for (location, day), cost in sorted(self.labor_cost.items())
+            ]
+        }
+
+
+def write_report(report, name, report_dir=REPORT_DIR):
+    """Write a summary report to {report_dir}/{name}_summary.json and return its path."""
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"{name}_summary.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
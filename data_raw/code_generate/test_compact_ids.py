@@ -0,0 +1,77 @@
+"""
+Round trip of compact 64-bit IDs: encode_ids -> format_id/parse_id and the decoding in silver.sql.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_compact_ids.py
+"""
+
+import os
+import re
+import numpy as np
+import pytest
+from compact_ids import (DAY_BITS, ID_EPOCH, LOCATION_BITS, SEQUENCE_BITS, SHARD_BITS, decode_ids, encode_ids,
+                         format_id, parse_id)
+
+SILVER_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'databricks_pipeline',
+                          'transformations', 'silver.sql')
+
+# Smallest and largest value of every field, plus a typical key
+DATES = np.array([ID_EPOCH, np.datetime64('2025-10-01'), ID_EPOCH + (1 << DAY_BITS) - 1], dtype='datetime64[D]')
+LOCATION_CODES = np.array([0, 3, (1 << LOCATION_BITS) - 1])
+SHARDS = [0, 7, (1 << SHARD_BITS) - 1]
+SEQUENCES = np.array([1, 42, (1 << SEQUENCE_BITS) - 1])
+
+
+def sql_decode(keys):
+    """Decode keys with the shifts and masks silver.sql uses for id_date, id_location_code, id_shard and sequence."""
+    with open(SILVER_SQL) as f:
+        sql = f.read()
+    epoch, day_shift = re.search(r"DATE_ADD\(DATE'([\d-]+)', CAST\(SHIFTRIGHT\(TRY_CAST\(transaction_id AS BIGINT\), "
+                                 r"(\d+)\)", sql).groups()
+    field = r"SHIFTRIGHT\(TRY_CAST\(transaction_id AS BIGINT\), (\d+)\) & (\d+) AS INT\) as {}"
+    location_shift, location_mask = map(int, re.search(field.format('id_location_code'), sql).groups())
+    shard_shift, shard_mask = map(int, re.search(field.format('id_shard'), sql).groups())
+    sequence_mask = int(re.search(r"TRY_CAST\(transaction_id AS BIGINT\) & (\d+) AS INT\) as transaction_sequence",
+                                  sql).group(1))
+    return {
+        'date': np.datetime64(epoch, 'D') + (keys >> int(day_shift)),
+        'location_code': (keys >> location_shift) & location_mask,
+        'shard': (keys >> shard_shift) & shard_mask,
+        'sequence': keys & sequence_mask
+    }
+
+
+@pytest.mark.parametrize('shard', SHARDS)
+def test_keys_round_trip(shard):
+    keys = encode_ids(DATES, LOCATION_CODES, shard, SEQUENCES)
+    assert (keys > 0).all()
+    for decoded in (decode_ids(keys), sql_decode(keys)):
+        assert (decoded['date'] == DATES).all()
+        assert (decoded['location_code'] == LOCATION_CODES).all()
+        assert (decoded['shard'] == shard).all()
+        assert (decoded['sequence'] == SEQUENCES).all()
+
+
+@pytest.mark.parametrize('shard', SHARDS)
+def test_formatted_ids_are_fixed_width_and_parse_back(shard):
+    keys = encode_ids(DATES, LOCATION_CODES, shard, SEQUENCES)
+    texts = [format_id(int(key), kind) for key in keys for kind in ['transaction', 'order']]
+    assert {len(text) for text in texts} == {len(texts[0])}
+    assert [parse_id(text) for text in texts] == [int(key) for key in keys for _ in range(2)]
+    assert format_id(int(keys[1])) == f"TXN-20251001-00004-{shard:02d}-00000042"
+
+
+def test_formatted_ids_sort_like_their_keys():
+    # Every field changes at once, so a missing pad on any of them shows up in the order
+    keys = encode_ids(DATES[[1, 1, 1, 1]], [0, 9, 9, 10], [1, 1, 10, 2], [99, 5, 1, 100000])
+    texts = [format_id(int(key)) for key in keys]
+    assert sorted(texts) == [texts[i] for i in np.argsort(keys)]
+
+
+def test_fields_out_of_range_are_rejected():
+    with pytest.raises(ValueError, match='location'):
+        encode_ids(DATES[:1], [1 << LOCATION_BITS], 0, [1])
+    with pytest.raises(ValueError, match='shard'):
+        encode_ids(DATES[:1], [0], 1 << SHARD_BITS, [1])
+    with pytest.raises(ValueError, match='sequence'):
+        encode_ids(DATES[:1], [0], 0, [1 << SEQUENCE_BITS])
@@ -0,0 +1,84 @@
+"""
+Staff counts of the coverage index per 15-minute slot, net of breaks.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_coverage_index.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from coverage_index import SLOTS_PER_DAY, CoverageIndex
+
+DAY = np.datetime64('2025-10-06', 'D')
+
+
+def slot(time_text):
+    """Slot of the day starting at 'HH:MM'."""
+    hour, minute = map(int, time_text.split(':'))
+    return (hour * 60 + minute) // 15
+
+
+@pytest.fixture
+def coverage():
+    shifts = [
+        # role, location, start, end, break minutes
+        ('Barista', 'LOC-001', '06:30', '14:30', 30),  # 32 slots; break 10:15-10:45 (the middle 2 slots)
+        ('Barista', 'LOC-001', '07:00', '11:00', None),  # No break
+        ('Barista', 'LOC-001', '11:40', '13:10', 20),  # Starts and ends mid-slot: on from 11:45 to 13:15
+        ('Front of House', 'LOC-001', '08:00', '12:00', 30),
+        ('Kitchen', 'LOC-002', '06:00', '10:00', 0)
+    ]
+    df_roster = pd.DataFrame(shifts, columns=['role', 'area_department', 'start_time', 'end_time', 'break_duration'])
+    for column in ['start_time', 'end_time']:
+        df_roster[column] = pd.to_datetime(str(DAY) + ' ' + df_roster[column])
+    return CoverageIndex.from_frame(df_roster)
+
+
+@pytest.mark.parametrize('time_text, baristas', [
+    ('06:15', 0),
+    ('06:30', 1),
+    ('07:00', 2),
+    ('10:00', 2),
+    ('10:15', 1),  # First Barista on break
+    ('10:30', 1),
+    ('10:45', 2),  # Back from break
+    ('11:00', 1),  # End is exclusive
+    ('11:30', 1),
+    ('11:45', 2),
+    ('12:15', 1),  # Third Barista's 20-minute break rounds up to two slots, 12:15-12:45
+    ('12:30', 1),
+    ('12:45', 2),
+    ('13:00', 2),
+    ('13:15', 1),
+    ('14:15', 1),
+    ('14:30', 0)
+])
+def test_barista_counts_net_of_breaks(coverage, time_text, baristas):
+    assert coverage.day(0, DAY, ['Barista'])[slot(time_text)] == baristas
+    assert coverage.staff([0], [DAY + np.timedelta64(slot(time_text) * 15 + 7, 'm')], ['Barista'])[0] == baristas
+
+
+def test_roles_and_locations_are_counted_apart(coverage):
+    front_of_house = coverage.day(0, DAY, ['Front of House'])
+    assert front_of_house.sum() == 16 - 2  # Four hours less a 30-minute break
+    assert coverage.day(1, DAY, ['Barista', 'Front of House']).sum() == 0
+    assert coverage.day(1, DAY, ['Kitchen'])[slot('06:00'):slot('10:00')].tolist() == [1] * 16
+    everyone = coverage.day(0, DAY)
+    assert (everyone == coverage.day(0, DAY, ['Barista']) + front_of_house).all()
+
+
+def test_lookups_outside_the_roster_are_zero(coverage):
+    assert coverage.day(0, DAY + 1).sum() == 0
+    assert coverage.day(5, DAY).sum() == 0
+    times = [DAY - np.timedelta64(1, 'D'), DAY + np.timedelta64(9, 'h'), DAY + np.timedelta64(2, 'D')]
+    assert coverage.staff([0, 9, 0], times).tolist() == [0, 0, 0]
+
+
+def test_to_frame_lists_every_staffed_slot(coverage):
+    df_coverage = coverage.to_frame()
+    assert df_coverage['staff'].sum() == coverage.counts.sum()
+    assert len(coverage.day(0, DAY)) == SLOTS_PER_DAY
+    first = df_coverage.sort_values('slot_start').iloc[0]
+    assert (first['location_id'], first['role'], str(first['slot_start'])) == ('LOC-002', 'Kitchen',
+                                                                              '2025-10-06 06:00:00')
@@ -0,0 +1,90 @@
+"""
+Demand histogram of POS output folders holding several variants of a run.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_demand_profile.py
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from demand_profile import pos_sources, read_demand
+from output_writers import TABLE_SCHEMAS, write_parquet
+
+
+def pos_frame(n_transactions, hour):
+    """Line items of n_transactions two-item transactions at LOC-001 on 2025-10-01 at `hour`."""
+    n_lines = 2 * n_transactions
+    number = np.repeat(np.arange(1, n_transactions + 1), 2)
+    df = pd.DataFrame({column: ['x'] * n_lines for column in TABLE_SCHEMAS['pos']})
+    df['transaction_id'] = [f"TXN-20251001-{n:04d}" for n in number]
+    df['transaction_datetime'] = pd.Timestamp(f"2025-10-01 {hour:02d}:30:00")
+    df['location_id'] = 'LOC-001'
+    df['quantity'] = 1
+    df['unit_price'] = df['line_total'] = 5.0
+    return df
+
+
+def set_mtime(path, mtime):
+    """Set the modification time of a file, or of every file in a dataset directory."""
+    paths = [path] if os.path.isfile(path) else [os.path.join(root, name) for root, _, names in os.walk(path)
+                                                 for name in names]
+    for file_path in paths:
+        os.utime(file_path, (mtime, mtime))
+
+
+def write_variants(pos_dir, newest):
+    """Write pos_0 as plain, gzip, rolled CSV and Parquet; only `newest` holds the current run (7 at 9 AM)."""
+    old, new = pos_frame(20, 12), pos_frame(7, 9)
+    variants = {
+        'csv': ['pos_0.csv'],
+        'gzip': ['pos_0.csv.gz'],
+        'rolled': ['pos_0-00000.csv', 'pos_0-00001.csv'],
+        'parquet': ['pos_0']
+    }
+    for variant, names in variants.items():
+        df = new if variant == newest else old
+        if variant == 'parquet':
+            write_parquet(df, os.path.join(pos_dir, 'pos_0'), 'pos')
+        elif variant == 'rolled':
+            # Split inside a transaction, as rolled files may be
+            df.iloc[:5].to_csv(os.path.join(pos_dir, names[0]), index=False)
+            df.iloc[5:].to_csv(os.path.join(pos_dir, names[1]), index=False)
+        else:
+            df.to_csv(os.path.join(pos_dir, names[0]), index=False)
+        for name in names:
+            set_mtime(os.path.join(pos_dir, name), 2000000000 if variant == newest else 1000000000)
+    return variants[newest]
+
+
+def test_each_run_is_read_from_its_newest_variant(tmp_path):
+    for newest in ['csv', 'gzip', 'rolled', 'parquet']:
+        pos_dir = tmp_path / newest
+        pos_dir.mkdir()
+        names = write_variants(str(pos_dir), newest)
+        assert pos_sources(str(pos_dir)) == [os.path.join(str(pos_dir), name) for name in names]
+        histogram = read_demand(str(pos_dir))
+        assert len(histogram) == 7, newest
+        assert histogram.counts[0, 2, 9] == 7  # 2025-10-01 was a Wednesday
+
+
+def test_separate_runs_are_all_read(tmp_path):
+    pos_frame(3, 8).to_csv(tmp_path / 'pos_0.csv', index=False)
+    later = pos_frame(4, 10)
+    later['transaction_id'] = later['transaction_id'].str.replace('20251001', '20251002')
+    later['transaction_datetime'] = pd.Timestamp('2025-10-02 10:30:00')
+    later.to_csv(tmp_path / 'pos_1.csv', index=False)
+    histogram = read_demand(str(tmp_path))
+    assert len(histogram) == 7
+    assert histogram.counts[0, 3, 10] == 4
+
+
+@pytest.mark.parametrize('rows', [1, 2, 3, 100])
+def test_interleaved_line_items_count_once(tmp_path, rows):
+    # An unstable sort by timestamp can interleave transactions that share one
+    df = pos_frame(3, 9)
+    df.iloc[[0, 2, 1, 4, 3, 5]].to_csv(tmp_path / 'pos_0.csv', index=False)
+    histogram = read_demand(str(tmp_path), rows)
+    assert len(histogram) == 3
+    assert histogram.counts[0, 2, 9] == 3
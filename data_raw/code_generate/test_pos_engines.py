@@ -0,0 +1,75 @@
+"""
+Statistical equivalence of the numpy and python POS engines.
+Both engines generate the full START_DATE-END_DATE period; every marginal the
+python engine defines (category, item, size, milk, quantity, payment method and
+hour of day) must agree under a chi-square homogeneity test and in total variation.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_pos_engines.py
+"""
+
+import random
+import numpy as np
+import pandas as pd
+import pytest
+import generate_pos_data as pos
+
+SEED = 0
+CHI_SQUARE_Z = 3.09  # One-sided normal quantile of the test level (alpha = 0.001)
+MAX_TOTAL_VARIATION = 0.02
+MIN_EXPECTED = 5  # Categories seen fewer times in both samples are left out of the chi-square test
+LINE_ITEM_COLUMNS = ['category_name', 'item_name', 'size', 'milk_type', 'quantity', 'payment_method']
+
+
+@pytest.fixture(scope='module')
+def python_engine():
+    random.seed(SEED)
+    pos.fake.seed_instance(SEED)
+    return pd.DataFrame(pos.generate_all_transactions(pos.get_customer_pool(SEED)))
+
+
+@pytest.fixture(scope='module')
+def numpy_engine():
+    return pos.generate_all_transactions_numpy(SEED, workers=1)
+
+
+def chi_square_critical(df, z=CHI_SQUARE_Z):
+    """Upper critical value of a chi-square distribution (Wilson-Hilferty approximation)."""
+    return df * (1 - 2 / (9 * df) + z * np.sqrt(2 / (9 * df))) ** 3
+
+
+def chi_square(a, b):
+    """Chi-square homogeneity statistic of two samples of labels, and its degrees of freedom."""
+    counts = pd.concat([a.astype(str).value_counts(), b.astype(str).value_counts()], axis=1).fillna(0).to_numpy()
+    counts = counts[counts.sum(axis=1) >= MIN_EXPECTED]
+    expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / counts.sum()
+    return ((counts - expected) ** 2 / expected).sum(), len(counts) - 1
+
+
+def total_variation(a, b):
+    """Total variation distance between the label frequencies of two samples."""
+    a = a.astype(str).value_counts(normalize=True)
+    b = b.astype(str).value_counts(normalize=True)
+    return 0.5 * a.sub(b, fill_value=0).abs().sum()
+
+
+def assert_same_distribution(a, b, name):
+    statistic, df = chi_square(a, b)
+    distance = total_variation(a, b)
+    assert statistic < chi_square_critical(df), \
+        f"{name}: chi-square {statistic:.1f} > {chi_square_critical(df):.1f} (df {df}), total variation {distance:.4f}"
+    assert distance < MAX_TOTAL_VARIATION, f"{name}: total variation {distance:.4f}"
+
+
+def transaction_hours(df):
+    """Hour of day of every transaction (one entry per transaction, not per line item)."""
+    return pd.to_datetime(df.drop_duplicates('transaction_id')['transaction_datetime']).dt.hour
+
+
+@pytest.mark.parametrize('column', LINE_ITEM_COLUMNS)
+def test_line_item_marginals(python_engine, numpy_engine, column):
+    assert_same_distribution(python_engine[column], numpy_engine[column], column)
+
+
+def test_hour_of_day(python_engine, numpy_engine):
+    assert_same_distribution(transaction_hours(python_engine), transaction_hours(numpy_engine), 'hour')
@@ -0,0 +1,42 @@
+"""
+Determinism of the numpy POS engine's output: the same seed must give the same
+CSV bytes for any number of workers, written whole or streamed day by day.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_pos_output.py
+"""
+
+import numpy as np
+import pytest
+import generate_pos_data as pos
+from output_writers import write_output
+from roster_index import RosterIndex
+
+SEED = 0
+WORKERS = 2
+
+
+@pytest.fixture(scope='module')
+def roster():
+    """A few Barista shifts at LOC-001 and LOC-002 on the first days, so shards carry roster slices."""
+    days = np.array(pos.get_operating_days(pos.START_DATE, pos.END_DATE)[:3], dtype='datetime64[D]')
+    starts = np.concatenate([days + np.timedelta64(390, 'm'), days + np.timedelta64(600, 'm')])
+    return RosterIndex([0, 0, 0, 1, 1, 1], starts, starts + np.timedelta64(300, 'm'), [0, 1, 2, 5, 6, 7])
+
+
+def csv_bytes(df, path):
+    write_output(df, str(path), 'pos')
+    return path.read_bytes()
+
+
+def test_worker_count_does_not_change_the_csv(tmp_path, roster):
+    one = pos.generate_all_transactions_numpy(SEED, workers=1, roster=roster)
+    many = pos.generate_all_transactions_numpy(SEED, workers=WORKERS, roster=roster)
+    assert csv_bytes(one, tmp_path / 'one.csv') == csv_bytes(many, tmp_path / 'many.csv')
+
+
+@pytest.mark.parametrize('id_shard', [None, 3])
+def test_streamed_csv_matches_the_full_frame(tmp_path, roster, id_shard):
+    full = pos.generate_all_transactions_numpy(SEED, workers=1, roster=roster, id_shard=id_shard)
+    pos.write_transactions_stream(str(tmp_path / 'stream.csv'), SEED, workers=1, roster=roster, id_shard=id_shard)
+    assert (tmp_path / 'stream.csv').read_bytes() == csv_bytes(full, tmp_path / 'full.csv')
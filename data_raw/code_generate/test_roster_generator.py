@@ -0,0 +1,70 @@
+"""
+Work-pattern limits of the roster generator.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_roster_generator.py
+"""
+
+import random
+from datetime import datetime, timedelta
+import pytest
+import generate_roster_data as roster
+from roster_solver import MAX_CONSECUTIVE_DAYS, WEEK_DAYS, RosterSolver, pattern_shortfalls
+
+FIRST_DAY = datetime(2025, 10, 6)  # A Monday
+CALENDAR_DAYS = 28  # Every calendar day, so weekends do not break streaks
+
+
+def longest_streak(dates):
+    """Longest run of consecutive calendar days in a collection of dates."""
+    days = sorted(set(dates))
+    longest = run = 1 if days else 0
+    for previous, day in zip(days, days[1:]):
+        run = run + 1 if (day - previous).days == 1 else 1
+        longest = max(longest, run)
+    return longest
+
+
+def test_consecutive_days_counts_the_streak_before_the_date():
+    shifts = [{'employee_id': 'EMP-001', 'start_time': FIRST_DAY + timedelta(days=i)} for i in range(5)]
+    state = roster.RosterState(shifts)
+    saturday = (FIRST_DAY + timedelta(days=5)).date()
+    assert state.consecutive_days('EMP-001', saturday) == 5
+    assert state.consecutive_days('EMP-001', saturday + timedelta(days=1)) == 0
+    assert state.consecutive_days('EMP-001', (FIRST_DAY + timedelta(days=4)).date()) == 4
+    assert state.consecutive_days('EMP-002', saturday) == 0
+
+
+@pytest.mark.parametrize('solver', ['greedy', 'constraint'])
+def test_nobody_works_more_than_max_consecutive_days(solver):
+    random.seed(0)
+    operating_days = [FIRST_DAY + timedelta(days=i) for i in range(CALENDAR_DAYS)]
+    df_roster = roster.generate_roster(operating_days, solver=solver, workers=1)
+    assert len(df_roster)
+    for employee_id, shifts in df_roster.groupby('employee_id'):
+        streak = longest_streak(start.date() for start in shifts['start_time'])
+        assert streak <= MAX_CONSECUTIVE_DAYS, f"{employee_id} works {streak} days in a row"
+
+
+@pytest.mark.parametrize('day', [WEEK_DAYS - 1, WEEK_DAYS])
+def test_both_solvers_count_shifts_over_the_same_week(day):
+    # Full-time maximum of 5 shifts reached on Monday-Wednesday, Friday and Saturday
+    history = [{'employee_id': 'EMP-001', 'start_time': FIRST_DAY + timedelta(days=i)} for i in [0, 1, 2, 4, 5]]
+    date = (FIRST_DAY + timedelta(days=day)).date()
+    # Sunday still falls in the week of all five shifts; the next Monday drops the first
+    expected = day >= WEEK_DAYS
+    greedy = roster.should_employee_work('EMP-001', date, roster.RosterState(history))
+    solver = RosterSolver({'EMP-001': roster.EMPLOYEES['EMP-001']}, {}, history)
+    free, _ = solver.available(date.toordinal())
+    assert greedy is expected
+    assert bool(free & 1) is expected
+
+
+def test_pattern_shortfalls_checks_full_weeks_only():
+    employees = {'EMP-001': {'work_pattern': 'full-time'}, 'EMP-002': {'work_pattern': 'part-time'}}
+    monday = FIRST_DAY.date()
+    operating_days = [monday + timedelta(days=i) for i in range(10) if (monday + timedelta(days=i)).weekday() < 5]
+    shift_dates = {'EMP-001': [monday + timedelta(days=i) for i in range(3)],
+                   'EMP-002': [monday, monday + timedelta(days=2)]}
+    # The second week has only 3 operating days in the period, so only the first is checked
+    assert pattern_shortfalls(employees, shift_dates, operating_days) == [('EMP-001', monday, 3, 4)]
@@ -0,0 +1,69 @@
+"""
+Shift lookups of the roster interval index at shift boundaries.
+
+Run from data_raw/code_generate:
+    python -m pytest -q test_roster_index.py
+"""
+
+import numpy as np
+import pytest
+from roster_index import RosterIndex
+
+DAY = np.datetime64('2025-10-06', 'D')
+
+
+def at(time_text, day=DAY):
+    """datetime64[s] of 'HH:MM[:SS]' on day."""
+    parts = [int(part) for part in time_text.split(':')] + [0]
+    return day + np.timedelta64(parts[0] * 3600 + parts[1] * 60 + parts[2], 's')
+
+
+@pytest.fixture
+def roster():
+    # LOC-001 (code 0): EMP-001 hands over to EMP-002 at 11:00, EMP-003 overlaps both; LOC-002: EMP-006
+    shifts = [(0, '06:30', '11:00', 0), (0, '11:00', '14:30', 1), (0, '08:00', '12:00', 2), (1, '09:00', '10:00', 5)]
+    location_codes, starts, ends, employee_codes = zip(*shifts)
+    return RosterIndex(location_codes, [at(start) for start in starts], [at(end) for end in ends], employee_codes)
+
+
+def staff_on_shift(roster, location_code, time_text, draws=np.linspace(0, 0.999, 50)):
+    """Every employee code lookup() can pick at one location and time."""
+    n = len(draws)
+    return set(roster.lookup(np.full(n, location_code), np.full(n, at(time_text)), draws).tolist())
+
+
+@pytest.mark.parametrize('time_text, expected', [
+    ('06:29:59', {-1}),
+    ('06:30', {0}),  # Start is inclusive
+    ('07:59:59', {0}),
+    ('08:00', {0, 2}),
+    ('10:59:59', {0, 2}),
+    ('11:00', {1, 2}),  # End is exclusive: the handover is exact
+    ('12:00', {1}),
+    ('14:29:59', {1}),
+    ('14:30', {-1})
+])
+def test_lookup_at_shift_boundaries(roster, time_text, expected):
+    assert staff_on_shift(roster, 0, time_text) == expected
+
+
+def test_locations_do_not_share_staff(roster):
+    assert staff_on_shift(roster, 1, '08:59:59') == {-1}
+    assert staff_on_shift(roster, 1, '09:00') == {5}
+    assert staff_on_shift(roster, 1, '10:00') == {-1}
+    assert staff_on_shift(roster, 2, '09:00') == {-1}
+
+
+def test_assign_falls_back_to_staff_rostered_that_day(roster):
+    location_codes = np.array([1, 1, 0])
+    times = np.array([at('12:00'), at('09:00', DAY + 1), at('06:30')])
+    assert roster.assign(location_codes, times, np.zeros(3)).tolist() == [5, -1, 0]
+
+
+def test_subset_keeps_the_shifts_of_its_locations_and_day(roster):
+    assert len(roster.subset(0, DAY)) == 3
+    assert len(roster.subset([0, 1], DAY)) == 4
+    assert len(roster.subset([0, 1], DAY + 1)) == 0
+    subset = roster.subset([1], DAY)
+    assert staff_on_shift(subset, 1, '09:30') == {5}
+    assert staff_on_shift(subset, 0, '09:30') == {-1}
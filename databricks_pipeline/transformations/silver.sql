@@ -19,6 +19,16 @@ AS SELECT
     transaction_id,
     order_id,
     
+    -- Compact 64-bit IDs (--id-scheme compact, see compact_ids.py): day | location | shard | sequence.
+    -- NULL for legacy TXN-/ORD- IDs
+    TRY_CAST(transaction_id AS BIGINT) as transaction_key,
+    TRY_CAST(order_id AS BIGINT) as order_key,
+    DATE_ADD(DATE'2000-01-01', CAST(SHIFTRIGHT(TRY_CAST(transaction_id AS BIGINT), 46) AS INT)) as id_date,
+    CAST(SHIFTRIGHT(TRY_CAST(transaction_id AS BIGINT), 30) & 65535 AS INT) as id_location_code,
+    CAST(SHIFTRIGHT(TRY_CAST(transaction_id AS BIGINT), 24) & 63 AS INT) as id_shard,
+    CAST(TRY_CAST(transaction_id AS BIGINT) & 16777215 AS INT) as transaction_sequence,
+    CAST(TRY_CAST(order_id AS BIGINT) & 16777215 AS INT) as order_sequence,
+    
     -- Timestamp
     transaction_datetime,
     CAST(transaction_datetime AS DATE) as transaction_date,